@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+generate_unified_html.py のベンチマーク
+
+ラッコキーワード形式（UTF-16 LE・タブ区切り・月別12列）の合成CSVを
+指定した行数で作り、読み込みからHTML書き出しまでの段階ごとに
+経過時間・行/秒・ピークメモリを測ってJSONに書き出す。
+
+ピークメモリは、各段階を tracemalloc つきでもう1回実行して測った、その段階で確保した
+Pythonヒープの最大値。計測のオーバーヘッドが経過時間に混ざらないよう、時間は別の実行で測る
+（プロセス全体の最大RSSは段階の比較に使えないので、規模ごとに1つだけ記録する）。
+
+    python3 benchmark_pipeline.py --rows 10000,100000 --output bench.json
+"""
+
+import argparse
+import csv
+import gc
+import io
+import json
+import platform
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import generate_unified_html as pipeline
+from keyword_dedup import cluster_keywords
+from keyword_overlap import compute_overlap
+from keyword_scoring import score_keywords
+from keyword_search import KeywordIndex
+from keyword_snapshot import load_snapshot, save_snapshot
+from keyword_trends import compute_trends
+
+MONTHS = [f"{year}{month:02d}" for year, month in [(2024, 11), (2024, 12)] + [(2025, m) for m in range(1, 11)]]
+SELF_SHARE = 0.7  # 合成データのうち自社調査カテゴリに割り振る行の割合
+STAGES = ("parse", "stream", "load", "snapshot", "normalize", "aggregate", "dedup", "render", "write")
+
+# 合成キーワードの材料（カテゴリ名と組み合わせる）
+WORDS = (
+    "無料", "おすすめ", "やり方", "とは", "ゲーム", "アプリ", "小学生", "中学生", "子供", "教室",
+    "オンライン", "比較", "料金", "口コミ", "初心者", "入門", "作り方", "簡単", "人気", "ランキング",
+    "スマホ", "パソコン", "ダウンロード", "ログイン", "できない", "夏休み", "自由研究", "英語", "資格", "本",
+)
+# Keyword Planner の月間検索数は決まった段階に丸められる
+VOLUME_STEPS = (10, 20, 30, 40, 50, 70, 90, 110, 140, 170, 210, 260, 320, 390, 480, 590, 720, 880,
+                1000, 1300, 1600, 1900, 2400, 2900, 3600, 4400, 5400, 6600, 8100, 9900, 12100,
+                14800, 18100, 22200, 27100, 33100, 40500, 49500, 60500, 74000, 90500, 110000)
+
+
+def synthetic_keyword(rng, stem, serial):
+    """カテゴリ名＋語の組み合わせ（重複しすぎないよう通し番号を混ぜる）"""
+    parts = [stem] + rng.sample(WORDS, rng.randint(1, 3))
+    if serial % 3 == 0:
+        parts.append(str(serial))
+    return " ".join(parts)
+
+
+def write_tsv(path, header, rows):
+    """ラッコキーワードと同じ形式（UTF-16 BOM付き・タブ区切り・全項目クォート）で書く"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-16', newline='') as f:
+        writer = csv.writer(f, delimiter='\t', quoting=csv.QUOTE_ALL, lineterminator='\r\n')
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def category_rows(rng, stem, count, offset):
+    """自社調査カテゴリCSVの行（月別12列つき）"""
+    for n in range(count):
+        step = rng.randrange(len(VOLUME_STEPS))
+        volume = VOLUME_STEPS[step]
+        # 月別は前後2段階の範囲で揺らす
+        nearby = VOLUME_STEPS[max(0, step - 2):step + 3]
+        series = [str(rng.choice(nearby)) for _ in MONTHS]
+        difficulty = "-" if rng.random() < 0.6 else str(rng.randint(1, 80))
+        yield [
+            str(n + 1), synthetic_keyword(rng, stem, offset + n), difficulty, str(volume),
+            f"{rng.random() * 5:.2f}", str(rng.randint(0, 100)), "0%", "0%", "0%", *series,
+        ]
+
+
+def competitor_rows(rng, domain, count, offset):
+    """競合キーワードCSVの行（検索順位・推定流入数・URL つき）"""
+    pages = max(1, count // 10)
+    for n in range(count):
+        volume = rng.choice(VOLUME_STEPS)
+        rank = rng.randint(1, 50)
+        yield [
+            synthetic_keyword(rng, rng.choice(pipeline.KEYWORD_CATEGORIES)[0], offset + n),
+            str(rng.randint(1, 80)), str(volume), str(rank), str(volume // rank),
+            f"{rng.random() * 5:.2f}", str(rng.randint(0, 100)),
+            f"https://{domain}/articles/{rng.randrange(pages)}",
+        ]
+
+
+def generate_dataset(base_dir, total_rows, seed=0):
+    """base_dir に COMPANIES / KEYWORD_CATEGORIES と同じ配置で合成CSVを作る"""
+    rng = random.Random(seed)
+    categories = pipeline.KEYWORD_CATEGORIES
+    competitors = [key for key, info in pipeline.COMPANIES.items() if info["type"] == "competitor"]
+
+    self_rows = int(total_rows * SELF_SHARE)
+    header = ["No", "キーワード", "SEO難易度", "月間検索数", "CPC($)", "競合性",
+              "変化率（直近12ヵ月平均 vs 直近月）", "変化率（直近6ヵ月平均 vs 直近月）",
+              "変化率（直近3ヵ月平均 vs 直近月）"] + [f"{m}{pipeline.MONTHLY_COLUMN_SUFFIX}" for m in MONTHS]
+    offset = 0
+    for i, (cat_name, _) in enumerate(categories):
+        count = self_rows // len(categories) + (1 if i < self_rows % len(categories) else 0)
+        write_tsv(base_dir / "キーワード調査" / f"{cat_name}.csv", header, category_rows(rng, cat_name, count, offset))
+        offset += count
+
+    competitor_total = total_rows - self_rows
+    for i, key in enumerate(competitors):
+        info = pipeline.COMPANIES[key]
+        domain = f"{key.lower()}.example.jp"
+        count = competitor_total // len(competitors) + (1 if i < competitor_total % len(competitors) else 0)
+        write_tsv(base_dir / info["keywords_csv"],
+                  ["キーワード", "SEO難易度", "月間検索数", "検索順位", "推定流入数", "CPC ($)", "競合性", "URL"],
+                  competitor_rows(rng, domain, count, offset))
+        offset += count
+        if info.get("pages_csv"):
+            pages = max(1, count // 10)
+            write_tsv(base_dir / info["pages_csv"], list(pipeline.PAGE_COLUMNS), (
+                [f"記事{p}", f"https://{domain}/articles/{p}", str(rng.randint(0, 10000)),
+                 str(rng.randint(1, 200)), str(rng.randint(0, 5000)), f"キーワード{p}"]
+                for p in range(pages)
+            ))
+        if info.get("domains_csv"):
+            write_tsv(base_dir / info["domains_csv"], list(pipeline.DOMAIN_COLUMNS), (
+                [f"site{d}.example.com", f"サイト{d}", str(rng.randint(0, 2000)), f"{rng.random() * 100:.2f}%",
+                 str(rng.randint(0, 500)), str(rng.randint(0, 500)), str(rng.randint(0, 100000)),
+                 str(rng.randint(0, 5000)), str(rng.randint(0, 50000)), str(rng.randint(1, 1000))]
+                for d in range(20)
+            ))
+
+
+def peak_rss_mb():
+    """プロセスの最大常駐メモリ（MB）"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux は KB、macOS はバイトで返る
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def measure(name, rows, func, memory=True):
+    """func() を実行して結果と計測値を返す
+
+    memory なら tracemalloc をかけてもう1回実行し、その段階だけのピークを測る
+    （結果は1回目のものを返す）。
+    """
+    gc.collect()
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    result = func()
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+    stats = {
+        "seconds": round(wall, 4),
+        "cpu_seconds": round(cpu, 4),
+        "rows": rows,
+        "rows_per_sec": round(rows / wall) if wall > 0 else None,
+    }
+    line = f"  {name:<10} {wall:8.3f}s  {stats['rows_per_sec'] or 0:>12,} 行/秒"
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            stats["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+        finally:
+            tracemalloc.stop()
+        line += f"  ピーク {stats['peak_mb']:,.1f}MB"
+    print(line)
+    return result, stats
+
+
+def run_scale(total_rows, work_dir, stages, memory=True, jobs=1, row_limit=None, seed=0):
+    """1つの規模で合成データを作り、各段階を測る"""
+    base_dir = work_dir / f"rows_{total_rows}"
+    print(f"\n{total_rows:,}行")
+    started = time.perf_counter()
+    generate_dataset(base_dir, total_rows, seed=seed)
+    generate_seconds = time.perf_counter() - started
+    print(f"  {'generate':<10} {generate_seconds:8.3f}s")
+
+    pipeline.BASE_DIR = base_dir
+    pipeline.OUTPUT_FILE = base_dir / "キーワード分析_統合.html"
+    companies = [(key, info["name"], info["icon"]) for key, info in pipeline.COMPANIES.items()]
+    results = {"rows": total_rows, "generate_seconds": round(generate_seconds, 3), "stages": {}}
+
+    def parse():
+        count = 0
+        for _, csv_path, _, _ in pipeline.keyword_sources():
+            for _ in pipeline.read_csv_utf16(csv_path):
+                count += 1
+        return count
+
+    # 後段は load の結果を使うので、load は指定が無くても実行する
+    if "parse" in stages:
+        _, results["stages"]["parse"] = measure("parse", total_rows, parse, memory)
+    if "stream" in stages:
+        # 全行を載せない概算集計（load と比べるとメモリが行数に比例しないのがわかる）
+        _, results["stages"]["stream"] = measure(
+            "stream", total_rows, lambda: pipeline.stream_all_keywords(jobs=jobs), memory,
+        )
+    (all_data, errors), results["stages"]["load"] = measure(
+        "load", total_rows, lambda: pipeline.load_all_keywords(jobs=jobs), memory,
+    )
+    if errors:
+        results["errors"] = errors
+
+    if "snapshot" in stages:
+        # CSVの再パースとの比較用に、スナップショットからの読み込みを測る
+        snapshot_file = base_dir / "keywords.kwsnap"
+        save_snapshot(all_data, snapshot_file)
+        _, results["stages"]["snapshot"] = measure(
+            "snapshot", total_rows, lambda: load_snapshot(snapshot_file), memory,
+        )
+        results["snapshot_bytes"] = snapshot_file.stat().st_size
+
+    if "normalize" in stages:
+        _, results["stages"]["normalize"] = measure(
+            "normalize", total_rows, lambda: KeywordIndex.build(all_data, companies), memory,
+        )
+    if "aggregate" in stages:
+        def aggregate():
+            for table in all_data.values():
+                table.category_totals()
+                if table.months:
+                    compute_trends(table)
+            compute_overlap(all_data, companies, "できたよ")
+            score_keywords(all_data)
+        _, results["stages"]["aggregate"] = measure("aggregate", total_rows, aggregate, memory)
+    if "dedup" in stages:
+        self_rows = len(all_data["できたよ"])
+        _, results["stages"]["dedup"] = measure(
+            "dedup", self_rows, lambda: cluster_keywords(all_data["できたよ"]), memory,
+        )
+    if "render" in stages:
+        def render():
+            buf = io.StringIO()
+            pipeline.write_html(buf, all_data, row_limit=row_limit)
+            return buf.tell()
+        size, results["stages"]["render"] = measure("render", total_rows, render, memory)
+        results["html_chars"] = size
+    if "write" in stages:
+        def write():
+            with open(pipeline.OUTPUT_FILE, 'w', encoding='utf-8', buffering=pipeline.WRITE_BUFFER_SIZE) as f:
+                pipeline.write_html(f, all_data, row_limit=row_limit)
+            return pipeline.OUTPUT_FILE.stat().st_size
+        size, results["stages"]["write"] = measure("write", total_rows, write, memory)
+        results["html_bytes"] = size
+
+    # プロセス全体の最大RSS（それまでの規模・段階を含む最大値なので段階の比較には使わない）
+    results["process_peak_rss_mb"] = round(peak_rss_mb(), 1)
+    return results
+
+
+def parse_rows(text):
+    """「10k,1m」のような指定を行数のリストにする"""
+    units = {"k": 1_000, "m": 1_000_000}
+    rows = []
+    for part in text.split(","):
+        part = part.strip().lower().replace("_", "")
+        if not part:
+            continue
+        scale = units.get(part[-1], 1)
+        rows.append(int(float(part[:-1] if scale > 1 else part) * scale))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="キーワード分析パイプラインのベンチマーク（合成データ）")
+    parser.add_argument("--rows", default="10k,100k", help="行数（カンマ区切り、k/m 可。例: 10k,100k,1m,10m）")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"測る段階（{', '.join(STAGES)}）")
+    parser.add_argument("--output", metavar="PATH", help="結果JSONの出力先（省略時は標準出力）")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="段階ごとのピークメモリを測らない（各段階を tracemalloc つきでもう1回実行するのを省く）")
+    parser.add_argument("--jobs", type=int, default=1, metavar="N", help="load のパース並列数")
+    parser.add_argument("--table-rows", type=int, default=0, metavar="N",
+                        help="企業ページの表に出す行数（0で全件、generate_unified_html.py の --rows と同じ）")
+    parser.add_argument("--seed", type=int, default=0, help="合成データの乱数シード")
+    parser.add_argument("--work-dir", metavar="DIR", help="合成データの置き場所（省略時は一時ディレクトリを作って消す）")
+    args = parser.parse_args(argv)
+
+    stages = {s.strip() for s in args.stages.split(",") if s.strip()}
+    unknown = stages - set(STAGES)
+    if unknown:
+        parser.error(f"不明な段階です: {', '.join(sorted(unknown))}")
+
+    work_dir = Path(args.work_dir) if args.work_dir else Path(tempfile.mkdtemp(prefix="seo_bench_"))
+    report = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "jobs": args.jobs,
+        "memory": not args.no_memory,
+        "scales": [],
+    }
+    try:
+        for total_rows in parse_rows(args.rows):
+            report["scales"].append(run_scale(
+                total_rows, work_dir, stages, memory=not args.no_memory, jobs=args.jobs,
+                row_limit=args.table_rows or None, seed=args.seed,
+            ))
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding='utf-8')
+        print(f"\n結果: {args.output}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,14 +3,67 @@
 全社のキーワード分析データを1つのHTMLファイルに統合するスクリプト
 """
 
+import argparse
+import asyncio
+import codecs
 import csv
+import html
+import io
+import json
 import os
 import unicodedata
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from keyword_articles import ArticleCoverage, load_posts, render_article_page
+from keyword_cache import AnalysisCache, KeywordCache, file_digest, source_digest
+from keyword_classifier import (
+    HOLDOUT_FOLDS, Classification, KeywordClassifier, classify_tables, export_classification_json,
+    holdout_agreement, render_classification_page,
+)
+from keyword_dedup import cluster_keywords, render_dedup_page
+from keyword_diff import diff_keywords, render_diff_page
+from keyword_overlap import compute_overlap, export_overlap_csv, render_overlap_page
+from keyword_pages import DomainTable, PageTable, SiteData, render_pages_page
+from keyword_reports import STANDARD_RENDERERS, ReportContext, ReportRenderer, run_renderers
+from keyword_scoring import parse_weights, render_scoring_page, score_keywords
+from keyword_search import SEARCH_SCRIPT, KeywordIndex, render_search_page
+from keyword_server import API_CLIENT_SCRIPT, KeywordQuery, KeywordServer
+from keyword_snapshot import load_snapshot, save_snapshot
+from keyword_stream import StreamAggregator, render_stream_report
+from keyword_table import MISSING, KeywordTable
+from keyword_trends import compute_trends, render_trend_page
+from pipeline_profile import NULL_PROFILER, Profiler
+from source_paths import PathResolver, discover_categories, discover_competitors
+
 # 設定
 BASE_DIR = Path("/workspaces/dekitayo/SEO")
 OUTPUT_FILE = BASE_DIR / "キーワード分析_統合.html"
+CACHE_DIR_NAME = ".cache"
+# CSVのパースに関わるソース（変わったら読み込みキャッシュを捨てる）
+PARSE_SOURCES = ("generate_unified_html.py", "keyword_table.py")
+SEARCH_INDEX_NAME = "キーワード分析_検索インデックス.js"
+OVERLAP_CSV_NAME = "キーワード分析_重複.csv"
+GAP_CSV_NAME = "キーワード分析_ギャップ.csv"
+CLASSIFICATION_SOURCE = "コエテコ/keyword_classification.json"
+CLASSIFICATION_JSON_NAME = "キーワード分析_分類.json"
+CLASSIFICATION_CACHE_NAME = "classification.pickle"
+PROFILE_JSON_NAME = "キーワード分析_プロファイル.json"
+STREAM_HTML_NAME = "キーワード分析_概算.html"
+ARTICLE_COVERAGE_NAME = "キーワード分析_記事カバレッジ.json"
+PATH_CACHE_NAME = "paths.json"
+SNAPSHOT_DIR_NAME = "snapshots"
+CURRENT_SNAPSHOT_NAME = "今回.kwsnap"
+PREVIOUS_SNAPSHOT_NAME = "前回.kwsnap"
+SERVE_HOST = "127.0.0.1"
+API_BASE = "/api"
+KEYWORD_DIR_NAME = "キーワード調査"
+REPORT_DIR_NAME = "レポート"
+# ポータルからリンクする既存のレポート（NFCのファイル名の末尾）
+EXISTING_REPORT_SUFFIXES = ("_Wiki風.html", "分類一覧.html")
+ROW_LIMIT = None  # 企業ページの表に出す行数（Noneで全件）
+WRITE_BUFFER_SIZE = 1 << 20
 
 # 企業データ定義
 COMPANIES = {
@@ -20,6 +73,8 @@ COMPANIES = {
         "icon": "🎯",
         "type": "self",
         "keywords_csv": None,  # キーワード調査から集約
+        "pages_csv": None,
+        "domains_csv": None,
     },
     "コエテコ": {
         "name": "コエテコ",
@@ -27,6 +82,8 @@ COMPANIES = {
         "icon": "🎓",
         "type": "competitor",
         "keywords_csv": "コエテコ/キーワード.csv",
+        "pages_csv": "コエテコ/ページ.csv",
+        "domains_csv": "コエテコ/競合抽出.csv",
     },
     "リタリコ": {
         "name": "リタリコワンダー",
@@ -34,6 +91,8 @@ COMPANIES = {
         "icon": "🔍",
         "type": "competitor",
         "keywords_csv": "リタリコ/リタリコ_キーワード.csv",
+        "pages_csv": "リタリコ/リタリコ_ページ.csv",
+        "domains_csv": "リタリコ/リタリコ_競合.csv",
     },
     "QUREO": {
         "name": "QUREO",
@@ -41,6 +100,8 @@ COMPANIES = {
         "icon": "🏫",
         "type": "competitor",
         "keywords_csv": "QUREO/qureo_キーワード.csv",
+        "pages_csv": "QUREO/qureo_ページ.csv",
+        "domains_csv": "QUREO/qureo_競合.csv",
     },
     "TechKids": {
         "name": "TechKids School",
@@ -48,6 +109,8 @@ COMPANIES = {
         "icon": "🚀",
         "type": "competitor",
         "keywords_csv": "TechKids/techkids_キーワード.csv",
+        "pages_csv": "TechKids/techkids_ページ.csv",
+        "domains_csv": "TechKids/techkids_競合.csv",
     },
     "デジタネ": {
         "name": "デジタネ",
@@ -55,6 +118,8 @@ COMPANIES = {
         "icon": "🎮",
         "type": "competitor",
         "keywords_csv": "デジタネ/デジタネ_キーワード.csv",
+        "pages_csv": "デジタネ/デジタネ_ページ.csv",
+        "domains_csv": "デジタネ/デジタネ_競合抽出.csv",
     },
 }
 
@@ -76,98 +141,518 @@ KEYWORD_CATEGORIES = [
     ("steam教育", "🔬"),
 ]
 
+# --discover で見つけた企業・カテゴリの表示設定
+DISCOVERED_COLORS = ["#ef5350", "#5c6bc0", "#8d6e63", "#66bb6a", "#ffa726", "#78909c"]
+DISCOVERED_COMPANY_ICON = "🏢"
+DISCOVERED_CATEGORY_ICON = "🔑"
+
+# キーワード調査カテゴリ → 分類カテゴリ（分類器の用語として使う）
+CATEGORY_LABELS = {
+    "小学生": "子供の教育・習い事",
+    "プログラミング": "プログラミング学習",
+    "自己肯定感": "子育て・発達",
+    "発達障害": "子育て・発達",
+    "ゲーム": "趣味・エンタメ",
+    "キッズ": "子供の教育・習い事",
+    "子供": "子供の教育・習い事",
+    "スクラッチ": "プログラミング学習",
+    "ロブロックス": "プログラミング学習",
+    "マインクラフト": "プログラミング学習",
+    "unity": "プログラミング学習",
+    "非認知能力": "子育て・発達",
+    "steam教育": "子供の教育・習い事",
+}
+
+# CSVから読み込む列（月別の「YYYYMM（検索数）」列は自動で含める）
+READ_COLUMNS = (
+    "キーワード", "keyword", "月間検索数", "volume",
+    "SEO難易度", "CPC($)", "CPC ($)", "競合性",
+    "検索順位", "推定流入数", "URL",
+)
+PAGE_COLUMNS = ("タイトル", "URL", "推定流入数", "キーワード数", "価値 ($)", "トップキーワード")
+DOMAIN_COLUMNS = (
+    "ドメイン名", "サイトタイトル", "重複", "重複率", "競合固有", "調査対象固有",
+    "推定流入数", "キーワード数", "価値 ($)", "ページ数",
+)
+MONTHLY_COLUMN_SUFFIX = "（検索数）"
+# --stream で読む列
+STREAM_COLUMNS = ("キーワード", "keyword", "月間検索数", "volume", "SEO難易度")
+
 
 def normalize_path(path):
     """MacのNFD問題に対応"""
     return unicodedata.normalize('NFC', str(path))
 
 
-def read_csv_utf16(filepath):
-    """UTF-16 CSVを読み込む（ラッコキーワード形式）"""
-    rows = []
+def detect_csv_format(filepath):
+    """先頭バイトのBOMから文字コードと区切り文字を判定"""
+    with open(filepath, 'rb') as f:
+        head = f.read(4)
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16', '\t'
+    return 'utf-8-sig', ','
+
+
+def read_csv_utf16(filepath, columns=READ_COLUMNS, monthly=True):
+    """UTF-16 CSVを1行ずつ読み込む（ラッコキーワード形式）
+
+    文字コードはBOMで一度だけ判定し、columns と月別の検索数列（monthly=False なら除く）だけを
+    dictにして返すジェネレータ。
+    """
+    encoding, delimiter = detect_csv_format(filepath)
+    with open(filepath, 'r', encoding=encoding, newline='') as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            return
+        wanted = [
+            (i, name) for i, name in enumerate(header)
+            if name in columns or (monthly and name.endswith(MONTHLY_COLUMN_SUFFIX))
+        ]
+        for row in reader:
+            if not row:
+                continue
+            yield {name: row[i] for i, name in wanted if i < len(row)}
+
+
+def parse_int(value, default=0):
+    """カンマ区切りの数値文字列をintに変換（変換できなければ default）"""
     try:
-        with open(filepath, 'r', encoding='utf-16') as f:
-            reader = csv.DictReader(f, delimiter='\t')
-            for row in reader:
-                rows.append(row)
-    except:
-        try:
-            with open(filepath, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    rows.append(row)
-        except:
-            pass
-    return rows
+        return int(str(value).replace(",", ""))
+    except ValueError:
+        return default
 
 
-def load_competitor_keywords(company_key):
-    """競合のキーワードデータを読み込む"""
-    info = COMPANIES[company_key]
-    csv_path = BASE_DIR / info["keywords_csv"]
+def parse_series(values):
+    """月別検索数の列をまとめてintに変換
 
-    if not csv_path.exists():
-        # NFD対応
-        for p in csv_path.parent.glob("*"):
-            if normalize_path(p.name) == normalize_path(csv_path.name):
-                csv_path = p
-                break
-
-    rows = read_csv_utf16(csv_path)
+    ほとんどの行はカンマも空欄も無いので map(int) で一度に変換し、
+    失敗した行だけ1つずつ parse_int する。空欄の月は0件と区別できるよう MISSING で持つ。
+    """
+    values = list(values)
+    try:
+        return list(map(int, values))
+    except (TypeError, ValueError):
+        return [parse_int(value or "", default=MISSING) for value in values]
 
-    keywords = []
-    for row in rows:
-        kw = row.get("キーワード", row.get("keyword", ""))
-        vol = row.get("月間検索数", row.get("volume", "0"))
 
-        try:
-            vol_int = int(str(vol).replace(",", ""))
-        except:
-            vol_int = 0
+def get_keyword(row):
+    """行からキーワードを取り出す"""
+    return row.get("キーワード", row.get("keyword", ""))
 
-        keywords.append({
-            "keyword": kw,
-            "volume": vol_int,
-            "source": company_key,
-        })
 
-    return keywords
+def get_volume(row):
+    """行から月間検索数を取り出す"""
+    return parse_int(row.get("月間検索数", row.get("volume", "0")))
 
 
-def load_dekitayo_keywords():
-    """できたよ！のキーワード調査データを読み込む"""
-    keywords = []
-    keyword_dir = BASE_DIR / "キーワード調査"
+def get_cpc(row):
+    """行からCPCをセント単位の整数で取り出す"""
+    value = row.get("CPC($)", row.get("CPC ($)", "0"))
+    try:
+        return round(float(str(value).replace(",", "")) * 100)
+    except ValueError:
+        return 0
+
+
+def append_row(table, row, category="", icon="", source="", series=None):
+    """CSVの1行をKeywordTableに追加"""
+    table.append(
+        get_keyword(row),
+        get_volume(row),
+        # 「-」（未計測）は0と区別できるよう MISSING で持つ
+        difficulty=parse_int(row.get("SEO難易度", ""), default=MISSING),
+        cpc=get_cpc(row),
+        competition=parse_int(row.get("競合性", "0")),
+        category=category,
+        icon=icon,
+        source=source,
+        series=series,
+        rank=parse_int(row.get("検索順位", "0")),
+        traffic=parse_int(row.get("推定流入数", "0")),
+        url=row.get("URL", ""),
+    )
+
+
+def parse_keyword_file(csv_path, category="", icon="", source=""):
+    """CSV1ファイル分をパースしてKeywordTableにする（プロセスプールからも呼ばれる）"""
+    table = KeywordTable()
+    month_columns = None
+    for row in read_csv_utf16(csv_path):
+        if month_columns is None:
+            # 「202411（検索数）」→「202411」
+            month_columns = sorted(name for name in row if name.endswith(MONTHLY_COLUMN_SUFFIX))
+            table.set_months(name[:-len(MONTHLY_COLUMN_SUFFIX)] for name in month_columns)
+        series = parse_series(map(row.get, month_columns)) if month_columns else None
+        append_row(table, row, category=category, icon=icon, source=source, series=series)
+    return table
+
+
+def load_keyword_file(csv_path, category="", icon="", source="", cache=None):
+    """CSV1ファイル分をKeywordTableとして読み込む（cacheがあれば再利用）"""
+    if cache is not None:
+        key = cache.make_key(csv_path, category, icon, source)
+        table = cache.load(csv_path, key)
+        if table is not None:
+            return table
+
+    table = parse_keyword_file(csv_path, category, icon, source)
+
+    if cache is not None:
+        cache.store(csv_path, key, table)
+    return table
+
+
+_resolver = None
+
+
+def path_resolver():
+    """BASE_DIR 用の PathResolver（ディレクトリ一覧は .cache/paths.json に保存）"""
+    global _resolver
+    if _resolver is None or _resolver.base_dir != BASE_DIR:
+        _resolver = PathResolver(BASE_DIR, BASE_DIR / CACHE_DIR_NAME / PATH_CACHE_NAME)
+    return _resolver
+
+
+def company_page_id(key):
+    """企業ページの要素ID（JSの文字列にも入るので、--discover で足した競合は番号で振る）"""
+    if key == "できたよ":
+        return "dekitayo"
+    return COMPANIES[key].get("page_id", key)
+
+
+def competitor_csv_path(company_key, field="keywords_csv"):
+    """競合のCSV（既定はキーワードCSV）のパス（NFD対応）"""
+    return path_resolver().resolve(COMPANIES[company_key][field])
+
+
+def dekitayo_csv_paths():
+    """キーワード調査CSVの (カテゴリ名, アイコン, パス) を存在するものだけ返す"""
+    resolver = path_resolver()
+    paths = []
 
     for cat_name, icon in KEYWORD_CATEGORIES:
-        csv_path = keyword_dir / f"{cat_name}.csv"
+        csv_path = resolver.resolve(f"{KEYWORD_DIR_NAME}/{cat_name}.csv")
+        if csv_path.exists():
+            paths.append((cat_name, icon, csv_path))
 
-        if not csv_path.exists():
-            for p in keyword_dir.glob("*"):
-                if normalize_path(p.stem) == normalize_path(cat_name):
-                    csv_path = p
-                    break
+    return paths
+
+
+def discover_sources():
+    """COMPANIES / KEYWORD_CATEGORIES に無いCSVを探して追加する
+
+    キーワード調査フォルダの未登録CSVは自社のカテゴリに、
+    *キーワード.csv を持つ未登録フォルダは競合になる。
+    戻り値は (追加した企業キー, 追加したカテゴリ名) のリスト。
+    """
+    resolver = path_resolver()
+
+    known_categories = {normalize_path(cat_name) for cat_name, _ in KEYWORD_CATEGORIES}
+    new_categories = []
+    for cat_name, _ in discover_categories(resolver, KEYWORD_DIR_NAME):
+        if cat_name not in known_categories:
+            KEYWORD_CATEGORIES.append((cat_name, DISCOVERED_CATEGORY_ICON))
+            new_categories.append(cat_name)
+
+    known_dirs = {
+        normalize_path(Path(info["keywords_csv"]).parts[0])
+        for info in COMPANIES.values() if info["keywords_csv"]
+    }
+    new_companies = []
+    for found in discover_competitors(resolver, exclude={KEYWORD_DIR_NAME, CACHE_DIR_NAME, REPORT_DIR_NAME}):
+        key = found["dir"]
+        if key in known_dirs or key in COMPANIES:
+            continue
+        COMPANIES[key] = {
+            "name": key,
+            "page_id": f"discovered-{len(new_companies) + 1}",
+            "color": DISCOVERED_COLORS[len(new_companies) % len(DISCOVERED_COLORS)],
+            "icon": DISCOVERED_COMPANY_ICON,
+            "type": "competitor",
+            "keywords_csv": found["keywords_csv"],
+            "pages_csv": found["pages_csv"],
+            "domains_csv": found["domains_csv"],
+        }
+        new_companies.append(key)
+
+    return new_companies, new_categories
+
+
+def load_competitor_keywords(company_key, cache=None):
+    """競合のキーワードデータを読み込む"""
+    return load_keyword_file(competitor_csv_path(company_key), source=company_key, cache=cache)
+
+
+def load_dekitayo_keywords(cache=None):
+    """できたよ！のキーワード調査データを読み込む"""
+    table = KeywordTable()
+    for cat_name, icon, csv_path in dekitayo_csv_paths():
+        table.extend(load_keyword_file(
+            csv_path, category=cat_name, icon=icon, source="できたよ", cache=cache,
+        ))
+    return table
 
-        if csv_path.exists():
-            rows = read_csv_utf16(csv_path)
-            for row in rows:
-                kw = row.get("キーワード", row.get("keyword", ""))
-                vol = row.get("月間検索数", row.get("volume", "0"))
 
+def keyword_sources():
+    """読み込むCSVの一覧を (企業キー, パス, カテゴリ, アイコン) で返す"""
+    sources = []
+    for key, info in COMPANIES.items():
+        if key == "できたよ":
+            for cat_name, icon, csv_path in dekitayo_csv_paths():
+                sources.append((key, csv_path, cat_name, icon))
+        elif info["type"] == "competitor":
+            sources.append((key, competitor_csv_path(key), "", ""))
+    return sources
+
+
+def load_all_keywords(cache=None, jobs=1, profiler=NULL_PROFILER):
+    """全社のキーワードを読み込む
+
+    キャッシュに無いCSVだけをパースし、jobs > 1 ならプロセスプールで並列に処理する。
+    結合順は keyword_sources() の順で固定。
+    戻り値は (all_data, errors) で、errors は {企業キー: [エラー文言, ...]}。
+    """
+    with profiler.span("load: ファイル一覧"):
+        sources = keyword_sources()
+    results = [None] * len(sources)
+    cache_keys = [None] * len(sources)
+    pending = []
+
+    with profiler.span("load: キャッシュ"):
+        for i, (key, csv_path, category, icon) in enumerate(sources):
+            if cache is not None:
+                cache_keys[i] = cache.make_key(csv_path, category, icon, key)
+                results[i] = cache.load(csv_path, cache_keys[i])
+            if results[i] is None:
+                pending.append(i)
+
+    if jobs > 1 and len(pending) > 1:
+        with profiler.span(f"load: パース（{min(jobs, len(pending))}並列）") as section:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(pending))) as pool:
+                futures = [
+                    (i, pool.submit(parse_keyword_file, sources[i][1], sources[i][2], sources[i][3], sources[i][0]))
+                    for i in pending
+                ]
+                for i, future in futures:
+                    try:
+                        results[i] = future.result()
+                    except Exception as e:
+                        results[i] = e
+            section.rows = sum(len(results[i]) for i in pending if not isinstance(results[i], Exception))
+    else:
+        for i in pending:
+            key, csv_path, category, icon = sources[i]
+            with profiler.span(f"load: {key}/{category}" if category else f"load: {key}") as section:
+                try:
+                    results[i] = parse_keyword_file(csv_path, category, icon, key)
+                    section.rows = len(results[i])
+                except Exception as e:
+                    results[i] = e
+
+    all_data = {key: KeywordTable() for key in COMPANIES}
+    errors = {}
+    with profiler.span("load: 結合") as section:
+        for i, ((key, csv_path, category, icon), result) in enumerate(zip(sources, results)):
+            if isinstance(result, Exception):
+                message = f"{category}: {result}" if category else str(result)
+                errors.setdefault(key, []).append(message)
+                continue
+            if cache is not None and i in pending:
+                cache.store(csv_path, cache_keys[i], result)
+            all_data[key].extend(result)
+        section.rows = sum(len(table) for table in all_data.values())
+
+    return all_data, errors
+
+
+def stream_keyword_file(csv_path, key, category="", aggregator=None):
+    """CSV1ファイル分を行を溜めずに StreamAggregator に集計する（プロセスプールからも呼ばれる）
+
+    aggregator を渡すとそこに足し、渡さなければ新しく作って返す。
+    """
+    if aggregator is None:
+        aggregator = StreamAggregator()
+    for row in read_csv_utf16(csv_path, columns=STREAM_COLUMNS, monthly=False):
+        difficulty = parse_int(row.get("SEO難易度", ""), default=None)
+        aggregator.add(key, category, get_keyword(row), get_volume(row), difficulty)
+    return aggregator
+
+
+def stream_all_keywords(jobs=1, profiler=NULL_PROFILER):
+    """全社のキーワードを概算集計する（--stream）
+
+    load_all_keywords と同じCSVを読むが、KeywordTable を作らないので
+    メモリは行数に比例しない。CSVごとに集計して足し合わせ（jobs > 1 ならプロセスプールで）、
+    読めなかったCSVは途中までの行も含めずに errors に入れる。
+    戻り値は (StreamAggregator, errors, CSVの数)。
+    """
+    sources = keyword_sources()
+    aggregator = StreamAggregator()
+    errors = {}
+
+    def collect(source, result):
+        key, _, category, _ = source
+        if isinstance(result, Exception):
+            errors.setdefault(key, []).append(f"{category}: {result}" if category else str(result))
+        else:
+            aggregator.merge(result)
+
+    if jobs > 1 and len(sources) > 1:
+        with profiler.span(f"stream: 集計（{min(jobs, len(sources))}並列）") as section:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(sources))) as pool:
+                futures = [
+                    (source, pool.submit(stream_keyword_file, source[1], source[0], source[2]))
+                    for source in sources
+                ]
+                # 受け取った集計はすぐ足して手放す（スケッチは1つ数MBある）
+                while futures:
+                    source, future = futures.pop(0)
+                    try:
+                        collect(source, future.result())
+                    except Exception as e:
+                        collect(source, e)
+            section.rows = aggregator.rows
+    else:
+        for source in sources:
+            key, csv_path, category, _ = source
+            with profiler.span(f"stream: {key}/{category}" if category else f"stream: {key}") as section:
+                # 途中で失敗したCSVの行を残さないよう、並列のときと同じくCSVごとに集計してから足す
                 try:
-                    vol_int = int(str(vol).replace(",", ""))
-                except:
-                    vol_int = 0
+                    result = stream_keyword_file(csv_path, key, category)
+                    section.rows = result.rows
+                except Exception as e:
+                    result = e
+                collect(source, result)
+
+    return aggregator, errors, len(sources)
 
-                keywords.append({
-                    "keyword": kw,
-                    "volume": vol_int,
-                    "category": cat_name,
-                    "icon": icon,
-                    "source": "できたよ",
-                })
 
-    return keywords
+def load_snapshot_keywords(path):
+    """スナップショットから全社のキーワードを読み込む
+
+    戻り値は load_all_keywords() と同じ (all_data, errors)。
+    スナップショットに無い企業は空のテーブルにし、COMPANIES に無い企業は読み捨てる。
+    """
+    tables = load_snapshot(path)
+    all_data = {}
+    errors = {}
+    for key in COMPANIES:
+        table = tables.get(key)
+        if table is None:
+            table = KeywordTable()
+            errors.setdefault(key, []).append(f"スナップショットにありません: {path}")
+        all_data[key] = table
+    return all_data, errors
+
+
+def rotate_snapshots(all_data):
+    """読み込んだデータを .cache/snapshots/今回.kwsnap に保存する
+
+    内容が前と変わっていれば、それまでの 今回 を 前回 にずらす（同じなら何もしない）。
+    戻り値は 前回 のパス（まだ無ければ None）。
+    """
+    snapshot_dir = BASE_DIR / CACHE_DIR_NAME / SNAPSHOT_DIR_NAME
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    current = snapshot_dir / CURRENT_SNAPSHOT_NAME
+    previous = snapshot_dir / PREVIOUS_SNAPSHOT_NAME
+    fresh = snapshot_dir / f"{CURRENT_SNAPSHOT_NAME}.new"
+    save_snapshot(all_data, fresh)
+    if current.exists() and file_digest(current) == file_digest(fresh):
+        fresh.unlink()
+    else:
+        if current.exists():
+            os.replace(current, previous)
+        os.replace(fresh, current)
+    return previous if previous.exists() else None
+
+
+def parse_percent(value):
+    """「94.16%」を 0.9416 に変換（変換できなければ0）"""
+    try:
+        return float(str(value).rstrip("%").replace(",", "")) / 100
+    except ValueError:
+        return 0.0
+
+
+def parse_page_file(csv_path):
+    """ページCSVをPageTableにする"""
+    pages = PageTable()
+    for row in read_csv_utf16(csv_path, columns=PAGE_COLUMNS):
+        pages.append(
+            row.get("タイトル", ""),
+            row.get("URL", ""),
+            traffic=parse_int(row.get("推定流入数", "0")),
+            keyword_count=parse_int(row.get("キーワード数", "0")),
+            value=parse_int(row.get("価値 ($)", "0")),
+            top_keyword=row.get("トップキーワード", ""),
+        )
+    return pages
+
+
+def parse_domain_file(csv_path):
+    """競合ドメインCSVをDomainTableにする"""
+    domains = DomainTable()
+    for row in read_csv_utf16(csv_path, columns=DOMAIN_COLUMNS):
+        domains.append(
+            row.get("ドメイン名", ""),
+            title=row.get("サイトタイトル", ""),
+            shared=parse_int(row.get("重複", "0")),
+            shared_rate=parse_percent(row.get("重複率", "0")),
+            competitor_only=parse_int(row.get("競合固有", "0")),
+            target_only=parse_int(row.get("調査対象固有", "0")),
+            traffic=parse_int(row.get("推定流入数", "0")),
+            keyword_count=parse_int(row.get("キーワード数", "0")),
+            value=parse_int(row.get("価値 ($)", "0")),
+            pages=parse_int(row.get("ページ数", "0")),
+        )
+    return domains
+
+
+def load_site_data(all_data):
+    """競合ごとにページ・競合ドメインCSVを読み、キーワードと結合する
+
+    戻り値は ({企業キー: SiteData}, errors)。ファイルが無い企業は空のテーブルで結合する。
+    """
+    sites = {}
+    errors = {}
+    for key, info in COMPANIES.items():
+        if info["type"] != "competitor":
+            continue
+        pages = PageTable()
+        domains = DomainTable()
+        pages_path = competitor_csv_path(key, "pages_csv") if info.get("pages_csv") else None
+        domains_path = competitor_csv_path(key, "domains_csv") if info.get("domains_csv") else None
+        try:
+            if pages_path is not None and pages_path.exists():
+                pages = parse_page_file(pages_path)
+            if domains_path is not None and domains_path.exists():
+                domains = parse_domain_file(domains_path)
+        except Exception as e:
+            errors.setdefault(key, []).append(str(e))
+        sites[key] = SiteData(key, all_data[key], pages, domains)
+    return sites, errors
+
+
+def classifier_sources():
+    """分類器の材料: (手作業ラベル（JSON の results）, カテゴリ対応の (用語, カテゴリ) リスト)"""
+    labeled = []
+    json_path = BASE_DIR / CLASSIFICATION_SOURCE
+    if json_path.exists():
+        with open(json_path, encoding='utf-8') as f:
+            labeled = json.load(f).get("results", [])
+    seeds = [
+        (cat_name, CATEGORY_LABELS[cat_name])
+        for cat_name, _ in KEYWORD_CATEGORIES
+        if cat_name in CATEGORY_LABELS
+    ]
+    return labeled, seeds
+
+
+def load_classifier():
+    """手作業ラベル（JSON）とカテゴリ対応から分類器を作る"""
+    labeled, seeds = classifier_sources()
+    return KeywordClassifier.build(labeled=labeled, seeds=seeds)
 
 
 def format_number(n):
@@ -179,10 +664,50 @@ def format_number(n):
     return str(n)
 
 
-def generate_html(all_data):
-    """統合HTMLを生成"""
-
-    html = '''<!DOCTYPE html>
+def table_payload(data, rows, with_category=False):
+    """表示用の列配列（k=キーワード, v=月間検索数, c=カテゴリコード）を作る"""
+    payload = {
+        "k": [data.keywords[i] for i in rows],
+        "v": [data.volume[i] for i in rows],
+    }
+    if with_category:
+        payload["c"] = [data.category[i] for i in rows]
+        payload["cats"] = [list(pair) for pair in zip(data.category_names, data.category_icons)]
+    return payload
+
+
+def write_json_script(out, element_id, payload):
+    """payload を <script type="application/json"> として書き出す"""
+    text = json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+    out.write(f'<script type="application/json" id="{element_id}">')
+    out.write(text.replace("</", "<\\/"))
+    out.write('</script>\n')
+
+
+# 企業ページ以外に追加するページ
+# render(out) がページ本体を書き出し、script はページ末尾の<script>に足すJS
+DashboardPage = namedtuple(
+    "DashboardPage", ["page_id", "icon", "label", "render", "script", "badge"],
+    defaults=("", ""),
+)
+
+
+def write_html(out, all_data, row_limit=ROW_LIMIT, pages=(), dedup=None, profiler=NULL_PROFILER,
+               api_base=None):
+    """統合HTMLを out に書き出す
+
+    out は write() を持つもの（ファイルやStringIO）。文字列を連結せずに
+    セクションごとにそのまま書き出すので、行数に対して線形に伸びる。
+    row_limit は各企業ページの表の最大行数（Noneで全件）。
+    pages は追加ページ（DashboardPage）のリストで、「横断分析」に並ぶ。
+    dedup は自社調査の表記ゆれクラスタ（DedupResult）。渡すとサマリーの
+    カテゴリ別集計をカテゴリ内の重複を除いた値にする。
+    profiler（pipeline_profile.Profiler）を渡すとセクションごとに計測する。
+    api_base を渡すと企業ページの表はデータを埋め込まず、そのURLのAPI（--serve）から読む。
+    """
+
+    with profiler.span("html: ヘッダー・ナビ"):
+        out.write('''<!DOCTYPE html>
 <html lang="ja">
 <head>
     <meta charset="UTF-8">
@@ -241,6 +766,10 @@ def generate_html(all_data):
         th:hover { filter: brightness(1.1); }
         td { padding: 10px 14px; border-bottom: 1px solid #f0f0f0; }
         tr:hover { background: #f8f9fa; }
+        tbody td { white-space: nowrap; }
+        tr.spacer td { padding: 0; border: none; }
+        tr.spacer:hover { background: none; }
+        .result-count { font-size: 12px; color: #999; font-weight: normal; }
 
         .col-no { width: 40px; text-align: center; color: #999; font-size: 11px; }
         .col-kw { min-width: 200px; font-weight: 500; }
@@ -299,7 +828,7 @@ def generate_html(all_data):
                 <div class="nav-title">自社調査</div>
                 <div class="nav-item" onclick="showPage('dekitayo')" style="--accent-color: #FF9F43;">
                     <span class="icon">🎯</span>できたよ！
-                    <span class="badge">''' + str(len(all_data.get("できたよ", []))) + '''</span>
+                    <span class="badge">''' + str(len(all_data.get("できたよ", ()))) + '''</span>
                 </div>
             </div>
 
@@ -307,34 +836,68 @@ def generate_html(all_data):
 
             <div class="nav-section">
                 <div class="nav-title">競合分析</div>
-'''
-
-    # 競合のナビゲーション項目
-    for key, info in COMPANIES.items():
-        if info["type"] == "competitor":
-            count = len(all_data.get(key, []))
-            html += f'''                <div class="nav-item" onclick="showPage('{key}')" style="--accent-color: {info['color']};">
-                    <span class="icon">{info['icon']}</span>{info['name']}
+''')
+
+        # 競合のナビゲーション項目
+        for key, info in COMPANIES.items():
+            if info["type"] == "competitor":
+                count = len(all_data.get(key, ()))
+                out.write(f'''                <div class="nav-item" onclick="showPage('{company_page_id(key)}')" style="--accent-color: {info['color']};">
+                    <span class="icon">{html.escape(info['icon'])}</span>{html.escape(info['name'])}
                     <span class="badge">{count}</span>
                 </div>
-'''
+''')
+
+        out.write('''            </div>
+''')
+
+        # 追加ページのナビゲーション項目
+        if pages:
+            out.write('''
+            <div class="nav-divider"></div>
+
+            <div class="nav-section">
+                <div class="nav-title">横断分析</div>
+''')
+            for page in pages:
+                badge = f'\n                    <span class="badge">{page.badge}</span>' if page.badge else ""
+                out.write(f'''                <div class="nav-item" onclick="showPage('{page.page_id}')" style="--accent-color: #64ffda;">
+                    <span class="icon">{page.icon}</span>{page.label}{badge}
+                </div>
+''')
+            out.write('''            </div>
+''')
 
-    html += '''            </div>
-        </nav>
+        out.write('''        </nav>
     </aside>
 
     <main class="main">
-'''
+''')
 
     # サマリーページ
-    total_keywords = sum(len(v) for v in all_data.values())
-    total_volume = sum(sum(kw["volume"] for kw in v) for v in all_data.values())
-
-    html += f'''        <!-- サマリーページ -->
+    with profiler.span("html: サマリー"):
+        total_keywords = sum(len(v) for v in all_data.values())
+        total_volume = sum(v.total_volume() for v in all_data.values())
+        # 自社調査のカテゴリ間重複を除いた値（dedup が渡されたときだけ表示）
+        dedup_note = ""
+        if dedup is not None:
+            dekitayo_volume = all_data["できたよ"].total_volume()
+            dedup_volume = total_volume - dekitayo_volume + dedup.total_volume()
+            dedup_note = f'''
+                    <div class="sub">自社の重複除外後 {format_number(dedup_volume)}</div>'''
+
+        # 実際に読み込めた（行のある）企業だけを数える
+        loaded = [key for key, table in all_data.items() if len(table)]
+        competitor_count = sum(1 for key in loaded if COMPANIES.get(key, {}).get("type") == "competitor")
+        sources = ["自社調査"] if "できたよ" in loaded else []
+        if competitor_count:
+            sources.append(f"競合{competitor_count}社")
+
+        out.write(f'''        <!-- サマリーページ -->
         <div id="page-overview" class="page active">
             <div class="header-card" style="--primary-color: #667eea; --secondary-color: #764ba2;">
                 <h2>キーワード分析 統合ダッシュボード</h2>
-                <p>自社調査 + 競合5社の分析データを統合</p>
+                <p>{" + ".join(sources) or "読み込めたデータなし"}の分析データを統合</p>
             </div>
 
             <div class="stats-grid">
@@ -344,7 +907,7 @@ def generate_html(all_data):
                 </div>
                 <div class="stat-card">
                     <h4>総月間検索数</h4>
-                    <div class="value">{format_number(total_volume)}</div>
+                    <div class="value">{format_number(total_volume)}</div>{dedup_note}
                 </div>
                 <div class="stat-card">
                     <h4>分析企業数</h4>
@@ -355,61 +918,57 @@ def generate_html(all_data):
             <div class="summary-grid">
                 <div class="summary-card" style="--accent-color: #FF9F43;">
                     <h3>🎯 自社調査（できたよ！）</h3>
-'''
-
-    # できたよのカテゴリ別集計
-    dekitayo_data = all_data.get("できたよ", [])
-    category_counts = {}
-    for kw in dekitayo_data:
-        cat = kw.get("category", "その他")
-        if cat not in category_counts:
-            category_counts[cat] = {"count": 0, "volume": 0}
-        category_counts[cat]["count"] += 1
-        category_counts[cat]["volume"] += kw["volume"]
-
-    for cat, data in sorted(category_counts.items(), key=lambda x: x[1]["volume"], reverse=True)[:8]:
-        html += f'''                    <div class="item">
-                        <span class="label">{cat}</span>
+''')
+
+        # できたよのカテゴリ別集計
+        dekitayo_data = all_data.get("できたよ", KeywordTable())
+        if dedup is not None:
+            category_counts = dedup.category_totals()
+        else:
+            category_counts = dekitayo_data.category_totals()
+
+        for cat, data in sorted(category_counts.items(), key=lambda x: x[1]["volume"], reverse=True)[:8]:
+            out.write(f'''                    <div class="item">
+                        <span class="label">{html.escape(cat)}</span>
                         <span class="value">{data["count"]:,}件 / {format_number(data["volume"])}</span>
                     </div>
-'''
+''')
 
-    html += '''                </div>
+        out.write('''                </div>
 
                 <div class="summary-card" style="--accent-color: #667eea;">
                     <h3>🔍 競合分析</h3>
-'''
-
-    # 競合の集計
-    for key, info in COMPANIES.items():
-        if info["type"] == "competitor":
-            comp_data = all_data.get(key, [])
-            comp_volume = sum(kw["volume"] for kw in comp_data)
-            html += f'''                    <div class="item">
-                        <span class="label">{info["icon"]} {info["name"]}</span>
+''')
+
+        # 競合の集計
+        for key, info in COMPANIES.items():
+            if info["type"] == "competitor":
+                comp_data = all_data.get(key, KeywordTable())
+                comp_volume = comp_data.total_volume()
+                out.write(f'''                    <div class="item">
+                        <span class="label">{html.escape(info["icon"])} {html.escape(info["name"])}</span>
                         <span class="value">{len(comp_data):,}件 / {format_number(comp_volume)}</span>
                     </div>
-'''
+''')
 
-    html += '''                </div>
+        out.write('''                </div>
             </div>
         </div>
-'''
+''')
 
     # 各企業のページ
     for key, info in COMPANIES.items():
-        data = all_data.get(key, [])
-        total_vol = sum(kw["volume"] for kw in data)
-        page_id = key
-
-        if key == "できたよ":
-            page_id = "dekitayo"
-
-        html += f'''
-        <!-- {info["name"]}ページ -->
+        with profiler.span(f"html: {info['name']}") as section:
+            data = all_data.get(key, KeywordTable())
+            total_vol = data.total_volume()
+            page_id = company_page_id(key)
+            name = html.escape(info["name"])
+
+            out.write(f'''
+        <!-- {name}ページ -->
         <div id="page-{page_id}" class="page">
             <div class="header-card" style="--primary-color: {info['color']}; --secondary-color: {info['color']};">
-                <h2>{info['icon']} {info["name"]} キーワード分析</h2>
+                <h2>{html.escape(info['icon'])} {name} キーワード分析</h2>
                 <p>{len(data):,}キーワード / 月間検索数 {format_number(total_vol)}</p>
             </div>
 
@@ -426,52 +985,58 @@ def generate_html(all_data):
 
             <div class="table-container">
                 <div class="table-header">
-                    <h3>キーワード一覧</h3>
-                    <input type="text" class="search-box" placeholder="キーワードを検索..." onkeyup="filterTable(this, '{page_id}')">
+                    <h3>キーワード一覧 <span class="result-count" id="count-{page_id}"></span></h3>
+                    <input type="text" class="search-box" placeholder="キーワードを検索..." oninput="filterTable(this, '{page_id}')">
                 </div>
-                <div class="table-wrapper">
+                <div class="table-wrapper" id="wrap-{page_id}">
                     <table id="table-{page_id}">
                         <thead>
                             <tr>
                                 <th class="col-no">#</th>
                                 <th onclick="sortTable('{page_id}', 1)">キーワード</th>
                                 <th onclick="sortTable('{page_id}', 2)">月間検索数</th>
-'''
+''')
 
-        if key == "できたよ":
-            html += '''                                <th>カテゴリ</th>
-'''
+            if key == "できたよ":
+                out.write('''                                <th>カテゴリ</th>
+''')
 
-        html += '''                            </tr>
+            out.write('''                            </tr>
                         </thead>
-                        <tbody>
-'''
-
-        # データ行（上位500件）
-        sorted_data = sorted(data, key=lambda x: x["volume"], reverse=True)[:500]
-        for i, kw in enumerate(sorted_data, 1):
-            html += f'''                            <tr>
-                                <td class="col-no">{i}</td>
-                                <td class="col-kw">{kw["keyword"]}</td>
-                                <td class="col-vol">{kw["volume"]:,}</td>
-'''
-            if key == "できたよ":
-                cat = kw.get("category", "")
-                icon = kw.get("icon", "")
-                html += f'''                                <td><span class="badge badge-cat">{icon} {cat}</span></td>
-'''
-            html += '''                            </tr>
-'''
-
-        html += '''                        </tbody>
+                        <tbody></tbody>
                     </table>
                 </div>
             </div>
-        </div>
-'''
+''')
+
+            # データは配列のJSONで埋め込み、表示中の行だけをJSで描画する
+            if api_base is not None:
+                # API版は表の設定だけを置き、行は表示時にAPIから取る
+                write_json_script(out, f"data-{page_id}", {"company": key, "cats": key == "できたよ"})
+            else:
+                rows = data.top(row_limit)
+                section.rows = len(rows)
+                write_json_script(out, f"data-{page_id}", table_payload(
+                    data, rows, with_category=(key == "できたよ"),
+                ))
+
+            out.write('''        </div>
+''')
+
+    # 追加ページ
+    for page in pages:
+        with profiler.span(f"html: {page.label}"):
+            out.write(f'''
+        <!-- {page.label}ページ -->
+        <div id="page-{page.page_id}" class="page">
+''')
+            page.render(out)
+            out.write('''        </div>
+''')
 
     # JavaScript
-    html += '''
+    with profiler.span("html: スクリプト"):
+        out.write('''
     </main>
 </div>
 
@@ -488,88 +1053,680 @@ function showPage(pageId) {
 
     // ナビアイテムをアクティブに
     event.target.closest('.nav-item').classList.add('active');
+
+    // 表は表示されてから高さが決まるのでここで描画
+    const t = getTable(pageId);
+    if (t) renderTable(t);
 }
 
-function filterTable(input, tableId) {
-    const filter = input.value.toLowerCase();
-    const table = document.getElementById('table-' + tableId);
-    const rows = table.getElementsByTagName('tr');
-
-    for (let i = 1; i < rows.length; i++) {
-        const cells = rows[i].getElementsByTagName('td');
-        let found = false;
-        for (let j = 0; j < cells.length; j++) {
-            if (cells[j].textContent.toLowerCase().includes(filter)) {
-                found = true;
-                break;
-            }
-        }
-        rows[i].style.display = found ? '' : 'none';
-    }
+
+// ===== 仮想スクロール表 =====
+// 各ページのキーワードは <script type="application/json"> に配列で入っている。
+// 初めて表示したときにパースし、見えている範囲の行だけを描画する。
+const OVERSCAN = 20;
+const FILTER_DELAY = 150;
+const collator = new Intl.Collator('ja');
+const tables = {};
+
+function esc(s) {
+    return String(s).replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;');
 }
 
-function sortTable(tableId, colIndex) {
-    const table = document.getElementById('table-' + tableId);
-    const tbody = table.querySelector('tbody');
-    const rows = Array.from(tbody.querySelectorAll('tr'));
+function getTable(pageId) {
+    if (tables[pageId]) return tables[pageId];
+    const el = document.getElementById('data-' + pageId);
+    if (!el) return null;
+
+    const data = JSON.parse(el.textContent);
+    const order = new Int32Array(data.k.length);
+    for (let i = 0; i < order.length; i++) order[i] = i;
+
+    const t = {
+        pageId: pageId,
+        data: data,
+        lower: data.k.map(k => k.toLowerCase()),
+        catLower: data.cats ? data.cats.map(c => c[0].toLowerCase()) : null,
+        order: order,
+        view: order,
+        query: '',
+        sortCol: 0,
+        sortDir: 1,
+        rowHeight: 37,
+        wrapper: document.getElementById('wrap-' + pageId),
+        tbody: document.querySelector('#table-' + pageId + ' tbody'),
+        colCount: data.cats ? 4 : 3,
+        scheduled: false,
+        filterTimer: null,
+    };
+    t.wrapper.addEventListener('scroll', () => scheduleRender(t));
+    tables[pageId] = t;
+    return t;
+}
+
+function scheduleRender(t) {
+    if (t.scheduled) return;
+    t.scheduled = true;
+    requestAnimationFrame(() => renderTable(t));
+}
+
+function spacerRow(t, height) {
+    return '<tr class="spacer"><td colspan="' + t.colCount + '" style="height:' + height + 'px"></td></tr>';
+}
 
-    const isNumeric = colIndex === 2;
-    const direction = table.dataset.sortDir === 'asc' ? -1 : 1;
-    table.dataset.sortDir = direction === 1 ? 'asc' : 'desc';
+function renderTable(t) {
+    t.scheduled = false;
+    const d = t.data;
+    const total = t.view.length;
+    const viewport = t.wrapper.clientHeight || 600;
+    const start = Math.max(0, Math.floor(t.wrapper.scrollTop / t.rowHeight) - OVERSCAN);
+    const end = Math.min(total, start + Math.ceil(viewport / t.rowHeight) + OVERSCAN * 2);
+
+    const parts = [spacerRow(t, start * t.rowHeight)];
+    for (let i = start; i < end; i++) {
+        const r = t.view[i];
+        let row = '<tr><td class="col-no">' + (r + 1) + '</td><td class="col-kw">' + esc(d.k[r])
+            + '</td><td class="col-vol">' + d.v[r].toLocaleString('en-US') + '</td>';
+        if (d.cats) {
+            const c = d.cats[d.c[r]];
+            row += '<td><span class="badge badge-cat">' + esc(c[1] + ' ' + c[0]) + '</span></td>';
+        }
+        parts.push(row + '</tr>');
+    }
+    parts.push(spacerRow(t, (total - end) * t.rowHeight));
+    t.tbody.innerHTML = parts.join('');
+
+    // 実際の行の高さで補正
+    const first = t.tbody.rows[1];
+    if (first && first.offsetHeight && first.offsetHeight !== t.rowHeight && end > start) {
+        t.rowHeight = first.offsetHeight;
+        scheduleRender(t);
+    }
 
-    rows.sort((a, b) => {
-        let aVal = a.cells[colIndex].textContent;
-        let bVal = b.cells[colIndex].textContent;
+    const count = document.getElementById('count-' + t.pageId);
+    if (count) count.textContent = '(' + total.toLocaleString('en-US') + '件)';
+}
 
-        if (isNumeric) {
-            aVal = parseInt(aVal.replace(/,/g, '')) || 0;
-            bVal = parseInt(bVal.replace(/,/g, '')) || 0;
-            return (aVal - bVal) * direction;
+function applyFilter(t) {
+    const q = t.query;
+    if (!q) {
+        t.view = t.order;
+    } else {
+        const hits = [];
+        const lower = t.lower, catLower = t.catLower, codes = t.data.c;
+        for (let i = 0; i < t.order.length; i++) {
+            const r = t.order[i];
+            if (lower[r].includes(q) || (catLower && catLower[codes[r]].includes(q))) hits.push(r);
         }
-        return aVal.localeCompare(bVal, 'ja') * direction;
-    });
+        t.view = Int32Array.from(hits);
+    }
+    t.wrapper.scrollTop = 0;
+    renderTable(t);
+}
 
-    rows.forEach(row => tbody.appendChild(row));
+function filterTable(input, pageId) {
+    const t = getTable(pageId);
+    if (!t) return;
+    clearTimeout(t.filterTimer);
+    t.filterTimer = setTimeout(() => {
+        t.query = input.value.trim().toLowerCase();
+        applyFilter(t);
+    }, FILTER_DELAY);
 }
-</script>
+
+function sortTable(pageId, colIndex) {
+    const t = getTable(pageId);
+    if (!t) return;
+    t.sortDir = (t.sortCol === colIndex && t.sortDir === 1) ? -1 : 1;
+    t.sortCol = colIndex;
+
+    const d = t.data, dir = t.sortDir;
+    const cmp = colIndex === 2
+        ? (a, b) => (d.v[a] - d.v[b]) * dir
+        : (a, b) => collator.compare(d.k[a], d.k[b]) * dir;
+    t.order = Int32Array.from(t.order).sort(cmp);
+    applyFilter(t);
+}
+''')
+
+        for page in pages:
+            if page.script:
+                out.write(page.script)
+
+        if api_base is not None:
+            out.write(f"const KEYWORD_API = {json.dumps(api_base)};\n")
+            out.write(API_CLIENT_SCRIPT)
+
+        out.write('''</script>
 </body>
 </html>
-'''
-
-    return html
+''')
+
+
+def generate_html(all_data, row_limit=ROW_LIMIT, pages=(), dedup=None, profiler=NULL_PROFILER,
+                  api_base=None):
+    """統合HTMLを文字列で返す"""
+    buf = io.StringIO()
+    write_html(buf, all_data, row_limit=row_limit, pages=pages, dedup=dedup, profiler=profiler,
+               api_base=api_base)
+    return buf.getvalue()
+
+
+def report_names():
+    """--reports に指定できる名前（dashboard が先頭）"""
+    return ["dashboard"] + [r.name for r in STANDARD_RENDERERS]
+
+
+def select_reports(text):
+    """--reports の値を名前のリストにする（未知の名前は ValueError）"""
+    names = report_names()
+    selected = [name.strip() for name in text.split(",") if name.strip()]
+    if "all" in selected:
+        return names
+    unknown = [name for name in selected if name not in names]
+    if unknown:
+        raise ValueError(f"不明なレポート: {', '.join(unknown)}（{', '.join(names)}, all）")
+    if not selected:
+        raise ValueError("--reports にレポート名を指定してください")
+    return [name for name in names if name in selected]
+
+
+def existing_reports():
+    """BASE_DIR 以下に置いてある手作りのレポート [(ラベル, 実パス)]（ポータルのリンク用）"""
+    resolver = path_resolver()
+    found = []
+    for dir_name, dir_path in resolver.listdir():
+        if dir_name.startswith((".", "_")) or dir_name == REPORT_DIR_NAME or not dir_path.is_dir():
+            continue
+        for name, path in resolver.listdir(dir_name):
+            if name.endswith(EXISTING_REPORT_SUFFIXES):
+                found.append((f"{dir_name} / {name[:-5]}", path))
+    index = resolver.resolve("index.html")
+    if index.is_file():
+        found.append(("ポータル（手作り）", index))
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="全社のキーワード分析データを1つのHTMLに統合")
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help=f"変更のないCSVと集計結果は {CACHE_DIR_NAME} のキャッシュから読み込む（キャッシュの保存もこのときだけ）",
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=1, metavar="N",
+        help="CSVのパースをN並列で行う（0でCPU数）",
+    )
+    parser.add_argument(
+        "--rows", type=int, default=0, metavar="N",
+        help="企業ページの表に出す行数（月間検索数の上位N件、0で全件）",
+    )
+    parser.add_argument(
+        "--overlap", action="store_true",
+        help="企業間の重複・ギャップを集計し、重複・ギャップページを加える",
+    )
+    parser.add_argument(
+        "--overlap-csv", action="store_true",
+        help=f"重複・ギャップ分析を {OVERLAP_CSV_NAME} / {GAP_CSV_NAME} にも書き出す（--overlap を含む）",
+    )
+    parser.add_argument(
+        "--trends", action="store_true",
+        help="月別検索数から傾き・伸び率・季節性・スパイクを求め、トレンドページを加える",
+    )
+    parser.add_argument(
+        "--pages", action="store_true",
+        help="競合のページCSV・競合ドメインCSVを読んでキーワードと結合し、ページ・ドメインページを加える",
+    )
+    parser.add_argument(
+        "--dedup", action="store_true",
+        help="自社調査の表記ゆれ（空白・カナ・助詞の違い）とカテゴリ間の重複をまとめ、表記ゆれページと重複除外後の合計を加える",
+    )
+    parser.add_argument(
+        "--classify", action="store_true",
+        help="全キーワードをカテゴリ・ターゲット・CV距離に分類し、分類ページを加える",
+    )
+    parser.add_argument(
+        "--classification-json", action="store_true",
+        help=f"全キーワードの分類を {CLASSIFICATION_JSON_NAME} にも書き出す（--classify を含む）",
+    )
+    parser.add_argument(
+        "--classification-eval", action="store_true",
+        help=f"手作業ラベルとの一致率を{HOLDOUT_FOLDS}分割の交差検証で表示する（評価する語は辞書から除く。--classify を含む）",
+    )
+    parser.add_argument(
+        "--scores", action="store_true",
+        help="全社共通の尺度で狙い目スコアを計算し、狙い目ページを加える",
+    )
+    parser.add_argument(
+        "--weights", default="", metavar="NAME=W,...",
+        help="狙い目スコアの重み（volume, difficulty, cpc, competition, traffic, rank。0以上、--scores を含む）",
+    )
+    parser.add_argument(
+        "--snapshot", metavar="PATH",
+        help="CSVの代わりにスナップショット（--save-snapshot で作ったもの）から読み込む",
+    )
+    parser.add_argument(
+        "--save-snapshot", metavar="PATH",
+        help="読み込んだキーワードデータをスナップショットに書き出す",
+    )
+    parser.add_argument(
+        "--diff", nargs="?", const="", metavar="SNAPSHOT",
+        help="前回のエクスポート（省略時は .cache の 前回 スナップショット）との変化ページを加える。"
+             "スナップショットは --diff をつけた実行でだけ .cache に保存・更新する",
+    )
+    parser.add_argument(
+        "--discover", action="store_true",
+        help=f"{KEYWORD_DIR_NAME} の未登録CSVと、*キーワード.csv を持つ未登録フォルダも読み込む",
+    )
+    parser.add_argument(
+        "--search", action="store_true",
+        help=f"横断検索インデックスを {SEARCH_INDEX_NAME} に書き出し、横断検索ページを加える",
+    )
+    parser.add_argument(
+        "--posts", metavar="EXPORT",
+        help=f"WordPressのエクスポート（WXRの.xml / GraphQLの.json）と突き合わせ、{ARTICLE_COVERAGE_NAME} と記事カバレッジページを加える",
+    )
+    parser.add_argument(
+        "--stream", action="store_true",
+        help=f"全行をメモリに載せずに概算集計し、{STREAM_HTML_NAME} だけを書き出す（巨大なエクスポート向け）",
+    )
+    parser.add_argument(
+        "--serve", type=int, metavar="PORT",
+        help="HTMLを書き出す代わりに、問い合わせAPIとAPI版ダッシュボードをPORTで配信する",
+    )
+    parser.add_argument(
+        "--host", default=SERVE_HOST,
+        help=f"--serve で待ち受けるアドレス（既定 {SERVE_HOST}）",
+    )
+    parser.add_argument(
+        "--reports", default="dashboard", metavar="NAME,...",
+        help=f"書き出すレポート（{', '.join(report_names())}、all で全部。既定は dashboard のみ）。"
+             "狙い目・分類などは --scores / --classify 等で集計したときだけ載せる",
+    )
+    parser.add_argument(
+        "--report-dir", metavar="DIR",
+        help=f"dashboard 以外のレポートの書き出し先（既定 {REPORT_DIR_NAME}）",
+    )
+    parser.add_argument(
+        "--report-jobs", type=int, default=0, metavar="N",
+        help="レポートをN並列で書き出す（0でレポート数）",
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help=f"段階ごとの経過時間・CPU時間・行/秒を表示し、{PROFILE_JSON_NAME} にも書き出す",
+    )
+    parser.add_argument(
+        "--profile-memory", action="store_true",
+        help="--profile に tracemalloc のピークを加える（遅くなる）",
+    )
+    parser.add_argument(
+        "--profile-dump", metavar="PATH",
+        help="cProfile の結果を PATH に書き出す（pstats / snakeviz で読める）",
+    )
+    args = parser.parse_args(argv)
 
+    try:
+        weights = parse_weights(args.weights)
+        args.reports = select_reports(args.reports)
+    except ValueError as e:
+        parser.error(str(e))
+
+    profiler = NULL_PROFILER
+    if args.profile or args.profile_memory:
+        profiler = Profiler(trace_memory=args.profile_memory)
+
+    if args.profile_dump:
+        import cProfile
+        with cProfile.Profile() as prof:
+            run(args, weights, profiler)
+        prof.dump_stats(args.profile_dump)
+        print(f"cProfile: {args.profile_dump}")
+    else:
+        run(args, weights, profiler)
+
+    if profiler.enabled:
+        profile_file = OUTPUT_FILE.with_name(PROFILE_JSON_NAME)
+        profiler.save(profile_file)
+        print("\n" + profiler.report())
+        print(f"    → {profile_file}")
+
+
+def run(args, weights, profiler=NULL_PROFILER):
+    """読み込みからHTML書き出しまでの各段階を実行する"""
+    # キャッシュの読み書きは --incremental のときだけ（通常実行は .cache に pickle を書かない）
+    cache = None
+    if args.incremental:
+        cache = KeywordCache(BASE_DIR / CACHE_DIR_NAME, source=source_digest(*PARSE_SOURCES))
+
+    jobs = args.jobs or os.cpu_count() or 1
+
+    if args.discover:
+        print("CSVを探索中...")
+        with profiler.span("探索"):
+            new_companies, new_categories = discover_sources()
+        for key in new_companies:
+            print(f"    → 競合を追加: {key}")
+        for cat_name in new_categories:
+            print(f"    → カテゴリを追加: {cat_name}")
+
+    if args.stream:
+        run_stream(jobs, profiler)
+        return
 
-def main():
     print("キーワードデータを読み込み中...")
 
-    all_data = {}
-
-    # できたよ！のデータを読み込み
-    print("  - できたよ！（自社調査）")
-    all_data["できたよ"] = load_dekitayo_keywords()
-    print(f"    → {len(all_data['できたよ']):,}件")
+    with profiler.span("読み込み") as section:
+        if args.snapshot:
+            all_data, errors = load_snapshot_keywords(args.snapshot)
+        else:
+            all_data, errors = load_all_keywords(cache=cache, jobs=jobs, profiler=profiler)
+        section.rows = sum(len(v) for v in all_data.values())
+    path_resolver().save()
 
-    # 競合データを読み込み
     for key, info in COMPANIES.items():
-        if info["type"] == "competitor":
+        if key == "できたよ":
+            print("  - できたよ！（自社調査）")
+        else:
             print(f"  - {info['name']}")
+        for message in errors.get(key, []):
+            print(f"    → エラー: {message}")
+        if key not in errors or info["type"] == "self":
+            print(f"    → {len(all_data[key]):,}件")
+
+    if args.snapshot:
+        print(f"  スナップショットから読み込み: {args.snapshot}")
+    elif args.incremental:
+        print(f"  キャッシュ: {cache.hits}件再利用 / {cache.misses}件再解析")
+
+    if args.save_snapshot:
+        with profiler.span("スナップショット書き出し"):
+            try:
+                save_snapshot(all_data, args.save_snapshot)
+                print(f"  スナップショット: {args.save_snapshot}")
+            except OSError as e:
+                print(f"  スナップショットを保存できませんでした: {e}")
+
+    # --diff のときだけ、次回の比較用に読み込んだデータをスナップショットとして残す
+    baseline = None
+    if args.diff is not None and not args.snapshot:
+        with profiler.span("スナップショット更新"):
             try:
-                all_data[key] = load_competitor_keywords(key)
-                print(f"    → {len(all_data[key]):,}件")
-            except Exception as e:
-                print(f"    → エラー: {e}")
-                all_data[key] = []
-
-    # HTML生成
-    print("\n統合HTMLを生成中...")
-    html = generate_html(all_data)
-
-    # 出力
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        f.write(html)
-
-    print(f"\n完了: {OUTPUT_FILE}")
-    print(f"総キーワード数: {sum(len(v) for v in all_data.values()):,}件")
+                baseline = rotate_snapshots(all_data)
+            except OSError as e:
+                print(f"  スナップショットを保存できませんでした: {e}")
+    if args.diff:
+        baseline = Path(args.diff)
+
+    companies = [(key, info["name"], info["icon"]) for key, info in COMPANIES.items()]
+    total_rows = sum(len(v) for v in all_data.values())
+
+    # 以降の集計は読み込んだCSVが前回と同じなら .cache/analysis から再利用する
+    fingerprint = None
+    if cache is not None and not args.snapshot:
+        fingerprint = cache.fingerprint(order=[(key, category) for key, _, category, _ in keyword_sources()])
+    analysis = AnalysisCache(BASE_DIR / CACHE_DIR_NAME, fingerprint, all_data, reuse=args.incremental)
+
+    # 横断検索インデックス（ダッシュボードと同じ場所にサイドカーで置く。記事との突き合わせにも使う）
+    index = index_file = None
+    if args.search or args.posts:
+        print("\n検索インデックスを作成中...")
+        with profiler.span("検索インデックス", rows=total_rows):
+
+            def build_index():
+                index = KeywordIndex.build(all_data, companies)
+                return index, index.dumps()
+
+            index, index_text = analysis.get("index", build_index, companies)
+            if args.search:
+                index_file = OUTPUT_FILE.with_name(SEARCH_INDEX_NAME)
+                index.save(index_file, index_text)
+        print(f"    → {len(index):,}語 / bigram {len(index.postings):,}種" + (f": {index_file}" if index_file else ""))
+
+    # 公開済み記事との突き合わせ
+    coverage = None
+    if args.posts:
+        print("記事とキーワードを突き合わせ中...")
+        try:
+            posts = load_posts(args.posts)
+        except (OSError, ValueError) as e:
+            print(f"    → エラー: {e}")
+        else:
+            with profiler.span("記事カバレッジ", rows=len(index)):
+                coverage = ArticleCoverage(index, posts)
+                coverage_file = OUTPUT_FILE.with_name(ARTICLE_COVERAGE_NAME)
+                coverage.save(coverage_file)
+            print(f"    → {len(posts):,}記事 / 記事あり{len(coverage.covered):,}語 / 記事なし{coverage.uncovered:,}語: {coverage_file}")
+
+    # 重複・ギャップ分析
+    overlap = None
+    if args.overlap or args.overlap_csv:
+        print("重複・ギャップを集計中...")
+        with profiler.span("重複・ギャップ", rows=total_rows):
+            overlap = analysis.get("overlap", lambda: compute_overlap(all_data, companies, "できたよ"), companies)
+            if args.overlap_csv:
+                pairs_file = OUTPUT_FILE.with_name(OVERLAP_CSV_NAME)
+                gaps_file = OUTPUT_FILE.with_name(GAP_CSV_NAME)
+                export_overlap_csv(overlap, pairs_file, gaps_file)
+                print(f"    → {pairs_file}")
+                print(f"    → {gaps_file}")
+
+    # 月別検索数のトレンド（月別列のあるデータのみ）
+    trend_metrics = None
+    if args.trends:
+        print("トレンドを計算中...")
+        with profiler.span("トレンド", rows=total_rows):
+            trend_metrics = analysis.get(
+                "trends", lambda: {key: compute_trends(table) for key, table in all_data.items() if table.months},
+            )
+            trends = [
+                (info["name"], info["icon"], trend_metrics[key])
+                for key, info in COMPANIES.items()
+                if key in trend_metrics
+            ]
+
+    # 競合のページ・競合ドメインを読み込んでキーワードと結合
+    sites = None
+    if args.pages:
+        print("ページ・競合ドメインを結合中...")
+        with profiler.span("ページ・ドメイン"):
+            sites, site_errors = load_site_data(all_data)
+        for key, messages in site_errors.items():
+            for message in messages:
+                print(f"    → {COMPANIES[key]['name']}: エラー: {message}")
+        for key, site in sites.items():
+            print(f"    → {COMPANIES[key]['name']}: {len(site.pages):,}ページ / 競合{len(site.domains):,}ドメイン / 結合{site.joined():,}件")
+
+    # 狙い目スコア（全社共通の尺度で1パス）
+    scoring = None
+    if args.scores or args.weights:
+        print("狙い目スコアを計算中...")
+        with profiler.span("狙い目スコア", rows=total_rows):
+            scoring = analysis.get("scoring", lambda: score_keywords(all_data, weights), weights)
+
+    # 全キーワードの分類（--incremental なら結果をキーワードハッシュ単位でキャッシュ）
+    classification = None
+    if args.classify or args.classification_json or args.classification_eval:
+        print("キーワードを分類中...")
+        with profiler.span("分類", rows=total_rows):
+            classifier = load_classifier()
+            cache_path = BASE_DIR / CACHE_DIR_NAME / CLASSIFICATION_CACHE_NAME if cache is not None else None
+            codes = analysis.get(
+                "classification", lambda: classify_tables(classifier, all_data, cache_path).codes, classifier.digest,
+            )
+            classification = Classification(classifier, codes)
+        print(f"    → 用語{len(classifier.automaton.terms):,}語 / カテゴリ{len(classifier.labels['category']):,}種")
+        if args.classification_eval:
+            labeled, seeds = classifier_sources()
+            titles = {"category": "カテゴリ", "target": "ターゲット", "cv_distance": "CV距離"}
+            agreement = holdout_agreement(labeled, seeds)
+            print(f"    → 手作業ラベルとの一致率（{HOLDOUT_FOLDS}分割交差検証）: " + " / ".join(
+                f"{titles[dim]} {agree / total:.1%}" for dim, (agree, total) in agreement.items() if total
+            ))
+        if args.classification_json:
+            classification_file = OUTPUT_FILE.with_name(CLASSIFICATION_JSON_NAME)
+            export_classification_json(classification, all_data, classification_file)
+            print(f"    → {classification_file}")
+
+    # 前回のエクスポートからの変化
+    diffs = None
+    if args.diff is not None:
+        print("前回からの変化を集計中...")
+        if baseline is not None and baseline.exists():
+            with profiler.span("前回との差分", rows=total_rows):
+                diffs = diff_keywords(load_snapshot(baseline), all_data)
+            added = sum(len(d.added) for d in diffs.values())
+            lost = sum(len(d.lost) for d in diffs.values())
+            print(f"    → 新規{added:,}件 / 消失{lost:,}件（前回: {baseline}）")
+        else:
+            print("    → 比較できる前回のスナップショットがありません")
+
+    # 自社調査の表記ゆれ・カテゴリ間重複
+    dedup = None
+    if args.dedup:
+        print("表記ゆれをクラスタリング中...")
+        with profiler.span("表記ゆれ", rows=len(all_data["できたよ"])):
+            dedup = analysis.get("dedup", lambda: cluster_keywords(all_data["できたよ"]))
+        print(f"    → {len(all_data['できたよ']):,}行 → {len(dedup.clusters):,}クラスタ")
+    if analysis.hits:
+        print(f"  集計キャッシュ: {', '.join(analysis.hits)} を再利用")
+
+    pages = []
+    if scoring is not None:
+        pages.append(DashboardPage(
+            "scoring", "🎯", "狙い目",
+            render=lambda out: render_scoring_page(out, scoring, all_data, companies, "できたよ"),
+        ))
+    if index_file is not None:
+        pages.append(DashboardPage(
+            "search", "🔎", "横断検索",
+            render=lambda out: render_search_page(out, index_file.name),
+            script=SEARCH_SCRIPT,
+        ))
+    if overlap is not None:
+        pages.append(DashboardPage(
+            "overlap", "🧮", "重複・ギャップ",
+            render=lambda out: render_overlap_page(out, overlap),
+        ))
+    if trend_metrics is not None:
+        pages.append(DashboardPage(
+            "trends", "📈", "トレンド",
+            render=lambda out: render_trend_page(out, trends),
+        ))
+    if sites is not None:
+        pages.append(DashboardPage(
+            "pages", "🌐", "ページ・ドメイン",
+            render=lambda out: render_pages_page(out, sites, companies),
+        ))
+    if classification is not None:
+        pages.append(DashboardPage(
+            "classification", "🏷️", "分類",
+            render=lambda out: render_classification_page(out, classification, companies),
+        ))
+    if dedup is not None:
+        pages.append(DashboardPage(
+            "dedup", "🧬", "表記ゆれ",
+            render=lambda out: render_dedup_page(out, dedup),
+        ))
+    if args.diff is not None:
+        pages.append(DashboardPage(
+            "changes", "🆕", "前回からの変化",
+            render=lambda out: render_diff_page(
+                out, diffs, companies, baseline=str(baseline) if diffs is not None else "",
+            ),
+        ))
+
+    if coverage is not None:
+        pages.append(DashboardPage(
+            "articles", "📝", "記事カバレッジ",
+            render=lambda out: render_article_page(out, coverage, source=str(args.posts)),
+        ))
+
+    if args.serve is not None:
+        serve(args, all_data, companies, pages, dedup, index_file)
+        return
+
+    context = ReportContext(
+        all_data, companies, Path(args.report_dir) if args.report_dir else BASE_DIR / REPORT_DIR_NAME,
+        "できたよ", colors={key: info["color"] for key, info in COMPANIES.items()},
+        scoring=scoring, classification=classification, overlap=overlap, sites=sites,
+        trends=trend_metrics, dedup=dedup,
+        links=existing_reports(),
+    )
+
+    # HTML生成（集計済みの結果を各レポートで共有し、並行に書き出す）
+    print("\nHTMLを生成中..." if args.reports == ["dashboard"] else "\nレポートを生成中...")
+    row_limit = args.rows or None
+    # Profiler はスレッドをまたいで使えないので、段階ごとの内訳は dashboard だけのときに取る
+    dashboard_profiler = profiler if args.reports == ["dashboard"] else NULL_PROFILER
+
+    def render_dashboard(context):
+        with open(OUTPUT_FILE, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+            write_html(f, context.all_data, row_limit=row_limit, pages=pages, dedup=context.dedup,
+                       profiler=dashboard_profiler)
+        return [OUTPUT_FILE]
+
+    renderers = {r.name: r for r in STANDARD_RENDERERS}
+    renderers["dashboard"] = ReportRenderer("dashboard", "統合ダッシュボード", render_dashboard)
+    with profiler.span("HTML書き出し"):
+        results = run_renderers([renderers[name] for name in args.reports], context, jobs=args.report_jobs)
+
+    failed = False
+    for renderer, paths, seconds, error in results:
+        if error is not None:
+            failed = True
+            print(f"  - {renderer.label}: エラー: {error}")
+            continue
+        if len(results) > 1:
+            print(f"  - {renderer.label}: {len(paths)}ファイル（{seconds:.2f}秒）")
+        for path in paths:
+            print(f"    → {path}")
+
+    print(f"\n{'一部のレポートでエラー' if failed else '完了'}: {OUTPUT_FILE}")
+    print(f"総キーワード数: {total_rows:,}件")
+
+
+def run_stream(jobs, profiler=NULL_PROFILER):
+    """--stream: CSVを1行ずつ概算集計して概算レポートだけを書き出す"""
+    print("キーワードデータを概算集計中（ストリーム）...")
+    with profiler.span("概算集計") as section:
+        aggregator, errors, sources = stream_all_keywords(jobs=jobs, profiler=profiler)
+        section.rows = aggregator.rows
+    path_resolver().save()
+
+    for key, info in COMPANIES.items():
+        print(f"  - {info['name']}")
+        for message in errors.get(key, []):
+            print(f"    → エラー: {message}")
+        stream = aggregator.companies.get(key)
+        if stream is not None:
+            print(f"    → {stream.totals().count:,}件")
+
+    companies = [(key, info["name"], info["icon"]) for key, info in COMPANIES.items()]
+    stream_file = OUTPUT_FILE.with_name(STREAM_HTML_NAME)
+    with profiler.span("HTML書き出し"):
+        with open(stream_file, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+            render_stream_report(f, aggregator, companies,
+                                 colors={key: info["color"] for key, info in COMPANIES.items()}, sources=sources)
+
+    print(f"\n完了: {stream_file}")
+    print(f"総キーワード数: {aggregator.rows:,}件")
+
+
+def serve(args, all_data, companies, pages, dedup, index_file):
+    """問い合わせAPIとAPI版ダッシュボードを Ctrl-C まで配信する"""
+    print("\nAPI版ダッシュボードを生成中...")
+    dashboard = generate_html(all_data, pages=pages, dedup=dedup, api_base=API_BASE)
+    server = KeywordServer(
+        KeywordQuery(all_data, companies), dashboard,
+        static_dir=OUTPUT_FILE.parent, static_files=[index_file.name] if index_file is not None else [],
+    )
+
+    def ready(host, port):
+        print(f"\n配信中: http://{host}:{port}/ （Ctrl-C で終了）")
+
+    try:
+        asyncio.run(server.serve(args.host, args.serve, ready=ready))
+    except KeyboardInterrupt:
+        print("\n終了しました")
 
 
 if __name__ == "__main__":
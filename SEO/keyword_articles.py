@@ -0,0 +1,350 @@
+"""
+キーワードと公開済み記事（WordPress）の対応表
+
+WordPress のエクスポート（WXR の .xml、または WPGraphQL の posts 応答の .json）から
+記事のスラッグ・タイトルを読み、横断検索と同じ正規化で全キーワードと突き合わせる。
+
+キーワードは空白で語に分け、すべての語が記事のタイトルかスラッグに含まれれば
+「記事あり」とする（英数字・カタカナの語と1文字の語は、記事側の語の境界で一致したときだけ。
+同じ語が2回あれば記事側にも2回要る）。
+記事側は文字bigram → 記事のビット集合（int）の転置インデックスにし、
+語ごとの一致記事をキャッシュするので、キーワード1件あたりの処理は int の AND だけで済む。
+"""
+
+import html
+import json
+import unicodedata
+import xml.etree.ElementTree as ET
+from collections import Counter, namedtuple
+from pathlib import Path
+from urllib.parse import unquote
+
+from keyword_reports import numbered_table
+from keyword_search import KANA_FOLD, bigrams, normalize_keyword
+
+COVERAGE_VERSION = 2
+GAP_LIMIT = 200      # JSON に出す「記事なし」の件数（検索数の上位）
+PAGE_LIMIT = 50      # ダッシュボードの各表に出す件数
+MIN_KEYWORD_LENGTH = 2  # これより短い正規化キーワードは記事と突き合わせない（1文字は何にでも含まれる）
+WXR_NAMESPACE = "{http://wordpress.org/export/1.2/}"
+
+Post = namedtuple("Post", ["slug", "title", "date"])
+
+
+def _wxr_posts(path):
+    """WXR（ツール → エクスポート）から公開済みの投稿を読む"""
+    posts = []
+    for _, elem in ET.iterparse(path):
+        if elem.tag != "item":
+            continue
+        if (elem.findtext(f"{WXR_NAMESPACE}post_type") == "post"
+                and elem.findtext(f"{WXR_NAMESPACE}status") == "publish"):
+            posts.append(Post(
+                unquote(elem.findtext(f"{WXR_NAMESPACE}post_name") or ""),
+                elem.findtext("title") or "",
+                elem.findtext(f"{WXR_NAMESPACE}post_date") or "",
+            ))
+        elem.clear()
+    return posts
+
+
+def _graphql_posts(path):
+    """frontend の GET_POSTS と同じ形（{"data": {"posts": {"nodes": [...]}}}）か、投稿の配列を読む"""
+    with open(path, encoding='utf-8') as f:
+        payload = json.load(f)
+    if isinstance(payload, dict):
+        payload = payload.get("data", payload)["posts"]
+        payload = payload.get("nodes", []) if isinstance(payload, dict) else payload
+    return [
+        Post(unquote(node.get("slug") or ""), html.unescape(node.get("title") or ""), node.get("date") or "")
+        for node in payload
+    ]
+
+
+def load_posts(path):
+    """エクスポートから記事を読む（拡張子 .json なら GraphQL 形式、それ以外は WXR）
+
+    読めない形式のときは ValueError。
+    """
+    path = Path(path)
+    try:
+        if path.suffix.lower() == ".json":
+            return _graphql_posts(path)
+        return _wxr_posts(path)
+    except (ET.ParseError, json.JSONDecodeError, KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"WordPressのエクスポートとして読めません: {path}: {e}") from None
+
+
+def _script(ch):
+    """語の境界を判定するための文字種（L: 英数字, K: カタカナ, H: ひらがな, C: 漢字など）"""
+    if "a" <= ch <= "z" or "0" <= ch <= "9":
+        return "L"
+    if "\u30a1" <= ch <= "\u30fc":
+        return "K"
+    if "\u3041" <= ch <= "\u3096":
+        return "H"
+    return "C"
+
+
+def _segment(text):
+    """normalize_keyword と同じ正規化をした文字列と、各文字の文字種
+
+    文字種の列は正規化前（カタカナをひらがなに寄せる前）の文字から作り、
+    空白のあった位置には " " を挟む（空白も語の境界になる）。
+    """
+    chars = []
+    scripts = []
+    for ch in unicodedata.normalize('NFKC', text).lower():
+        if ch.isspace():
+            if scripts and scripts[-1] != " ":
+                scripts.append(" ")
+            continue
+        chars.append(ch)
+        scripts.append(_script(ch))
+    norm = "".join(chars).translate(KANA_FOLD)
+    return norm, "".join(scripts).rstrip()
+
+
+def _strict_edges(scripts):
+    """語の先頭・末尾で境界を求めるか（英数字・カタカナの端と、1文字の語）"""
+    if len(scripts) == 1:
+        return True, True
+    return scripts[0] in "LK", scripts[-1] in "LK"
+
+
+def _boundaries(scripts):
+    """文字種の列から、各位置の前が語の境界かどうかの bytearray を作る
+
+    空白（" "）は文字として数えずに境界だけを作り、改行はそれ自体が1文字の区切り。
+    """
+    bounds = bytearray(len(scripts.replace(" ", "")) + 1)
+    prev = None
+    k = 0
+    for ch in scripts:
+        if ch == " ":
+            prev = None
+            continue
+        bounds[k] = prev is None or prev != ch or ch == "\n"
+        prev = None if ch == "\n" else ch
+        k += 1
+    bounds[k] = 1
+    return bounds
+
+
+class PostIndex:
+    """記事のタイトル・スラッグの文字bigram → 記事のビット集合
+
+    一致は正規化後の部分一致だが、英数字・カタカナで始まる（終わる）語と1文字の語は、
+    その端が記事側の語の境界（文字種が変わるか空白・端）に来るときだけ一致とする。
+    「scratch」の中の「r」や、「プログラミング」の中の「プログラミン」は一致しない。
+    漢字・ひらがなは分かち書きできないので、2文字以上なら部分一致のまま。
+    """
+
+    def __init__(self, posts):
+        self.posts = posts
+        self.texts = []
+        self.bounds = []  # 記事ごとの bytearray（位置 i の前が語の境界なら1）
+        for post in posts:
+            # タイトルとスラッグは改行でつなぎ、境界をまたいだ一致を作らない
+            title, title_scripts = _segment(post.title)
+            slug, slug_scripts = _segment(post.slug.replace('-', ' '))
+            self.texts.append(f"{title}\n{slug}")
+            self.bounds.append(_boundaries(f"{title_scripts}\n{slug_scripts}"))
+        self.grams = {}
+        for i, text in enumerate(self.texts):
+            bit = 1 << i
+            for gram in bigrams(text) | set(text):
+                self.grams[gram] = self.grams.get(gram, 0) | bit
+        self._terms = {}
+
+    def __len__(self):
+        return len(self.posts)
+
+    def _contains(self, post_id, term, strict_start, strict_end, count=1):
+        """記事に term が（重ならずに）count 回以上あるか"""
+        text = self.texts[post_id]
+        bounds = self.bounds[post_id]
+        start = text.find(term)
+        while start >= 0:
+            if (not strict_start or bounds[start]) and (not strict_end or bounds[start + len(term)]):
+                count -= 1
+                if not count:
+                    return True
+                start = text.find(term, start + len(term))
+            else:
+                start = text.find(term, start + 1)
+        return False
+
+    def match(self, word, count=1):
+        """語を count 回以上含む記事のビット集合（結果は語・回数ごとにキャッシュ）"""
+        mask = self._terms.get((word, count))
+        if mask is not None:
+            return mask
+        term, scripts = _segment(word)
+        strict_start, strict_end = _strict_edges(scripts.replace(" ", ""))
+        mask = -1
+        for gram in bigrams(term):
+            mask &= self.grams.get(gram, 0)
+            if not mask:
+                break
+        # bigramが全部あっても並びが違うことがあり、境界も見る必要があるので、候補を1件ずつ確かめる
+        # 2回以上要る語は回数も数える
+        candidates = mask if count > 1 or len(term) > 2 or strict_start or strict_end else 0
+        while candidates:
+            low = candidates & -candidates
+            if not self._contains(low.bit_length() - 1, term, strict_start, strict_end, count):
+                mask ^= low
+            candidates ^= low
+        self._terms[(word, count)] = mask
+        return mask
+
+    def match_keyword(self, keyword):
+        """キーワードの語をすべて含む記事のビット集合（同じ語は出てきた回数だけ要る）"""
+        mask = -1
+        for word, count in Counter(keyword.split()).items():
+            if normalize_keyword(word):
+                mask &= self.match(word, count)
+                if not mask:
+                    return 0
+        return mask if mask != -1 else 0
+
+
+def _bits(mask):
+    ids = []
+    while mask:
+        low = mask & -mask
+        ids.append(low.bit_length() - 1)
+        mask ^= low
+    return ids
+
+
+class ArticleCoverage:
+    """正規化キーワード（KeywordIndex の文書）ごとの記事の有無
+
+    covered     記事のある文書番号と記事番号のリスト [(文書番号, [記事番号, ...]), ...]
+    gaps        記事のない文書番号（最大月間検索数の降順、gap_limit 件まで）
+    post_hits   記事ごとの [一致キーワード数, 一致キーワードの検索数合計]
+    """
+
+    def __init__(self, index, posts, gap_limit=GAP_LIMIT):
+        self.index = index
+        self.posts = posts
+        post_index = PostIndex(posts)
+        self.covered = []
+        self.gaps = []
+        self.post_hits = [[0, 0] for _ in posts]
+        self.uncovered = 0
+        self.volume = 0
+        self.covered_volume = 0
+        # 文書は検索数の降順なので、先頭から見た「記事なし」がそのまま上位のギャップになる
+        for doc_id, keyword in enumerate(index.keywords):
+            volume = index.volumes[doc_id]
+            self.volume += volume
+            ids = ()
+            if posts and len(index.norms[doc_id]) >= MIN_KEYWORD_LENGTH:
+                ids = _bits(post_index.match_keyword(keyword))
+            if not ids:
+                self.uncovered += 1
+                if len(self.gaps) < gap_limit:
+                    self.gaps.append(doc_id)
+                continue
+            self.covered.append((doc_id, ids))
+            self.covered_volume += volume
+            for post_id in ids:
+                hits = self.post_hits[post_id]
+                hits[0] += 1
+                hits[1] += volume
+
+    def to_payload(self):
+        """ダッシュボード用のJSONにする形（キーワードは列ごとの配列、出現企業は企業番号の配列）"""
+        index = self.index
+        covered_ids = [doc_id for doc_id, _ in self.covered]
+        return {
+            "version": COVERAGE_VERSION,
+            "companies": [list(c) for c in index.companies],
+            "posts": [list(post) + hits for post, hits in zip(self.posts, self.post_hits)],
+            "total": {
+                "keywords": len(index),
+                "covered": len(self.covered),
+                "volume": self.volume,
+                "covered_volume": self.covered_volume,
+            },
+            "covered": {
+                "k": [index.keywords[i] for i in covered_ids],
+                "v": [index.volumes[i] for i in covered_ids],
+                "c": [index.company_ids(i) for i in covered_ids],
+                "p": [ids for _, ids in self.covered],
+            },
+            "gaps": {
+                "k": [index.keywords[i] for i in self.gaps],
+                "v": [index.volumes[i] for i in self.gaps],
+                "c": [index.company_ids(i) for i in self.gaps],
+            },
+        }
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_payload(), f, ensure_ascii=False, separators=(',', ':'))
+
+
+def _company_icons(index, doc_id):
+    return " ".join(index.companies[i][2] for i in index.company_ids(doc_id))
+
+
+def render_article_page(out, coverage, source="", limit=PAGE_LIMIT):
+    """記事カバレッジページの本体を書き出す"""
+    index = coverage.index
+    posts = coverage.posts
+    total = max(len(index), 1)
+    volume = max(coverage.volume, 1)
+    note = f"記事: {html.escape(source)}" if source else "公開済み記事との突き合わせ"
+    out.write(f'''            <div class="header-card" style="--primary-color: #e67e22; --secondary-color: #16213e;">
+                <h2>📝 記事カバレッジ</h2>
+                <p>{note}（キーワードの語がすべてタイトルかスラッグに含まれる記事を「記事あり」とする）</p>
+            </div>
+
+            <div class="stats-grid">
+                <div class="stat-card">
+                    <h4>公開記事</h4>
+                    <div class="value">{len(posts):,}</div>
+                    <div class="sub">キーワードに一致した記事 {sum(1 for n, _ in coverage.post_hits if n):,}本</div>
+                </div>
+                <div class="stat-card">
+                    <h4>記事のあるキーワード</h4>
+                    <div class="value">{len(coverage.covered):,}</div>
+                    <div class="sub">全{len(index):,}語の {len(coverage.covered) / total:.1%}</div>
+                </div>
+                <div class="stat-card">
+                    <h4>記事のある検索数</h4>
+                    <div class="value">{coverage.covered_volume:,}</div>
+                    <div class="sub">全体の {coverage.covered_volume / volume:.1%}</div>
+                </div>
+            </div>
+''')
+    rows = [
+        f'<td class="col-kw">{html.escape(index.keywords[i])}</td><td class="col-vol">{index.volumes[i]:,}</td>'
+        f'<td>{_company_icons(index, i)}</td>'
+        for i in coverage.gaps[:limit]
+    ]
+    if rows:
+        numbered_table(out, f"記事のない検索数上位（{coverage.uncovered:,}語中 上位{len(rows)}件）",
+               ["キーワード", "月間検索数", "出現企業"], rows)
+
+    rows = [
+        f'<td class="col-kw">{html.escape(index.keywords[i])}</td><td class="col-vol">{index.volumes[i]:,}</td>'
+        f'<td>{"<br>".join(html.escape(posts[p].title) for p in ids[:3])}{" ほか" if len(ids) > 3 else ""}</td>'
+        for i, ids in coverage.covered[:limit]
+    ]
+    if rows:
+        numbered_table(out, f"記事のあるキーワード（{len(coverage.covered):,}語中 上位{len(rows)}件）",
+               ["キーワード", "月間検索数", "記事"], rows)
+
+    ranked = sorted(range(len(posts)), key=lambda p: coverage.post_hits[p][1], reverse=True)[:limit]
+    rows = [
+        f'<td class="col-kw">{html.escape(posts[p].title)}<br><small>{html.escape(posts[p].slug)}</small></td>'
+        f'<td class="col-vol">{coverage.post_hits[p][0]:,}</td><td class="col-vol">{coverage.post_hits[p][1]:,}</td>'
+        f'<td>{html.escape(posts[p].date[:10])}</td>'
+        for p in ranked
+    ]
+    if rows:
+        numbered_table(out, "記事ごとの一致キーワード", ["記事", "キーワード数", "検索数合計", "公開日"], rows)
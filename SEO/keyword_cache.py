@@ -0,0 +1,210 @@
+"""
+パース済みキーワードテーブルのディスクキャッシュ（SEO/.cache）
+
+CSV1ファイルごとに KeywordTable を pickle で保存する。
+エントリはパス・サイズ・mtime・内容ハッシュ・パース処理のソースのハッシュで照合し、
+サイズとmtimeが一致すればハッシュ計算も省略する。
+
+読み込んだテーブルから計算する集計（検索インデックス・表記ゆれなど）は
+AnalysisCache に、読み込みキャッシュのキーと内容ハッシュから作った fingerprint で保存する。
+"""
+
+import hashlib
+import io
+import os
+import pickle
+import unicodedata
+from pathlib import Path
+
+# テーブルの持ち方を変えたら上げる（古いエントリは読み捨てられる）
+CACHE_VERSION = 4
+# 集計結果の持ち方を変えたら上げる
+ANALYSIS_CACHE_VERSION = 1
+ANALYSIS_DIR_NAME = "analysis"
+
+
+def file_digest(path):
+    """ファイル内容のハッシュ（blake2b）"""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class KeywordCache:
+    """CSV1ファイル = 1エントリのキャッシュ
+
+    reuse=False のときは読み込みを行わず書き込みだけ行う。
+    source にはパース処理のソースのハッシュ（source_digest()）を渡す。
+    パースのコードを直したら、CSVが同じでも古いエントリは使わない。
+    """
+
+    def __init__(self, cache_dir, reuse=True, source=""):
+        self.cache_dir = cache_dir
+        self.reuse = reuse
+        self.source = source
+        self.hits = 0
+        self.misses = 0
+        self.digests = {}  # キー → 内容ハッシュ（今回読み込めたエントリのみ）
+
+    def _entry_path(self, key):
+        name = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{name}.pickle"
+
+    @staticmethod
+    def make_key(csv_path, *parts):
+        """パス（NFC正規化）と読み込み条件からキーを作る"""
+        return "|".join([unicodedata.normalize('NFC', str(csv_path)), *parts])
+
+    def load(self, csv_path, key):
+        """有効なエントリがあればテーブルを返す（なければNone）"""
+        if not self.reuse:
+            self.misses += 1
+            return None
+
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, 'rb') as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            entry = None
+        except (OSError, EOFError, AttributeError, pickle.UnpicklingError):
+            # 壊れたエントリは作り直す
+            entry = None
+
+        if (entry is None or entry.get("version") != CACHE_VERSION or entry.get("key") != key
+                or entry.get("source") != self.source):
+            self.misses += 1
+            return None
+
+        try:
+            stat = os.stat(csv_path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        if (stat.st_size, stat.st_mtime_ns) != (entry["size"], entry["mtime_ns"]):
+            # touchされただけなら内容ハッシュで救う
+            if stat.st_size != entry["size"] or file_digest(csv_path) != entry["digest"]:
+                self.misses += 1
+                return None
+            entry["mtime_ns"] = stat.st_mtime_ns
+            self._write(entry_path, entry)
+
+        self.hits += 1
+        self.digests[key] = entry["digest"]
+        return entry["table"]
+
+    def store(self, csv_path, key, table):
+        """テーブルをエントリとして保存"""
+        stat = os.stat(csv_path)
+        entry = {
+            "version": CACHE_VERSION,
+            "key": key,
+            "source": self.source,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "digest": file_digest(csv_path),
+            "table": table,
+        }
+        self.digests[key] = entry["digest"]
+        self._write(self._entry_path(key), entry)
+
+    def fingerprint(self, order=()):
+        """今回読み込んだCSVの組み合わせを表すハッシュ（集計結果のキャッシュキー）
+
+        order には結合順（テーブルの行の並びを決めるもの）を渡す。
+        """
+        h = hashlib.blake2b(repr([CACHE_VERSION, self.source, *order]).encode('utf-8'), digest_size=16)
+        for key, digest in sorted(self.digests.items()):
+            h.update(f"\n{key}={digest}".encode('utf-8'))
+        return h.hexdigest()
+
+    def _write(self, entry_path, entry):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = entry_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, entry_path)
+
+
+def source_digest(*names):
+    """このディレクトリの .py（names を渡せばそのファイルだけ）をまとめたハッシュ"""
+    directory = Path(__file__).resolve().parent
+    paths = [directory / name for name in names] if names else directory.glob("*.py")
+    h = hashlib.blake2b(digest_size=16)
+    for path in sorted(paths):
+        h.update(path.name.encode('utf-8'))
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+class _TablePickler(pickle.Pickler):
+    """KeywordTable は中身を書かず、企業キーだけを書く"""
+
+    def __init__(self, file, tables):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.table_keys = {id(table): key for key, table in tables.items()}
+
+    def persistent_id(self, obj):
+        return self.table_keys.get(id(obj))
+
+
+class _TableUnpickler(pickle.Unpickler):
+    """企業キーを今回読み込んだ KeywordTable につなぎ直す"""
+
+    def __init__(self, file, tables):
+        super().__init__(file)
+        self.tables = tables
+
+    def persistent_load(self, pid):
+        return self.tables[pid]
+
+
+class AnalysisCache:
+    """読み込んだテーブルから計算した集計結果のキャッシュ（.cache/analysis）
+
+    集計1種類 = 1エントリで、fingerprint（KeywordCache.fingerprint()）と
+    集計ごとの条件（parts）が一致すれば再利用する。
+    fingerprint が None（スナップショットからの読み込みなど）のときは毎回計算する。
+    結果が参照する KeywordTable は企業キーとして保存し、読み込み時に今回のテーブルへつなぎ直す。
+    """
+
+    def __init__(self, cache_dir, fingerprint, tables, reuse=True):
+        self.cache_dir = cache_dir / ANALYSIS_DIR_NAME
+        # 集計のコードを直したら古い結果を使わないよう、ソースのハッシュも混ぜる
+        self.fingerprint = fingerprint and f"{fingerprint}|{source_digest()}"
+        self.tables = tables
+        self.reuse = reuse
+        self.hits = []
+
+    def get(self, name, compute, *parts):
+        """name の集計結果を返す（無ければ compute() で計算して保存する）"""
+        if self.fingerprint is None:
+            return compute()
+        key = "|".join([self.fingerprint, *map(str, parts)])
+        path = self.cache_dir / f"{name}.pickle"
+        if self.reuse:
+            try:
+                with open(path, 'rb') as f:
+                    header = pickle.load(f)
+                    if header == (ANALYSIS_CACHE_VERSION, key):
+                        value = _TableUnpickler(f, self.tables).load()
+                        self.hits.append(name)
+                        return value
+            except FileNotFoundError:
+                pass
+            except (OSError, EOFError, KeyError, AttributeError, pickle.UnpicklingError):
+                # 壊れたエントリは作り直す
+                pass
+
+        value = compute()
+        buf = io.BytesIO()
+        pickle.dump((ANALYSIS_CACHE_VERSION, key), buf, protocol=pickle.HIGHEST_PROTOCOL)
+        _TablePickler(buf, self.tables).dump(value)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(buf.getbuffer())
+        os.replace(tmp_path, path)
+        return value
@@ -0,0 +1,373 @@
+"""
+キーワード分類器（Aho–Corasick による辞書マッチ）
+
+コエテコ/keyword_classification.json の手作業ラベル（1000語）と
+カテゴリごとの用語リストから、正規化した用語 → ラベル の辞書を作り、
+Aho–Corasick オートマトンで全キーワードを1文字ずつ1回だけ走査して分類する。
+カテゴリ・ターゲット・CV距離の3軸それぞれで、マッチした用語の長さの合計が
+最も大きいラベルを採る（長い・具体的な用語ほど強い）。
+
+分類結果は 正規化キーワードのハッシュ → ラベル で .cache に保存し、
+用語辞書が変わらない限り次回は走査を省く。
+"""
+
+import hashlib
+import html
+import json
+import os
+import pickle
+from array import array
+from collections import deque
+
+from keyword_search import normalize_keyword
+
+DIMENSIONS = ("category", "target", "cv_distance")
+DEFAULT_LABELS = ("その他", "一般", "遠い（情報収集）")
+CLASSIFICATION_CACHE_VERSION = 1
+HOLDOUT_FOLDS = 5  # 手作業ラベルでの評価の分割数
+
+# 手作業ラベルを補う用語リスト（キーワードの一部に含まれていれば効く）
+SEED_TERMS = {
+    "category": {
+        "プログラミング学習": (
+            "プログラミング", "プログラマー", "スクラッチ", "scratch", "python", "java",
+            "unity", "コード", "アルゴリズム", "ロボット", "マイクラ", "マインクラフト",
+            "ロブロックス", "roblox", "ゲーム作り", "ゲーム制作", "エンジニア",
+        ),
+        "子供の教育・習い事": (
+            "小学生", "中学生", "子供", "子ども", "こども", "キッズ", "習い事", "塾",
+            "教室", "通信教育", "自由研究", "夏休み", "宿題", "勉強",
+        ),
+        "子育て・発達": (
+            "発達障害", "adhd", "自閉", "グレーゾーン", "自己肯定感", "非認知能力",
+            "子育て", "育児", "癇癪", "不登校",
+        ),
+        "英語学習": ("英語", "英会話", "英検", "toeic", "duolingo", "デュオリンゴ"),
+        "資格・検定": ("資格", "検定", "試験", "漢検", "mos"),
+        "趣味・エンタメ": ("ゲーム", "遊び", "実験", "工作", "おもちゃ", "レゴ"),
+        "動画・クリエイティブ": ("動画編集", "デザイン", "イラスト", "画像"),
+        "SNS活用": ("ツイッター", "twitter", "インスタ", "instagram", "tiktok", "youtube"),
+        "副業・キャリア": ("副業", "転職", "キャリア", "年収", "フリーランス"),
+        "IT・Web基礎知識": ("とは", "意味", "web", "ネット"),
+        "投資・マネー": ("投資", "株", "ビットコイン", "仮想通貨", "お金"),
+        "PC操作・トラブル解決": ("パソコン", "pc", "キーボード", "ショートカット", "エクセル", "excel"),
+    },
+    "target": {
+        "保護者（子育て層）": ("小学生", "子供", "子ども", "こども", "キッズ", "幼児", "年長", "保護者", "親"),
+        "中高生・保護者": ("中学生", "高校生", "中学", "高校", "受験"),
+        "社会人・転職希望者": ("社会人", "転職", "副業", "大人", "年収", "キャリア"),
+        "初心者・入門者": ("初心者", "入門", "とは", "やり方", "始め方", "簡単"),
+    },
+    "cv_distance": {
+        "近い（比較検討）": ("おすすめ", "比較", "口コミ", "評判", "料金", "月謝", "ランキング", "費用"),
+        "中間（サービス検討）": ("教室", "スクール", "講座", "体験", "オンライン", "無料"),
+    },
+}
+
+
+class AhoCorasick:
+    """文字単位の Aho–Corasick オートマトン
+
+    goto[s] は 文字 → 次状態 の dict、outputs[s] はその状態で終わる用語番号
+    （失敗リンクをたどった先の出力もまとめてある）。
+    """
+
+    def __init__(self, terms):
+        self.terms = list(terms)
+        goto = [{}]
+        outputs = [[]]
+        for term_id, term in enumerate(self.terms):
+            state = 0
+            for ch in term:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    outputs.append([])
+                state = nxt
+            outputs[state].append(term_id)
+
+        fail = array('l', [0]) * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                outputs[nxt] = outputs[nxt] + outputs[fail[nxt]]
+
+        self.goto = goto
+        self.fail = fail
+        self.outputs = outputs
+
+    def find(self, text):
+        """text に含まれる用語番号を（重複込みで）順に返す"""
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if outputs[state]:
+                yield from outputs[state]
+
+
+class KeywordClassifier:
+    """用語辞書からキーワードに3軸のラベルを付ける
+
+    labels[軸] はラベル名のリスト（0番が既定ラベル）で、classify() は
+    各軸のラベル番号のタプルを返す。
+    """
+
+    def __init__(self, term_labels):
+        # term_labels: {正規化用語: {軸: ラベル名}}
+        self.labels = {dim: [default] for dim, default in zip(DIMENSIONS, DEFAULT_LABELS)}
+        codes = {dim: {default: 0} for dim, default in zip(DIMENSIONS, DEFAULT_LABELS)}
+        terms = sorted(term_labels)
+        self.term_codes = []
+        for term in terms:
+            term_code = []
+            for d, dim in enumerate(DIMENSIONS):
+                label = term_labels[term].get(dim)
+                if label is None:
+                    term_code.append(-1)
+                    continue
+                code = codes[dim].get(label)
+                if code is None:
+                    code = codes[dim][label] = len(self.labels[dim])
+                    self.labels[dim].append(label)
+                term_code.append(code)
+            self.term_codes.append(tuple(term_code))
+        self.automaton = AhoCorasick(terms)
+        self.digest = hashlib.blake2b(
+            json.dumps([terms, self.term_codes, self.labels], ensure_ascii=False).encode('utf-8'),
+            digest_size=16,
+        ).hexdigest()
+
+    @classmethod
+    def build(cls, labeled=(), seeds=(), seed_terms=SEED_TERMS):
+        """手作業ラベルと用語リストから分類器を作る
+
+        labeled は keyword_classification.json の results 形式
+        （{"keyword", "category", "target", "cv_distance"} のリスト）。
+        seeds は (用語, カテゴリ) のリスト（KEYWORD_CATEGORIES の対応付けなど）。
+        手作業ラベルは用語リストより優先する。
+        """
+        term_labels = {}
+
+        def add(term, dim, label):
+            norm = normalize_keyword(term)
+            if norm and label:
+                term_labels.setdefault(norm, {}).setdefault(dim, label)
+
+        for item in labeled:
+            for dim, default in zip(DIMENSIONS, DEFAULT_LABELS):
+                label = item.get(dim)
+                # 既定ラベル（「その他」など）は判断材料にならないので用語にしない
+                if label and label != default:
+                    add(item.get("keyword", ""), dim, label)
+        for term, category in seeds:
+            add(term, "category", category)
+        for dim, groups in seed_terms.items():
+            for label, terms in groups.items():
+                for term in terms:
+                    add(term, dim, label)
+        return cls(term_labels)
+
+    def classify(self, keyword):
+        """キーワードのラベル番号 (カテゴリ, ターゲット, CV距離) を返す"""
+        norm = normalize_keyword(keyword)
+        scores = [{} for _ in DIMENSIONS]
+        terms = self.automaton.terms
+        for term_id in self.automaton.find(norm):
+            weight = len(terms[term_id])
+            for d, code in enumerate(self.term_codes[term_id]):
+                if code >= 0:
+                    scores[d][code] = scores[d].get(code, 0) + weight
+        # 同点はラベル番号の小さい方（辞書に先に出てきた方）
+        return tuple(
+            min(s, key=lambda c: (-s[c], c)) if s else 0
+            for s in scores
+        )
+
+    def label_names(self, codes):
+        """ラベル番号のタプルを {軸: ラベル名} にする"""
+        return {dim: self.labels[dim][code] for dim, code in zip(DIMENSIONS, codes)}
+
+
+def keyword_hash(keyword):
+    """分類キャッシュのキー（正規化キーワードのハッシュ）"""
+    return hashlib.blake2b(normalize_keyword(keyword).encode('utf-8'), digest_size=8).digest()
+
+
+def holdout_agreement(labeled, seeds=(), folds=HOLDOUT_FOLDS):
+    """手作業ラベルでの一致率を交差検証で測る
+
+    labeled を folds 個に分け、1つを除いた残りで作った分類器で除いた分を分類する。
+    評価する語は辞書に入らないので、辞書にある語をそのまま当てることにはならない。
+    同じ正規化キーワードは同じ分割に入れる（表記ゆれから答えが漏れないように）。
+    戻り値は {軸: (一致数, 件数)}。
+    """
+    parts = [[] for _ in range(folds)]
+    for item in labeled:
+        parts[keyword_hash(item.get("keyword", ""))[0] % folds].append(item)
+    agree = {dim: [0, 0] for dim in DIMENSIONS}
+    for k, held_out in enumerate(parts):
+        training = [item for j, part in enumerate(parts) if j != k for item in part]
+        classifier = KeywordClassifier.build(labeled=training, seeds=seeds)
+        for item in held_out:
+            predicted = classifier.label_names(classifier.classify(item.get("keyword", "")))
+            for dim, default in zip(DIMENSIONS, DEFAULT_LABELS):
+                counts = agree[dim]
+                counts[0] += predicted[dim] == (item.get(dim) or default)
+                counts[1] += 1
+    return {dim: tuple(counts) for dim, counts in agree.items()}
+
+
+class Classification:
+    """全社のキーワードの分類結果
+
+    codes[企業キー] は軸ごとの array('H')（行番号 → ラベル番号）。
+    """
+
+    def __init__(self, classifier, codes):
+        self.classifier = classifier
+        self.codes = codes
+
+    def counts(self, key, dim):
+        """企業ごとの {ラベル名: 件数}（ラベル順）"""
+        d = DIMENSIONS.index(dim)
+        names = self.classifier.labels[dim]
+        counts = [0] * len(names)
+        for code in self.codes[key][d]:
+            counts[code] += 1
+        return {name: n for name, n in zip(names, counts) if n}
+
+    def row_labels(self, key, i):
+        """企業キー・行番号のラベルを {軸: ラベル名} で返す"""
+        return self.classifier.label_names(tuple(codes[i] for codes in self.codes[key]))
+
+
+def classify_tables(classifier, all_data, cache_path=None):
+    """{企業キー: KeywordTable} の全行を分類する
+
+    cache_path があれば キーワードハッシュ → ラベル番号 をそこに保存・再利用する
+    （用語辞書のダイジェストが変わったら捨てる）。保存するのは今回のキーワードの分だけ。
+    """
+    cached = {}
+    if cache_path is not None:
+        try:
+            with open(cache_path, 'rb') as f:
+                entry = pickle.load(f)
+            if entry.get("version") == CLASSIFICATION_CACHE_VERSION and entry.get("digest") == classifier.digest:
+                cached = entry["labels"]
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            pass
+
+    # 今回のキーワードの分だけを持ち直すので、キャッシュは今のデータの語数より大きくならない
+    memo = {}
+    computed = 0
+    codes = {}
+    for key, table in all_data.items():
+        columns = tuple(array('H') for _ in DIMENSIONS)
+        for keyword in table.keywords:
+            h = keyword_hash(keyword)
+            labels = memo.get(h)
+            if labels is None:
+                labels = cached.get(h)
+                if labels is None:
+                    labels = classifier.classify(keyword)
+                    computed += 1
+                memo[h] = labels
+            for column, code in zip(columns, labels):
+                column.append(code)
+        codes[key] = columns
+
+    if cache_path is not None and (computed or len(memo) != len(cached)):
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({
+                "version": CLASSIFICATION_CACHE_VERSION,
+                "digest": classifier.digest,
+                "labels": memo,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+
+    return Classification(classifier, codes)
+
+
+def export_classification_json(result, all_data, path):
+    """keyword_classification.json と同じ形で全キーワードの分類を書き出す"""
+    results = []
+    seen = set()
+    for key, table in all_data.items():
+        for i, keyword in enumerate(table.keywords):
+            if keyword in seen:
+                continue
+            seen.add(keyword)
+            results.append({"keyword": keyword, **result.row_labels(key, i)})
+
+    def count(dim):
+        counts = {}
+        for item in results:
+            counts[item[dim]] = counts.get(item[dim], 0) + 1
+        return counts
+
+    category_keywords = {}
+    for item in results:
+        category_keywords.setdefault(item["category"], []).append(
+            [item["keyword"], item["target"], item["cv_distance"]]
+        )
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "results": results,
+            "category_count": count("category"),
+            "target_count": count("target"),
+            "cv_count": count("cv_distance"),
+            "category_keywords": category_keywords,
+        }, f, ensure_ascii=False, indent=2)
+
+
+def render_classification_page(out, result, companies):
+    """分類ページの本体を書き出す（企業 × ラベルの件数表）"""
+    out.write(f'''            <div class="header-card" style="--primary-color: #8e44ad; --secondary-color: #16213e;">
+                <h2>🏷️ キーワード分類</h2>
+                <p>手作業ラベルと用語リスト（{len(result.classifier.automaton.terms):,}語）による全キーワードの自動分類</p>
+            </div>
+''')
+    titles = {"category": "カテゴリ", "target": "ターゲット", "cv_distance": "CV距離"}
+    for dim in DIMENSIONS:
+        names = result.classifier.labels[dim]
+        counts = {key: result.counts(key, dim) for key, _, _ in companies if key in result.codes}
+        out.write(f'''            <div class="table-container" style="margin-bottom: 20px;">
+                <div class="table-header">
+                    <h3>{titles[dim]}別の件数</h3>
+                </div>
+                <div class="table-wrapper">
+                    <table>
+                        <thead>
+                            <tr>
+                                <th>{titles[dim]}</th>
+''')
+        for key, name, icon in companies:
+            if key in counts:
+                out.write(f'''                                <th>{icon} {html.escape(name)}</th>
+''')
+        out.write('''                            </tr>
+                        </thead>
+                        <tbody>
+''')
+        for label in names:
+            cells = "".join(f'<td class="col-vol">{c.get(label, 0):,}</td>' for c in counts.values())
+            out.write(f'''                            <tr><td class="col-kw">{html.escape(label)}</td>{cells}</tr>
+''')
+        out.write('''                        </tbody>
+                    </table>
+                </div>
+            </div>
+''')
@@ -0,0 +1,214 @@
+"""
+表記ゆれ・重複キーワードのクラスタリング
+
+1. normalize_keyword が同じもの（空白・全角半角・カナの違い、カテゴリ間の重複）は1語にまとめる
+2. さらに助詞（の・を・に など）の有無だけが違う語を、比較用の語（variant_key）が
+   一致するものとして同じクラスタに入れる
+3. 検索数の大きい語をクラスタの代表にする
+
+「自己肯定感 部屋」と「自己肯定感 部下」のように文字の大半が同じでも内容語が違えば
+意味が違うので、文字の類似度ではなく表記ゆれの規則でまとめる。
+比較用の語を辞書で引くだけなので、語数に対して線形に伸びる。
+"""
+
+import html
+import re
+import unicodedata
+from array import array
+
+from keyword_search import KANA_FOLD, normalize_keyword
+
+CLUSTER_LIMIT = 100      # ダッシュボードに出すクラスタ数
+
+# ひらがな以外（漢字・カタカナ・英数字）の直後にある1文字の助詞（語末のものは除かない）
+PARTICLE = re.compile(r"(?<=[^\u3041-\u309f])[のをにでとがはへやも](?=.)")
+
+
+class KeywordCluster:
+    """表記ゆれをまとめた1クラスタ"""
+
+    __slots__ = ("head", "volume", "variants", "rows")
+
+    def __init__(self, head, volume, variants, rows):
+        self.head = head          # 代表キーワード（検索数最大の表記）
+        self.volume = volume      # 表記（正規化後のユニーク語）ごとの検索数の合計
+        self.variants = variants  # [(表記, 検索数), ...] 検索数の降順
+        self.rows = rows          # 元テーブルでの行数（カテゴリ重複を含む）
+
+
+class DedupResult:
+    """クラスタリング結果
+
+    row_norm[i]     元テーブルの行iの正規化語番号
+    norm_volumes[j] 正規化語jの月間検索数（表記違いの最大値）
+    norm_cluster[j] 正規化語jのクラスタ番号
+    合計は正規化語単位で数えるので、カテゴリ間の重複は1回だけになる。
+    """
+
+    def __init__(self, table, row_norm, norm_volumes, norm_cluster, clusters):
+        self.table = table
+        self.row_norm = row_norm
+        self.norm_volumes = norm_volumes
+        self.norm_cluster = norm_cluster
+        self.clusters = clusters
+
+    def cluster_of(self, i):
+        """元テーブルの行iが属するクラスタ"""
+        return self.clusters[self.norm_cluster[self.row_norm[i]]]
+
+    def total_volume(self):
+        """重複を除いた月間検索数の合計"""
+        return sum(self.norm_volumes)
+
+    def category_totals(self):
+        """カテゴリ別の {名前: {"count", "volume"}}（カテゴリ内で重複除外）"""
+        per_code = {}
+        for norm, code in zip(self.row_norm, self.table.category):
+            per_code.setdefault(code, set()).add(norm)
+        return {
+            self.table.category_names[code]: {
+                "count": len(norms),
+                "volume": sum(self.norm_volumes[j] for j in norms),
+            }
+            for code, norms in sorted(per_code.items())
+        }
+
+    def merged(self, limit=CLUSTER_LIMIT):
+        """複数の表記を持つクラスタを検索数合計の降順で返す"""
+        multi = [c for c in self.clusters if len(c.variants) > 1]
+        multi.sort(key=lambda c: c.volume, reverse=True)
+        return multi[:limit] if limit else multi
+
+
+def variant_key(keyword):
+    """表記ゆれを吸収した比較用の語（空白・全角半角・カナ・助詞の違いを無視）
+
+    助詞は直前がひらがなでないときだけ除く（「capslockの解除」→「capslock解除」）。
+    「ドラえもん」の「も」のように、ひらがなの語の中の文字は残る。
+    カナはひらがなに寄せる前に判定するので、カタカナ語の後ろの助詞も除ける。
+    """
+    text = "".join(unicodedata.normalize('NFKC', keyword).lower().split())
+    return PARTICLE.sub("", text).translate(KANA_FOLD)
+
+
+def cluster_keywords(table):
+    """KeywordTable のキーワードを表記ゆれクラスタにまとめる"""
+    # 1. 正規化で完全一致するものをまとめる
+    norm_ids = {}
+    display = []
+    volumes = array('q')
+    row_norm = array('I')
+    for keyword, volume in zip(table.keywords, table.volume):
+        norm = normalize_keyword(keyword) or keyword
+        i = norm_ids.get(norm)
+        if i is None:
+            i = norm_ids[norm] = len(display)
+            display.append(keyword)
+            volumes.append(volume)
+        elif volume > volumes[i]:
+            display[i] = keyword
+            volumes[i] = volume
+        row_norm.append(i)
+    norms = list(norm_ids)
+
+    # 2. 検索数の大きい順に見て、比較用の語が同じものを最初の語（代表）のクラスタに入れる
+    order = sorted(range(len(norms)), key=volumes.__getitem__, reverse=True)
+    norm_cluster = array('l', [-1]) * len(norms)
+    groups = []
+    cluster_ids = {}
+    for i in order:
+        key = variant_key(display[i]) or norms[i]
+        c = cluster_ids.get(key)
+        if c is None:
+            c = cluster_ids[key] = len(groups)
+            groups.append([])
+        norm_cluster[i] = c
+        groups[c].append(i)
+
+    row_counts = [0] * len(groups)
+    for j in row_norm:
+        row_counts[norm_cluster[j]] += 1
+
+    clusters = []
+    for c, members in enumerate(groups):
+        variants = sorted(((display[i], volumes[i]) for i in members), key=lambda v: v[1], reverse=True)
+        clusters.append(KeywordCluster(
+            head=variants[0][0],
+            volume=sum(v for _, v in variants),
+            variants=variants,
+            rows=row_counts[c],
+        ))
+
+    return DedupResult(table, row_norm, volumes, norm_cluster, clusters)
+
+
+def render_dedup_page(out, result, limit=CLUSTER_LIMIT):
+    """表記ゆれページの本体を書き出す"""
+    table = result.table
+    raw_volume = table.total_volume()
+    dedup_volume = result.total_volume()
+    merged = result.merged(limit=None)
+    out.write(f'''            <div class="header-card" style="--primary-color: #ee5253; --secondary-color: #16213e;">
+                <h2>🧬 表記ゆれ・重複の整理（できたよ！）</h2>
+                <p>カテゴリ間の重複と表記ゆれ（空白・全角半角・カナ・助詞の違い）をまとめた集計</p>
+            </div>
+
+            <div class="stats-grid">
+                <div class="stat-card">
+                    <h4>キーワード行数</h4>
+                    <div class="value">{len(table):,}</div>
+                    <div class="sub">カテゴリ間の重複を含む</div>
+                </div>
+                <div class="stat-card">
+                    <h4>クラスタ数</h4>
+                    <div class="value">{len(result.clusters):,}</div>
+                    <div class="sub">うち表記ゆれあり {len(merged):,}</div>
+                </div>
+                <div class="stat-card">
+                    <h4>月間検索数（重複除外後）</h4>
+                    <div class="value">{dedup_volume:,}</div>
+                    <div class="sub">除外前 {raw_volume:,}</div>
+                </div>
+            </div>
+
+            <div class="table-container" style="margin-bottom: 20px;">
+                <div class="table-header">
+                    <h3>カテゴリ別（カテゴリ内の重複除外）</h3>
+                </div>
+                <div class="table-wrapper">
+                    <table>
+                        <thead>
+                            <tr><th>カテゴリ</th><th>件数</th><th>重複除外後</th><th>月間検索数</th><th>重複除外後</th></tr>
+                        </thead>
+                        <tbody>
+''')
+    raw = table.category_totals()
+    icons = dict(zip(table.category_names, table.category_icons))
+    for name, data in sorted(result.category_totals().items(), key=lambda x: x[1]["volume"], reverse=True):
+        out.write(f'''                            <tr><td class="col-kw">{icons[name]} {html.escape(name)}</td><td class="col-vol">{raw[name]["count"]:,}</td><td class="col-vol">{data["count"]:,}</td><td class="col-vol">{raw[name]["volume"]:,}</td><td class="col-vol">{data["volume"]:,}</td></tr>
+''')
+    out.write(f'''                        </tbody>
+                    </table>
+                </div>
+            </div>
+
+            <div class="table-container">
+                <div class="table-header">
+                    <h3>表記ゆれクラスタ（検索数合計の上位{limit}件）</h3>
+                </div>
+                <div class="table-wrapper">
+                    <table>
+                        <thead>
+                            <tr><th class="col-no">#</th><th>代表キーワード</th><th>検索数合計</th><th>表記</th></tr>
+                        </thead>
+                        <tbody>
+''')
+    for rank, cluster in enumerate(merged[:limit], 1):
+        variants = " / ".join(f"{html.escape(kw)}（{vol:,}）" for kw, vol in cluster.variants)
+        out.write(f'''                            <tr><td class="col-no">{rank}</td><td class="col-kw">{html.escape(cluster.head)}</td><td class="col-vol">{cluster.volume:,}</td><td>{variants}</td></tr>
+''')
+    out.write('''                        </tbody>
+                    </table>
+                </div>
+            </div>
+''')
@@ -0,0 +1,217 @@
+"""
+前回のエクスポートとの差分（新規・消失キーワード、検索数の増減、検索順位の変化）
+
+企業ごとに (カテゴリ, 正規化キーワード) → 行番号 の辞書を新旧それぞれ1回作って突き合わせる。
+全行を1回ずつなめるだけなので行数に対して線形で、上位だけを heapq で選ぶ。
+"""
+
+import heapq
+import html
+
+from keyword_reports import numbered_table
+from keyword_search import normalize_keyword
+from keyword_table import KeywordTable
+
+DIFF_LIMIT = 30   # 各表に出す件数
+UNRANKED = 101    # 検索順位が無い（圏外）ときの比較用の順位
+
+
+def _row_index(table):
+    """(カテゴリ名, 正規化キーワード) → 行番号（同じキーは検索数の大きい行）"""
+    index = {}
+    names = table.category_names
+    volume = table.volume
+    for i, (keyword, code) in enumerate(zip(table.keywords, table.category)):
+        key = (names[code], normalize_keyword(keyword))
+        j = index.get(key)
+        if j is None or volume[i] > volume[j]:
+            index[key] = i
+    return index
+
+
+class CompanyDiff:
+    """1企業分の差分
+
+    added / lost        新規・消失の行番号（それぞれ new / old の行）
+    changed             両方にある (old の行, new の行) のリスト
+    category_counts     {カテゴリ名: {"added", "lost", "volume_delta"}}
+    """
+
+    def __init__(self, key, old, new):
+        self.key = key
+        self.old = old
+        self.new = new
+        old_index = _row_index(old)
+        new_index = _row_index(new)
+
+        self.added = [i for k, i in new_index.items() if k not in old_index]
+        self.lost = [j for k, j in old_index.items() if k not in new_index]
+        self.changed = [(old_index[k], i) for k, i in new_index.items() if k in old_index]
+
+        counts = {}
+        for rows, table, field, sign in ((self.added, new, "added", 1), (self.lost, old, "lost", -1)):
+            for i in rows:
+                total = counts.setdefault(table.category_names[table.category[i]],
+                                          {"added": 0, "lost": 0, "volume_delta": 0})
+                total[field] += 1
+                total["volume_delta"] += sign * table.volume[i]
+        for j, i in self.changed:
+            delta = new.volume[i] - old.volume[j]
+            if delta:
+                total = counts.setdefault(new.category_names[new.category[i]],
+                                          {"added": 0, "lost": 0, "volume_delta": 0})
+                total["volume_delta"] += delta
+        self.category_counts = counts
+
+    def volume_delta(self):
+        """月間検索数の合計の増減"""
+        return self.new.total_volume() - self.old.total_volume()
+
+    def top_added(self, n=DIFF_LIMIT):
+        return heapq.nlargest(n, self.added, key=self.new.volume.__getitem__)
+
+    def top_lost(self, n=DIFF_LIMIT):
+        return heapq.nlargest(n, self.lost, key=self.old.volume.__getitem__)
+
+    def movers(self, n=DIFF_LIMIT):
+        """検索数の増加・減少の上位 ([(old, new, 増減)], [(old, new, 増減)])"""
+        deltas = [(self.new.volume[i] - self.old.volume[j], j, i) for j, i in self.changed]
+        up = heapq.nlargest(n, (d for d in deltas if d[0] > 0))
+        down = heapq.nsmallest(n, (d for d in deltas if d[0] < 0))
+        return [(j, i, d) for d, j, i in up], [(j, i, d) for d, j, i in down]
+
+    def rank_changes(self, n=DIFF_LIMIT):
+        """検索順位の上昇・下落の上位（圏外との出入りを含む）"""
+        old_rank = self.old.rank
+        new_rank = self.new.rank
+        moves = []
+        for j, i in self.changed:
+            before = old_rank[j] or UNRANKED
+            after = new_rank[i] or UNRANKED
+            if before != after:
+                moves.append((before - after, j, i))
+        up = heapq.nlargest(n, (m for m in moves if m[0] > 0))
+        down = heapq.nsmallest(n, (m for m in moves if m[0] < 0))
+        return [(j, i) for _, j, i in up], [(j, i) for _, j, i in down]
+
+    def has_changes(self):
+        """新規・消失・検索数か検索順位の変化が1件でもあるか"""
+        old, new = self.old, self.new
+        return bool(self.added or self.lost) or any(
+            new.volume[i] != old.volume[j] or new.rank[i] != old.rank[j] for j, i in self.changed
+        )
+
+    def rank_change_count(self):
+        return sum(1 for j, i in self.changed if self.old.rank[j] != self.new.rank[i])
+
+
+def diff_keywords(old_data, new_data):
+    """{企業キー: KeywordTable} の新旧を比べて {企業キー: CompanyDiff} を返す
+
+    片方にしか無い企業は、もう片方を空のテーブルとして比べる
+    （前回にしか無い企業は全キーワードが消失になる）。並びは new_data、続いて old_data にしか無い企業の順。
+    """
+    keys = list(new_data) + [key for key in old_data if key not in new_data]
+    return {
+        key: CompanyDiff(key, old_data.get(key) or KeywordTable(), new_data.get(key) or KeywordTable())
+        for key in keys
+    }
+
+
+def _rank(value):
+    return str(value) if value else "圏外"
+
+
+def _category_badge(table, i):
+    code = table.category[i]
+    name = table.category_names[code]
+    return f'<span class="badge badge-cat">{table.category_icons[code]} {html.escape(name)}</span>' if name else ""
+
+
+def render_diff_page(out, diffs, companies, baseline=""):
+    """変化ページの本体を書き出す
+
+    diffs は {企業キー: CompanyDiff}、companies は [(企業キー, 表示名, アイコン), ...]。
+    companies に無い（前回にしか無い）企業は企業キーを表示名にして末尾に並べる。
+    """
+    note = f"前回: {html.escape(baseline)}" if baseline else "前回のスナップショットとの比較"
+    out.write(f'''            <div class="header-card" style="--primary-color: #10ac84; --secondary-color: #16213e;">
+                <h2>🆕 前回からの変化</h2>
+                <p>{note}（表記ゆれは同一視、カテゴリごとに比較）</p>
+            </div>
+''')
+    if diffs is None:
+        out.write('''            <div class="summary-card"><p>比較できる前回のスナップショットがありません。</p></div>
+''')
+        return
+
+    known = {key for key, _, _ in companies}
+    companies = list(companies) + [(key, key, "🗑️") for key in diffs if key not in known]
+
+    out.write('''
+            <div class="stats-grid">
+''')
+    for key, name, icon in companies:
+        diff = diffs.get(key)
+        if diff is None:
+            continue
+        out.write(f'''                <div class="stat-card">
+                    <h4>{icon} {html.escape(name)}</h4>
+                    <div class="value">+{len(diff.added):,} / -{len(diff.lost):,}</div>
+                    <div class="sub">検索数 {diff.volume_delta():+,} / 順位変動 {diff.rank_change_count():,}件</div>
+                </div>
+''')
+    out.write('''            </div>
+''')
+
+    for key, name, icon in companies:
+        diff = diffs.get(key)
+        if diff is None or not diff.has_changes():
+            continue
+        old, new = diff.old, diff.new
+        title = f"{icon} {html.escape(name)}"
+        out.write(f'''
+            <h3 style="margin: 10px 0 15px;">{title}</h3>
+''')
+
+        if len(diff.category_counts) > 1:
+            rows = [
+                f'<td class="col-kw">{html.escape(cat)}</td><td class="col-vol">{c["added"]:,}</td>'
+                f'<td class="col-vol">{c["lost"]:,}</td><td class="col-vol">{c["volume_delta"]:+,}</td>'
+                for cat, c in sorted(diff.category_counts.items(), key=lambda x: -abs(x[1]["volume_delta"]))
+            ]
+            numbered_table(out, "カテゴリ別", ["カテゴリ", "新規", "消失", "検索数の増減"], rows)
+
+        rows = [
+            f'<td class="col-kw">{html.escape(new.keywords[i])}</td><td class="col-vol">{new.volume[i]:,}</td><td>{_category_badge(new, i)}</td>'
+            for i in diff.top_added()
+        ]
+        if rows:
+            numbered_table(out, f"新規キーワード（{len(diff.added):,}件中 上位{len(rows)}件）", ["キーワード", "月間検索数", "カテゴリ"], rows)
+
+        rows = [
+            f'<td class="col-kw">{html.escape(old.keywords[j])}</td><td class="col-vol">{old.volume[j]:,}</td><td>{_category_badge(old, j)}</td>'
+            for j in diff.top_lost()
+        ]
+        if rows:
+            numbered_table(out, f"消失キーワード（{len(diff.lost):,}件中 上位{len(rows)}件）", ["キーワード", "前回の月間検索数", "カテゴリ"], rows)
+
+        up, down = diff.movers()
+        for label, moves in (("検索数が増えたキーワード", up), ("検索数が減ったキーワード", down)):
+            rows = [
+                f'<td class="col-kw">{html.escape(new.keywords[i])}</td><td class="col-vol">{old.volume[j]:,}</td>'
+                f'<td class="col-vol">{new.volume[i]:,}</td><td class="col-vol">{delta:+,}</td>'
+                for j, i, delta in moves
+            ]
+            if rows:
+                numbered_table(out, label, ["キーワード", "前回", "今回", "増減"], rows)
+
+        up, down = diff.rank_changes()
+        for label, moves in (("検索順位が上がったキーワード", up), ("検索順位が下がったキーワード", down)):
+            rows = [
+                f'<td class="col-kw">{html.escape(new.keywords[i])}</td><td class="col-vol">{_rank(old.rank[j])}</td>'
+                f'<td class="col-vol">{_rank(new.rank[i])}</td><td class="col-vol">{new.traffic[i]:,}</td>'
+                for j, i in moves
+            ]
+            if rows:
+                numbered_table(out, label, ["キーワード", "前回の順位", "今回の順位", "推定流入数"], rows)
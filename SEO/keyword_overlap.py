@@ -0,0 +1,234 @@
+"""
+企業間のキーワード重複・ギャップ分析
+
+正規化したキーワードに整数IDを振り、企業ごとの出現をビットセット（int）で持つ。
+共通数は (a & b).bit_count()、固有数は (a & ~b).bit_count() で求まるので、
+文字列どうしを総当たりで比べる必要がない。
+"""
+
+import csv
+import heapq
+import html
+from array import array
+
+from keyword_search import normalize_keyword
+
+GAP_LIMIT = 300  # ダッシュボードに出すギャップキーワード数
+
+
+def bitset_from_ids(ids, size):
+    """IDの集まりからビットセット（int）を作る"""
+    buf = bytearray((size + 7) // 8)
+    for i in ids:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, 'little')
+
+
+def iter_bits(bits):
+    """ビットセットの立っているIDを昇順に返す"""
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    for byte_index, byte in enumerate(data):
+        while byte:
+            low = byte & -byte
+            yield byte_index * 8 + low.bit_length() - 1
+            byte ^= low
+
+
+class OverlapResult:
+    """重複・ギャップ分析の結果"""
+
+    def __init__(self, companies, self_key, keywords, volumes, bitsets, members):
+        self.companies = companies  # [(企業キー, 表示名, アイコン), ...]
+        self.self_key = self_key
+        self.keywords = keywords    # ID → 表示用キーワード（検索数最大の表記）
+        self.volumes = volumes      # ID → 最大月間検索数
+        self.bitsets = bitsets      # {企業キー: ビットセット} 集計用
+        self.members = members      # {企業キー: bytearray(ID → 0/1)} 個別判定用
+
+    def shared(self, a, b):
+        """a と b の共通キーワード数"""
+        return (self.bitsets[a] & self.bitsets[b]).bit_count()
+
+    def only(self, a, b):
+        """a にあって b に無いキーワード数"""
+        return (self.bitsets[a] & ~self.bitsets[b]).bit_count()
+
+    def matrix(self):
+        """全企業ペアの共通キーワード数 [[int]]"""
+        keys = [key for key, _, _ in self.companies]
+        return [[self.shared(a, b) for b in keys] for a in keys]
+
+    def pairs(self):
+        """自社と各競合の比較を dict のリストで返す"""
+        rows = []
+        for key, name, icon in self.companies:
+            if key == self.self_key:
+                continue
+            shared = self.shared(self.self_key, key)
+            union = (self.bitsets[self.self_key] | self.bitsets[key]).bit_count()
+            rows.append({
+                "key": key,
+                "name": name,
+                "icon": icon,
+                "shared": shared,
+                "self_only": self.only(self.self_key, key),
+                "competitor_only": self.only(key, self.self_key),
+                "jaccard": shared / union if union else 0.0,
+            })
+        return rows
+
+    def gaps(self, limit=GAP_LIMIT):
+        """競合にあって自社に無いキーワードを月間検索数の降順で返す
+
+        各要素は {"keyword", "volume", "competitors": [企業キー, ...]}。
+        """
+        competitors = [key for key, _, _ in self.companies if key != self.self_key]
+        union = 0
+        for key in competitors:
+            union |= self.bitsets[key]
+        gap_ids = iter_bits(union & ~self.bitsets[self.self_key])
+        if limit:
+            gap_ids = heapq.nlargest(limit, gap_ids, key=self.volumes.__getitem__)
+        else:
+            gap_ids = sorted(gap_ids, key=self.volumes.__getitem__, reverse=True)
+        return [
+            {
+                "keyword": self.keywords[i],
+                "volume": self.volumes[i],
+                "competitors": [key for key in competitors if self.members[key][i]],
+            }
+            for i in gap_ids
+        ]
+
+
+def compute_overlap(all_data, companies, self_key):
+    """{企業キー: KeywordTable} から重複・ギャップを計算"""
+    ids = {}
+    keywords = []
+    volumes = array('q')
+    company_ids = {}
+
+    for key, _, _ in companies:
+        table = all_data.get(key)
+        members = set()
+        if table is not None:
+            for keyword, volume in zip(table.keywords, table.volume):
+                norm = normalize_keyword(keyword)
+                if not norm:
+                    continue
+                i = ids.get(norm)
+                if i is None:
+                    i = ids[norm] = len(keywords)
+                    keywords.append(keyword)
+                    volumes.append(volume)
+                elif volume > volumes[i]:
+                    keywords[i] = keyword
+                    volumes[i] = volume
+                members.add(i)
+        company_ids[key] = members
+
+    size = len(keywords)
+    bitsets = {}
+    members = {}
+    for key, id_set in company_ids.items():
+        bitsets[key] = bitset_from_ids(id_set, size)
+        flags = members[key] = bytearray(size)
+        for i in id_set:
+            flags[i] = 1
+    return OverlapResult(list(companies), self_key, keywords, volumes, bitsets, members)
+
+
+def export_overlap_csv(result, pairs_path, gaps_path):
+    """比較表とギャップ一覧をCSV（Excel向けUTF-8 BOM付き）で書き出す"""
+    names = {key: name for key, name, _ in result.companies}
+    self_name = names[result.self_key]
+
+    with open(pairs_path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["自社", "競合", "共通", "自社固有", "競合固有", "Jaccard"])
+        for row in result.pairs():
+            writer.writerow([
+                self_name, row["name"], row["shared"], row["self_only"],
+                row["competitor_only"], f"{row['jaccard']:.4f}",
+            ])
+
+    with open(gaps_path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["キーワード", "月間検索数", "競合数", "競合"])
+        for gap in result.gaps(limit=None):
+            writer.writerow([
+                gap["keyword"], gap["volume"], len(gap["competitors"]),
+                " / ".join(names[key] for key in gap["competitors"]),
+            ])
+
+
+def render_overlap_page(out, result, gap_limit=GAP_LIMIT):
+    """重複・ギャップページの本体を書き出す"""
+    icons = {key: icon for key, _, icon in result.companies}
+    out.write(f'''            <div class="header-card" style="--primary-color: #5f27cd; --secondary-color: #16213e;">
+                <h2>🧮 キーワード重複・ギャップ分析</h2>
+                <p>正規化キーワード {len(result.keywords):,}語での企業間比較（表記ゆれは同一視）</p>
+            </div>
+
+            <div class="stats-grid">
+''')
+    for row in result.pairs():
+        out.write(f'''                <div class="stat-card">
+                    <h4>{row["icon"]} {html.escape(row["name"])}との共通</h4>
+                    <div class="value">{row["shared"]:,}</div>
+                    <div class="sub">自社固有 {row["self_only"]:,} / 競合固有 {row["competitor_only"]:,} / Jaccard {row["jaccard"]:.1%}</div>
+                </div>
+''')
+    out.write('''            </div>
+
+            <div class="table-container" style="margin-bottom: 20px;">
+                <div class="table-header">
+                    <h3>共通キーワード数マトリクス</h3>
+                </div>
+                <div class="table-wrapper">
+                    <table>
+                        <thead>
+                            <tr>
+                                <th></th>
+''')
+    for _, name, icon in result.companies:
+        out.write(f'''                                <th>{icon} {html.escape(name)}</th>
+''')
+    out.write('''                            </tr>
+                        </thead>
+                        <tbody>
+''')
+    for (_, name, icon), counts in zip(result.companies, result.matrix()):
+        cells = "".join(f'<td class="col-vol">{count:,}</td>' for count in counts)
+        out.write(f'''                            <tr><td class="col-kw">{icon} {html.escape(name)}</td>{cells}</tr>
+''')
+    out.write(f'''                        </tbody>
+                    </table>
+                </div>
+            </div>
+
+            <div class="table-container">
+                <div class="table-header">
+                    <h3>ギャップ：競合にあって自社に無いキーワード（上位{gap_limit}件）</h3>
+                </div>
+                <div class="table-wrapper">
+                    <table>
+                        <thead>
+                            <tr>
+                                <th class="col-no">#</th>
+                                <th>キーワード</th>
+                                <th>月間検索数</th>
+                                <th>競合</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+''')
+    for i, gap in enumerate(result.gaps(limit=gap_limit), 1):
+        competitors = " ".join(icons[key] for key in gap["competitors"])
+        out.write(f'''                            <tr><td class="col-no">{i}</td><td class="col-kw">{html.escape(gap["keyword"])}</td><td class="col-vol">{gap["volume"]:,}</td><td>{competitors}</td></tr>
+''')
+    out.write('''                        </tbody>
+                    </table>
+                </div>
+            </div>
+''')
@@ -0,0 +1,300 @@
+"""
+競合のページ（*_ページ.csv）と競合ドメイン（*_競合.csv）の読み込み・結合
+
+キーワード → ページ → ドメイン の対応は読み込み時に一度だけ辞書で引き、
+行番号の配列にしておく。以降の集計は配列をなめるだけで、
+CSVを読み直したり二重ループで突き合わせたりしない。
+"""
+
+import heapq
+import html
+from array import array
+from urllib.parse import urlsplit
+
+PAGE_LIMIT = 20    # 企業ごとに出すページ数
+DOMAIN_LIMIT = 30  # 競合ドメイン表に出すドメイン数
+
+
+def url_domain(url):
+    """URLのホスト名（小文字、先頭の www. は除く）"""
+    host = (urlsplit(url).hostname or "") if url else ""
+    return host[4:] if host.startswith("www.") else host
+
+
+class PageTable:
+    """ページ一覧（URL → 推定流入数 / キーワード数 / トップキーワード）
+
+    index は URL → 行番号、domain は domain_names のインデックス。
+    """
+
+    def __init__(self):
+        self.titles = []
+        self.urls = []
+        self.traffic = array('q')
+        self.keyword_count = array('l')
+        self.value = array('q')
+        self.top_keyword = []
+        self.domain = array('H')
+        self.domain_names = []
+        self.index = {}
+        self._domain_codes = {}
+
+    def __len__(self):
+        return len(self.urls)
+
+    def append(self, title, url, traffic=0, keyword_count=0, value=0, top_keyword=""):
+        """1ページを追加（同じURLが続いた場合は最初の行を残す）"""
+        if url in self.index:
+            return
+        domain = url_domain(url)
+        code = self._domain_codes.get(domain)
+        if code is None:
+            code = self._domain_codes[domain] = len(self.domain_names)
+            self.domain_names.append(domain)
+        self.index[url] = len(self.urls)
+        self.titles.append(title)
+        self.urls.append(url)
+        self.traffic.append(traffic)
+        self.keyword_count.append(keyword_count)
+        self.value.append(value)
+        self.top_keyword.append(top_keyword)
+        self.domain.append(code)
+
+    def find(self, url):
+        """URLの行番号（無ければ -1）"""
+        return self.index.get(url, -1)
+
+
+class DomainTable:
+    """競合ドメイン一覧（1企業分の 競合.csv）
+
+    shared_rate は重複率（0〜1）、index は ドメイン → 行番号。
+    """
+
+    def __init__(self):
+        self.domains = []
+        self.titles = []
+        self.shared = array('l')
+        self.shared_rate = array('d')
+        self.competitor_only = array('l')
+        self.target_only = array('l')
+        self.traffic = array('q')
+        self.keyword_count = array('l')
+        self.value = array('q')
+        self.pages = array('l')
+        self.index = {}
+
+    def __len__(self):
+        return len(self.domains)
+
+    def append(self, domain, title="", shared=0, shared_rate=0.0, competitor_only=0,
+               target_only=0, traffic=0, keyword_count=0, value=0, pages=0):
+        """1ドメインを追加"""
+        domain = domain.lower()
+        if domain in self.index:
+            return
+        self.index[domain] = len(self.domains)
+        self.domains.append(domain)
+        self.titles.append(title)
+        self.shared.append(shared)
+        self.shared_rate.append(shared_rate)
+        self.competitor_only.append(competitor_only)
+        self.target_only.append(target_only)
+        self.traffic.append(traffic)
+        self.keyword_count.append(keyword_count)
+        self.value.append(value)
+        self.pages.append(pages)
+
+
+class SiteData:
+    """1企業分のキーワード・ページ・競合ドメインを結合したもの
+
+    keyword_page[i]  キーワード行iが順位を取っているページの行番号（無ければ -1）
+    page_keywords[p] ページpに結合されたキーワード数
+    page_traffic[p]  ページpに結合されたキーワードの推定流入数の合計
+    """
+
+    def __init__(self, key, keywords, pages, domains):
+        self.key = key
+        self.keywords = keywords
+        self.pages = pages
+        self.domains = domains
+
+        # URLはテーブル内でコード化済みなので、コード → ページ行 を1回引けば足りる
+        url_page = array('l', (pages.find(url) for url in keywords.url_names))
+        self.keyword_page = array('l', (url_page[code] for code in keywords.url))
+
+        self.page_keywords = array('l', [0]) * len(pages)
+        self.page_traffic = array('q', [0]) * len(pages)
+        for p, traffic in zip(self.keyword_page, keywords.traffic):
+            if p >= 0:
+                self.page_keywords[p] += 1
+                self.page_traffic[p] += traffic
+
+    def joined(self):
+        """ページに結合できたキーワード行の数"""
+        return sum(1 for p in self.keyword_page if p >= 0)
+
+    def top_pages(self, n=PAGE_LIMIT):
+        """推定流入数の上位ページの行番号"""
+        return heapq.nlargest(n, range(len(self.pages)), key=self.pages.traffic.__getitem__)
+
+    def domain_totals(self):
+        """自サイトのドメイン別 {ドメイン: {"pages", "traffic", "keywords"}}"""
+        pages = self.pages
+        totals = [[0, 0, 0] for _ in pages.domain_names]
+        for p, code in enumerate(pages.domain):
+            total = totals[code]
+            total[0] += 1
+            total[1] += pages.traffic[p]
+            total[2] += self.page_keywords[p]
+        return {
+            domain: {"pages": t[0], "traffic": t[1], "keywords": t[2]}
+            for domain, t in zip(pages.domain_names, totals)
+        }
+
+    def own_domains(self):
+        """ページ一覧に出てくる自サイトのドメイン"""
+        return list(self.pages.domain_names)
+
+
+class DomainIndex:
+    """全企業の競合ドメインを ドメイン → 出現箇所 で引く索引
+
+    entries[ドメイン] は [(企業キー, DomainTable の行番号), ...]、
+    owners[ドメイン] はそのドメインを自サイトとして持つ企業キー。
+    """
+
+    def __init__(self, sites):
+        self.sites = sites
+        self.entries = {}
+        self.owners = {}
+        for key, site in sites.items():
+            for row, domain in enumerate(site.domains.domains):
+                self.entries.setdefault(domain, []).append((key, row))
+            for domain in site.own_domains():
+                if domain:
+                    self.owners.setdefault(domain, key)
+
+    def lookup(self, domain):
+        """ドメインを競合として挙げている (企業キー, 行番号) のリスト"""
+        return self.entries.get(domain.lower(), [])
+
+    def ranked(self, limit=DOMAIN_LIMIT):
+        """挙げている企業数 → 推定流入数（最大）の順にドメインを返す
+
+        各要素は {"domain", "companies", "traffic", "keywords", "title", "owner"}。
+        """
+        rows = []
+        for domain, entries in self.entries.items():
+            traffic = keywords = 0
+            title = ""
+            for key, row in entries:
+                table = self.sites[key].domains
+                traffic = max(traffic, table.traffic[row])
+                keywords = max(keywords, table.keyword_count[row])
+                title = title or table.titles[row]
+            rows.append({
+                "domain": domain,
+                "companies": [key for key, _ in entries],
+                "traffic": traffic,
+                "keywords": keywords,
+                "title": title,
+                "owner": self.owners.get(domain, ""),
+            })
+        key = lambda r: (len(r["companies"]), r["traffic"])
+        return heapq.nlargest(limit, rows, key=key) if limit else sorted(rows, key=key, reverse=True)
+
+
+def render_pages_page(out, sites, companies):
+    """ページ・ドメインページの本体を書き出す
+
+    sites は {企業キー: SiteData}、companies は [(企業キー, 表示名, アイコン), ...]。
+    """
+    icons = {key: icon for key, _, icon in companies}
+    out.write('''            <div class="header-card" style="--primary-color: #2e86de; --secondary-color: #16213e;">
+                <h2>🌐 ページ・ドメイン分析</h2>
+                <p>キーワード → ページ → ドメイン を結合した推定流入数の集計</p>
+            </div>
+''')
+    if not sites:
+        out.write('''            <div class="summary-card"><p>ページ・競合ドメインのCSVがありません。</p></div>
+''')
+        return
+
+    for key, name, icon in companies:
+        site = sites.get(key)
+        if site is None:
+            continue
+        pages = site.pages
+        domains = " / ".join(html.escape(d) for d in site.own_domains() if d)
+        per_domain = " / ".join(
+            f"{html.escape(d)} {t['traffic']:,}（{t['pages']:,}ページ）"
+            for d, t in site.domain_totals().items() if d
+        )
+        joined = site.joined()
+        rate = joined / len(site.keywords) if len(site.keywords) else 0.0
+        out.write(f'''
+            <h3 style="margin: 10px 0 15px;">{icon} {html.escape(name)}（{domains}）</h3>
+            <div class="stats-grid">
+                <div class="stat-card">
+                    <h4>ページ数</h4>
+                    <div class="value">{len(pages):,}</div>
+                </div>
+                <div class="stat-card">
+                    <h4>推定流入数（ページ合計）</h4>
+                    <div class="value">{sum(pages.traffic):,}</div>
+                    <div class="sub">{per_domain}</div>
+                </div>
+                <div class="stat-card">
+                    <h4>ページに結合できたキーワード</h4>
+                    <div class="value">{joined:,}</div>
+                    <div class="sub">{len(site.keywords):,}件中 {rate:.0%}</div>
+                </div>
+            </div>
+
+            <div class="table-container" style="margin-bottom: 20px;">
+                <div class="table-header">
+                    <h3>推定流入数の上位ページ（{PAGE_LIMIT}件）</h3>
+                </div>
+                <div class="table-wrapper">
+                    <table>
+                        <thead>
+                            <tr><th class="col-no">#</th><th>ページ</th><th>推定流入数</th><th>キーワード数</th><th>取得キーワード</th><th>取得キーワードの流入</th><th>トップキーワード</th></tr>
+                        </thead>
+                        <tbody>
+''')
+        for rank, p in enumerate(site.top_pages(), 1):
+            title = html.escape(pages.titles[p] or pages.urls[p])
+            url = html.escape(pages.urls[p])
+            out.write(f'''                            <tr><td class="col-no">{rank}</td><td class="col-kw"><a href="{url}" target="_blank" rel="noopener">{title}</a></td><td class="col-vol">{pages.traffic[p]:,}</td><td class="col-vol">{pages.keyword_count[p]:,}</td><td class="col-vol">{site.page_keywords[p]:,}</td><td class="col-vol">{site.page_traffic[p]:,}</td><td>{html.escape(pages.top_keyword[p])}</td></tr>
+''')
+        out.write('''                        </tbody>
+                    </table>
+                </div>
+            </div>
+''')
+
+    index = DomainIndex(sites)
+    out.write(f'''
+            <div class="table-container">
+                <div class="table-header">
+                    <h3>競合ドメイン（挙げている企業数順、上位{DOMAIN_LIMIT}件）</h3>
+                </div>
+                <div class="table-wrapper">
+                    <table>
+                        <thead>
+                            <tr><th class="col-no">#</th><th>ドメイン</th><th>挙げている企業</th><th>推定流入数</th><th>キーワード数</th><th>サイト</th></tr>
+                        </thead>
+                        <tbody>
+''')
+    for rank, row in enumerate(index.ranked(), 1):
+        listed = " ".join(icons.get(key, "") for key in row["companies"])
+        owner = f' <span class="badge badge-cat">{icons.get(row["owner"], "")} 分析対象</span>' if row["owner"] else ""
+        out.write(f'''                            <tr><td class="col-no">{rank}</td><td class="col-kw">{html.escape(row["domain"])}{owner}</td><td>{listed}</td><td class="col-vol">{row["traffic"]:,}</td><td class="col-vol">{row["keywords"]:,}</td><td>{html.escape(row["title"])}</td></tr>
+''')
+    out.write('''                        </tbody>
+                    </table>
+                </div>
+            </div>
+''')
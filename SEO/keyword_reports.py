@@ -0,0 +1,632 @@
+"""
+1回の読み込み・集計から複数のレポートを書き出す（--reports）
+
+読み込んだテーブルと集計結果（狙い目スコア・分類・ページ結合・重複など）を
+ReportContext にまとめておき、各レポート（ReportRenderer）はそれを読むだけにする。
+集計は書き出しの前に済ませてあり、レポート側は書き換えないので、
+スレッドで並行に書き出しても共有してよい。
+
+    ReportRenderer(name, label, render, final=False)
+
+render(context) は書き出したファイルのパスのリストを返す。
+final=True のもの（ポータルなど）は、他のレポートが終わってから
+context.outputs（{name: [パス, ...]}）を見て書き出す。
+"""
+
+import csv
+import html
+import json
+import os
+import re
+import time
+import zipfile
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from xml.sax.saxutils import escape as xml_escape
+
+from keyword_classifier import DIMENSIONS
+from keyword_table import MISSING
+
+WIKI_ROW_LIMIT = 1000           # 企業Wikiのキーワード一覧に出す行数
+WIKI_TOP_LIMIT = 20             # 企業Wikiの狙い目・ページの件数
+CLASSIFICATION_LIST_LIMIT = 500  # 分類一覧のカテゴリごとの件数
+DIMENSION_TITLES = {"category": "カテゴリ", "target": "ターゲット", "cv_distance": "CV距離"}
+EXPORT_COLUMNS = (
+    "企業", "キーワード", "月間検索数", "SEO難易度", "CPC($)", "競合性", "検索順位", "推定流入数",
+    "URL", "調査カテゴリ", "狙い目スコア", "分類カテゴリ", "ターゲット", "CV距離",
+)
+
+# XMLに書けない制御文字（XLSXのセルから除く）
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+ReportRenderer = namedtuple("ReportRenderer", ["name", "label", "render", "final"], defaults=(False,))
+
+
+class ReportContext:
+    """レポートが共有する読み込み済みデータと集計結果
+
+    all_data    {企業キー: KeywordTable}
+    companies   [(企業キー, 表示名, アイコン), ...]
+    colors      {企業キー: テーマ色}
+    scoring / classification / overlap / sites / trends / dedup は各段階の結果（無ければ None）。
+    trends は {企業キー: TrendMetrics}、links は ポータルに並べる既存レポート [(ラベル, パス)]。
+    outputs / labels は run_renderers が書き出したレポートごとに埋める（{name: [パス, ...]} / {name: label}）。
+    """
+
+    def __init__(self, all_data, companies, output_dir, self_key, colors=None, scoring=None,
+                 classification=None, overlap=None, sites=None, trends=None, dedup=None, links=()):
+        self.all_data = all_data
+        self.companies = companies
+        self.output_dir = output_dir
+        self.self_key = self_key
+        self.colors = colors or {}
+        self.scoring = scoring
+        self.classification = classification
+        self.overlap = overlap
+        self.sites = sites or {}
+        self.trends = trends or {}
+        self.dedup = dedup
+        self.links = list(links)
+        self.outputs = {}
+        self.labels = {}
+
+    def name(self, key):
+        return next((name for k, name, _ in self.companies if k == key), key)
+
+    def path(self, filename):
+        """output_dir 内のパス（output_dir は初回に作る）"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        return self.output_dir / filename
+
+
+def run_renderers(renderers, context, jobs=None):
+    """レポートを並行に書き出す
+
+    戻り値は [(ReportRenderer, [パス, ...], 秒, 例外 or None), ...]（renderers の順）。
+    1つが失敗しても他のレポートは書き出す。
+    """
+    def run(renderer):
+        started = time.perf_counter()
+        try:
+            paths = list(renderer.render(context))
+            error = None
+        except Exception as e:
+            paths, error = [], e
+        return renderer, paths, time.perf_counter() - started, error
+
+    results = {}
+    batches = [[r for r in renderers if not r.final], [r for r in renderers if r.final]]
+    for batch in batches:
+        if not batch:
+            continue
+        with ThreadPoolExecutor(max_workers=jobs or len(batch)) as pool:
+            for renderer, paths, seconds, error in pool.map(run, batch):
+                results[renderer.name] = (renderer, paths, seconds, error)
+                context.outputs[renderer.name] = paths
+                context.labels[renderer.name] = renderer.label
+    return [results[r.name] for r in renderers]
+
+
+# ===== 共通のHTML =====
+
+WIKI_STYLE = '''
+        * { box-sizing: border-box; margin: 0; padding: 0; }
+        body { font-family: -apple-system, BlinkMacSystemFont, "Hiragino Sans", sans-serif; background: #f5f5f5; color: #333; }
+        .wiki-container { display: flex; min-height: 100vh; }
+        .sidebar { width: 240px; background: #2c3e50; color: white; position: fixed; height: 100vh; overflow-y: auto; }
+        .sidebar-header { padding: 20px; border-bottom: 1px solid #34495e; }
+        .sidebar-header h1 { font-size: 20px; }
+        .sidebar-header p { font-size: 12px; opacity: 0.6; margin-top: 6px; }
+        .nav-item { display: block; padding: 10px 20px; color: #ecf0f1; text-decoration: none; font-size: 14px; }
+        .nav-item:hover { background: #34495e; }
+        .main { margin-left: 240px; flex: 1; padding: 30px 40px; max-width: 1200px; }
+        .section { background: white; border-radius: 8px; padding: 24px; margin-bottom: 24px; box-shadow: 0 1px 3px rgba(0,0,0,0.08); }
+        .section h2 { font-size: 18px; margin-bottom: 16px; padding-left: 10px; border-left: 4px solid var(--accent-color, #667eea); }
+        .stats-grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(180px, 1fr)); gap: 16px; }
+        .stat-card { background: #f8f9fa; border-radius: 8px; padding: 16px; }
+        .stat-card h4 { font-size: 12px; color: #7f8c8d; margin-bottom: 6px; }
+        .stat-card .value { font-size: 24px; font-weight: bold; color: var(--accent-color, #667eea); }
+        .stat-card .sub { font-size: 11px; color: #95a5a6; margin-top: 4px; }
+        .table-wrapper { overflow-x: auto; }
+        .data-table { width: 100%; border-collapse: collapse; font-size: 13px; }
+        .data-table th { background: #f1f3f5; text-align: left; padding: 8px 10px; position: sticky; top: 0; }
+        .data-table td { padding: 7px 10px; border-bottom: 1px solid #eee; }
+        .data-table td.number { text-align: right; font-variant-numeric: tabular-nums; }
+        .badge { display: inline-block; font-size: 11px; padding: 2px 8px; border-radius: 10px; background: #eef2ff; color: #4c51bf; }
+        .filters { margin-bottom: 12px; }
+        .filters input { padding: 8px 12px; border: 1px solid #ddd; border-radius: 6px; width: 300px; }
+        a.url-link { color: #2980b9; text-decoration: none; }
+'''
+
+FILTER_SCRIPT = '''
+<script>
+// 絞り込みは行のDOMを読まずに、表ごとに埋め込んだ検索用の文字列（keys-表ID）で行う。
+// 表示が変わる行だけ style を書き換える。
+const FILTER_DELAY = 150;
+const filterIndex = {};
+let filterTimer = null;
+
+function filterRows(input, tableId) {
+    clearTimeout(filterTimer);
+    filterTimer = setTimeout(() => applyFilter(tableId, input.value), FILTER_DELAY);
+}
+
+function applyFilter(tableId, value) {
+    let t = filterIndex[tableId];
+    if (!t) {
+        const keys = JSON.parse(document.getElementById('keys-' + tableId).textContent);
+        t = filterIndex[tableId] = {
+            lower: keys.map(k => k.toLowerCase()),
+            rows: document.getElementById(tableId).tBodies[0].rows,
+            shown: new Uint8Array(keys.length).fill(1),
+        };
+    }
+    const q = value.trim().toLowerCase();
+    for (let i = 0; i < t.lower.length; i++) {
+        const show = !q || t.lower[i].includes(q) ? 1 : 0;
+        if (show !== t.shown[i]) {
+            t.shown[i] = show;
+            t.rows[i].style.display = show ? '' : 'none';
+        }
+    }
+}
+</script>
+'''
+
+
+def open_document(out, title, color, heading, subtitle, nav):
+    """nav は [(アンカー, ラベル), ...]"""
+    items = "".join(f'            <a class="nav-item" href="#{anchor}">{label}</a>\n' for anchor, label in nav)
+    out.write(f'''<!DOCTYPE html>
+<html lang="ja">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{html.escape(title)}</title>
+    <style>{WIKI_STYLE}    </style>
+</head>
+<body style="--accent-color: {color};">
+<div class="wiki-container">
+    <aside class="sidebar">
+        <div class="sidebar-header">
+            <h1>{heading}</h1>
+            <p>{subtitle}</p>
+        </div>
+        <nav>
+{items}        </nav>
+    </aside>
+    <main class="main">
+''')
+
+
+def close_document(out):
+    out.write('''    </main>
+</div>
+''' + FILTER_SCRIPT + '''</body>
+</html>
+''')
+
+
+def html_table(out, headers, rows, table_id="", search=None):
+    """rows は <td> を並べた文字列のリスト
+
+    search（行ごとの検索用の文字列）を渡すと keys-{table_id} に埋め込み、filterRows で絞り込めるようにする。
+    """
+    head = "".join(f"<th>{h}</th>" for h in headers)
+    id_attr = f' id="{table_id}"' if table_id else ""
+    out.write(f'''            <div class="table-wrapper">
+                <table class="data-table"{id_attr}>
+                    <thead><tr>{head}</tr></thead>
+                    <tbody>
+''')
+    for cells in rows:
+        out.write(f"                        <tr>{cells}</tr>\n")
+    out.write('''                    </tbody>
+                </table>
+            </div>
+''')
+    if search is not None:
+        text = json.dumps(list(search), ensure_ascii=False, separators=(',', ':')).replace("</", "<\\/")
+        out.write(f'''            <script type="application/json" id="keys-{table_id}">{text}</script>
+''')
+
+
+def numbered_table(out, title, headers, rows):
+    """統合ダッシュボードのページ用の、見出しと行番号つきの表（rows は <td> を並べた文字列のリスト）"""
+    head = "".join(f"<th>{h}</th>" for h in headers)
+    out.write(f'''            <div class="table-container" style="margin-bottom: 20px;">
+                <div class="table-header">
+                    <h3>{title}</h3>
+                </div>
+                <div class="table-wrapper">
+                    <table>
+                        <thead>
+                            <tr><th class="col-no">#</th>{head}</tr>
+                        </thead>
+                        <tbody>
+''')
+    for n, cells in enumerate(rows, 1):
+        out.write(f'''                            <tr><td class="col-no">{n}</td>{cells}</tr>
+''')
+    out.write('''                        </tbody>
+                    </table>
+                </div>
+            </div>
+''')
+
+
+def stat_card(label, value, sub=""):
+    sub = f'<div class="sub">{sub}</div>' if sub else ""
+    return f'<div class="stat-card"><h4>{label}</h4><div class="value">{value}</div>{sub}</div>'
+
+
+def write_text(path, writer):
+    with open(path, 'w', encoding='utf-8', buffering=1 << 20) as out:
+        writer(out)
+    return path
+
+
+# ===== 企業Wiki =====
+
+def render_company_wikis(context):
+    """企業ごとのWiki風レポート（{企業キー}_キーワード分析.html）"""
+    return [
+        write_text(context.path(f"{key}_キーワード分析.html"),
+                    lambda out, key=key, name=name, icon=icon: _company_wiki(out, context, key, name, icon))
+        for key, name, icon in context.companies
+        if key in context.all_data
+    ]
+
+
+def _company_wiki(out, context, key, name, icon):
+    table = context.all_data[key]
+    site = context.sites.get(key)
+    is_self = key == context.self_key
+    nav = [("overview", "📊 概要"), ("categories", "📁 カテゴリ")]
+    if context.scoring is not None:
+        nav.append(("scoring", "🎯 狙い目"))
+    if site is not None and len(site.pages):
+        nav.append(("pages", "🌐 上位ページ"))
+    if context.classification is not None:
+        nav.append(("classification", "🏷️ 分類"))
+    nav.append(("keywords", "📋 キーワード一覧"))
+    open_document(out, f"SEO分析Wiki - {name}", context.colors.get(key, "#667eea"),
+                   f"{icon} {html.escape(name)}", "キーワード分析レポート", nav)
+
+    # 概要
+    stats = [
+        stat_card("キーワード数", f"{len(table):,}"),
+        stat_card("月間検索数", f"{table.total_volume():,}"),
+    ]
+    if not is_self:
+        stats.append(stat_card("推定流入数", f"{sum(table.traffic):,}"))
+    if is_self and context.dedup is not None:
+        stats.append(stat_card("表記ゆれ除外後", f"{len(context.dedup.clusters):,}語",
+                           f"検索数 {context.dedup.total_volume():,}"))
+    if context.overlap is not None and not is_self:
+        for pair in context.overlap.pairs():
+            if pair["key"] == key:
+                stats.append(stat_card("自社との共通", f"{pair['shared']:,}",
+                                   f"競合固有 {pair['competitor_only']:,} / Jaccard {pair['jaccard']:.1%}"))
+    if site is not None:
+        stats.append(stat_card("ページ数", f"{len(site.pages):,}", f"結合 {site.joined():,}件"))
+    out.write(f'''        <div class="section" id="overview">
+            <h2>📊 概要</h2>
+            <div class="stats-grid">{"".join(stats)}</div>
+        </div>
+''')
+
+    # カテゴリ
+    out.write('''        <div class="section" id="categories">
+            <h2>📁 カテゴリ</h2>
+''')
+    totals = table.category_totals()
+    rows = [
+        f'<td>{html.escape(cat or "（なし）")}</td><td class="number">{t["count"]:,}</td><td class="number">{t["volume"]:,}</td>'
+        for cat, t in sorted(totals.items(), key=lambda x: x[1]["volume"], reverse=True)
+    ]
+    html_table(out, ["カテゴリ", "キーワード数", "月間検索数"], rows)
+    out.write('''        </div>
+''')
+
+    # 狙い目
+    if context.scoring is not None:
+        scores = context.scoring.scores[key]
+        rows = [
+            f'<td>{html.escape(table.keywords[i])}</td><td class="number">{scores[i]:.1f}</td>'
+            f'<td class="number">{table.volume[i]:,}</td><td class="number">{"-" if table.difficulty[i] == MISSING else table.difficulty[i]}</td>'
+            for i in context.scoring.top_by_company[key][:WIKI_TOP_LIMIT]
+        ]
+        out.write('''        <div class="section" id="scoring">
+            <h2>🎯 狙い目キーワード</h2>
+''')
+        html_table(out, ["キーワード", "スコア", "月間検索数", "SEO難易度"], rows)
+        out.write('''        </div>
+''')
+
+    # 上位ページ
+    if site is not None and len(site.pages):
+        pages = site.pages
+        rows = [
+            f'<td><a class="url-link" href="{html.escape(pages.urls[p])}" target="_blank" rel="noopener">'
+            f'{html.escape(pages.titles[p] or pages.urls[p])}</a></td><td class="number">{pages.traffic[p]:,}</td>'
+            f'<td class="number">{pages.keyword_count[p]:,}</td><td>{html.escape(pages.top_keyword[p])}</td>'
+            for p in site.top_pages(WIKI_TOP_LIMIT)
+        ]
+        out.write('''        <div class="section" id="pages">
+            <h2>🌐 推定流入数の上位ページ</h2>
+''')
+        html_table(out, ["ページ", "推定流入数", "キーワード数", "トップキーワード"], rows)
+        out.write('''        </div>
+''')
+
+    # 分類
+    if context.classification is not None:
+        out.write('''        <div class="section" id="classification">
+            <h2>🏷️ 分類</h2>
+''')
+        for dim in DIMENSIONS:
+            counts = context.classification.counts(key, dim)
+            rows = [
+                f'<td>{html.escape(label)}</td><td class="number">{n:,}</td>'
+                for label, n in sorted(counts.items(), key=lambda x: x[1], reverse=True)
+            ]
+            out.write(f'''            <h3 style="margin: 12px 0 8px; font-size: 14px;">{DIMENSION_TITLES[dim]}</h3>
+''')
+            html_table(out, [DIMENSION_TITLES[dim], "キーワード数"], rows)
+        out.write('''        </div>
+''')
+
+    # キーワード一覧
+    rows = []
+    search = []
+    for i in table.top(WIKI_ROW_LIMIT):
+        code = table.category[i]
+        category = table.category_names[code]
+        badge = f'<span class="badge">{table.category_icons[code]} {html.escape(category)}</span>' if category else ""
+        rank = f'<td class="number">{table.rank[i] or "-"}</td>' if not is_self else ""
+        rows.append(f'<td>{html.escape(table.keywords[i])}</td><td class="number">{table.volume[i]:,}</td>{rank}<td>{badge}</td>')
+        search.append(f"{table.keywords[i]} {category}")
+    headers = ["キーワード", "月間検索数"] + ([] if is_self else ["検索順位"]) + ["カテゴリ"]
+    out.write(f'''        <div class="section" id="keywords">
+            <h2>📋 キーワード一覧（月間検索数の上位{min(len(table), WIKI_ROW_LIMIT):,}件）</h2>
+            <div class="filters"><input type="text" placeholder="キーワードを絞り込み..." oninput="filterRows(this, 'kw-table')"></div>
+''')
+    html_table(out, headers, rows, table_id="kw-table", search=search)
+    out.write('''        </div>
+''')
+    close_document(out)
+
+
+# ===== 分類一覧 =====
+
+def render_classification_list(context):
+    """全社のキーワードを分類カテゴリごとに並べた一覧（キーワード分類一覧.html）"""
+    if context.classification is None:
+        return []
+    return [write_text(context.path("キーワード分類一覧.html"),
+                        lambda out: _classification_list(out, context))]
+
+
+def _classification_list(out, context):
+    # 同じキーワードは検索数の大きい方を1回だけ
+    best = {}
+    for key, table in context.all_data.items():
+        for i, (keyword, volume) in enumerate(zip(table.keywords, table.volume)):
+            current = best.get(keyword)
+            if current is None or volume > current[0]:
+                best[keyword] = (volume, key, i)
+    by_category = {}
+    for keyword, (volume, key, i) in best.items():
+        labels = context.classification.row_labels(key, i)
+        by_category.setdefault(labels["category"], []).append((volume, keyword, labels, key))
+    categories = sorted(by_category.items(), key=lambda x: len(x[1]), reverse=True)
+
+    nav = [(f"cat-{n}", f"{html.escape(cat)}（{len(items):,}）") for n, (cat, items) in enumerate(categories)]
+    open_document(out, "キーワード分類一覧", "#8e44ad", "🏷️ キーワード分類一覧",
+                   f"全社 {len(best):,}キーワード", nav)
+    for n, (cat, items) in enumerate(categories):
+        items.sort(key=lambda x: x[0], reverse=True)
+        shown = items[:CLASSIFICATION_LIST_LIMIT]
+        rows = [
+            f'<td>{html.escape(keyword)}</td><td class="number">{volume:,}</td>'
+            f'<td>{html.escape(labels["target"])}</td><td>{html.escape(labels["cv_distance"])}</td>'
+            f'<td>{html.escape(context.name(key))}</td>'
+            for volume, keyword, labels, key in shown
+        ]
+        out.write(f'''        <div class="section" id="cat-{n}">
+            <h2>{html.escape(cat)}（{len(items):,}件{"、上位" + format(len(shown), ",") + "件を表示" if len(shown) < len(items) else ""}）</h2>
+            <div class="filters"><input type="text" placeholder="絞り込み..." oninput="filterRows(this, 'cat-table-{n}')"></div>
+''')
+        search = [
+            f'{keyword} {labels["target"]} {labels["cv_distance"]} {context.name(key)}'
+            for _, keyword, labels, key in shown
+        ]
+        html_table(out, ["キーワード", "月間検索数", "ターゲット", "CV距離", "出典"], rows,
+                   table_id=f"cat-table-{n}", search=search)
+        out.write('''        </div>
+''')
+    close_document(out)
+
+
+# ===== CSV / XLSX =====
+
+def export_rows(context, key):
+    """企業1社分の書き出し用の行（EXPORT_COLUMNS の順）"""
+    table = context.all_data[key]
+    scores = context.scoring.scores[key] if context.scoring is not None else None
+    name = context.name(key)
+    for i in range(len(table)):
+        labels = context.classification.row_labels(key, i) if context.classification is not None else {}
+        difficulty = table.difficulty[i]
+        yield (
+            name, table.keywords[i], table.volume[i], "" if difficulty == MISSING else difficulty,
+            table.cpc[i] / 100, table.competition[i], table.rank[i] or "", table.traffic[i],
+            table.url_names[table.url[i]], table.category_names[table.category[i]],
+            round(scores[i], 1) if scores is not None else "",
+            labels.get("category", ""), labels.get("target", ""), labels.get("cv_distance", ""),
+        )
+
+
+def export_csv(context):
+    """全社のキーワードを1つのCSV（Excelで開けるUTF-8 BOM付き）に書き出す"""
+    path = context.path("キーワード_全社.csv")
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(EXPORT_COLUMNS)
+        for key, _, _ in context.companies:
+            if key in context.all_data:
+                writer.writerows(export_rows(context, key))
+    return [path]
+
+
+def _column_letter(n):
+    letters = ""
+    n += 1
+    while n:
+        n, rem = divmod(n - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _sheet_name(name, used):
+    """Excelのシート名（31文字まで、使えない文字は _、重複は番号付き）"""
+    base = "".join("_" if c in '[]:*?/\\' else c for c in name)[:31] or "Sheet"
+    candidate, n = base, 2
+    while candidate in used:
+        suffix = f" ({n})"
+        candidate, n = base[:31 - len(suffix)] + suffix, n + 1
+    used.add(candidate)
+    return candidate
+
+
+def _write_sheet(f, rows):
+    f.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+            b'<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" state="frozen"/></sheetView></sheetViews>'
+            b'<sheetData>')
+    letters = [_column_letter(n) for n in range(len(EXPORT_COLUMNS))]
+    for r, row in enumerate(rows, 1):
+        cells = []
+        for letter, value in zip(letters, row):
+            ref = f"{letter}{r}"
+            if value == "" or value is None:
+                continue
+            if isinstance(value, (int, float)):
+                cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+            else:
+                cells.append(f'<c r="{ref}" t="inlineStr"><is><t>{xml_escape(_XML_ILLEGAL.sub("", str(value)))}</t></is></c>')
+        f.write(f'<row r="{r}">{"".join(cells)}</row>'.encode('utf-8'))
+    f.write(b'</sheetData></worksheet>')
+
+
+def export_xlsx(context):
+    """全社のキーワードを企業ごとのシートに分けたXLSXに書き出す（標準ライブラリのみ）"""
+    path = context.path("キーワード_全社.xlsx")
+    keys = [(key, name) for key, name, _ in context.companies if key in context.all_data]
+    used = set()
+    sheets = [_sheet_name(name, used) for _, name in keys]
+
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        overrides = "".join(
+            f'<Override PartName="/xl/worksheets/sheet{n}.xml" '
+            f'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for n in range(1, len(keys) + 1)
+        )
+        zf.writestr("[Content_Types].xml",
+                    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                    '<Default Extension="xml" ContentType="application/xml"/>'
+                    '<Override PartName="/xl/workbook.xml" '
+                    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+                    f'{overrides}</Types>')
+        zf.writestr("_rels/.rels",
+                    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                    '<Relationship Id="rId1" '
+                    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+                    'Target="xl/workbook.xml"/></Relationships>')
+        sheet_entries = "".join(
+            f'<sheet name="{xml_escape(sheet, {chr(34): "&quot;"})}" sheetId="{n}" r:id="rId{n}"/>'
+            for n, sheet in enumerate(sheets, 1)
+        )
+        zf.writestr("xl/workbook.xml",
+                    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+                    f'<sheets>{sheet_entries}</sheets></workbook>')
+        relationships = "".join(
+            f'<Relationship Id="rId{n}" '
+            f'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+            f'Target="worksheets/sheet{n}.xml"/>'
+            for n in range(1, len(keys) + 1)
+        )
+        zf.writestr("xl/_rels/workbook.xml.rels",
+                    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                    f'{relationships}</Relationships>')
+        for n, (key, _) in enumerate(keys, 1):
+            with zf.open(f"xl/worksheets/sheet{n}.xml", 'w') as f:
+                _write_sheet(f, [EXPORT_COLUMNS, *export_rows(context, key)])
+    return [path]
+
+
+# ===== ポータル =====
+
+def render_portal(context):
+    """書き出したレポートと既存のレポートへのリンク集（index.html）"""
+    path = context.path("index.html")
+    base = context.output_dir
+
+    def link(target):
+        return html.escape(os.path.relpath(target, base).replace(os.sep, "/"))
+
+    def write(out):
+        nav = [("reports", "📑 今回のレポート")] + ([("links", "📚 既存のレポート")] if context.links else [])
+        total = sum(len(t) for t in context.all_data.values())
+        open_document(out, "SEO分析 ポータル", "#64ffda", "📑 SEO分析 ポータル",
+                       f"全社 {total:,}キーワード", nav)
+        stats = "".join(
+            stat_card(f"{icon} {html.escape(name)}", f"{len(context.all_data[key]):,}",
+                  f"月間検索数 {context.all_data[key].total_volume():,}")
+            for key, name, icon in context.companies if key in context.all_data
+        )
+        out.write(f'''        <div class="section">
+            <h2>📊 企業</h2>
+            <div class="stats-grid">{stats}</div>
+        </div>
+        <div class="section" id="reports">
+            <h2>📑 今回のレポート</h2>
+''')
+        rows = [
+            f'<td>{html.escape(context.labels.get(name, name))}</td><td><a class="url-link" href="{link(p)}">{html.escape(p.name)}</a></td>'
+            for name, paths in context.outputs.items() for p in paths
+        ]
+        html_table(out, ["レポート", "ファイル"], rows)
+        out.write('''        </div>
+''')
+        if context.links:
+            rows = [
+                f'<td>{html.escape(label)}</td><td><a class="url-link" href="{link(p)}">{html.escape(p.name)}</a></td>'
+                for label, p in context.links
+            ]
+            out.write('''        <div class="section" id="links">
+            <h2>📚 既存のレポート</h2>
+''')
+            html_table(out, ["レポート", "ファイル"], rows)
+            out.write('''        </div>
+''')
+        close_document(out)
+
+    return [write_text(path, write)]
+
+
+# 標準のレポート（名前 → ReportRenderer）。統合ダッシュボードは generate_unified_html 側で足す
+STANDARD_RENDERERS = (
+    ReportRenderer("wiki", "企業Wiki", render_company_wikis),
+    ReportRenderer("classification", "分類一覧", render_classification_list),
+    ReportRenderer("csv", "CSV", export_csv),
+    ReportRenderer("xlsx", "XLSX", export_xlsx),
+    ReportRenderer("portal", "ポータル", render_portal, final=True),
+)
@@ -0,0 +1,209 @@
+"""
+キーワードの狙い目スコア（流入機会）
+
+月間検索数・SEO難易度・CPC・競合性、競合のキーワードなら推定流入数と検索順位を
+0〜1 に揃えて重み付きで足し、0〜100 のスコアにする。
+分母にはその行が持つ指標の重みだけを足す（推定流入数は順位か流入のある行、
+検索順位は順位のある行）ので、自社調査のような行も持っている指標だけで同じ 0〜100 の尺度になる。
+全社のテーブルを1パスで走査し、その場で企業別・カテゴリ別の上位K件を
+サイズK固定のヒープに積んでおくので、全件ソートはしない。
+"""
+
+import heapq
+import html
+import math
+from collections import namedtuple
+
+from keyword_search import normalize_keyword
+from keyword_table import MISSING
+
+TOP_K = 10
+STRIKING_RANK = (4, 20)  # 上位表示まであと一歩とみなす検索順位の範囲
+UNKNOWN_EASE = 0.5       # SEO難易度が未計測のときの「易しさ」
+
+# 各指標の重み（0で無効）。--weights volume=1,difficulty=2 のように上書きできる
+ScoreWeights = namedtuple(
+    "ScoreWeights", ["volume", "difficulty", "cpc", "competition", "traffic", "rank"],
+    defaults=(1.0, 1.0, 0.5, 0.3, 0.5, 0.3),
+)
+
+
+def parse_weights(text):
+    """「volume=1,difficulty=2」形式の文字列を ScoreWeights にする"""
+    weights = ScoreWeights()
+    if not text:
+        return weights
+    values = {}
+    for part in text.split(","):
+        name, sep, value = part.partition("=")
+        name = name.strip()
+        if not sep or name not in ScoreWeights._fields:
+            raise ValueError(f"重みの指定が不正です: {part}（指定できるのは {', '.join(ScoreWeights._fields)}）")
+        try:
+            weight = float(value)
+        except ValueError:
+            raise ValueError(f"重みは数値で指定してください: {part}") from None
+        # 負・NaN・無限大の重みではスコアが 0〜100 に収まらない
+        if not math.isfinite(weight) or weight < 0:
+            raise ValueError(f"重みは0以上の数で指定してください: {part}")
+        values[name] = weight
+    return weights._replace(**values)
+
+
+def _log_scale(maximum):
+    """log1p(x) / log1p(maximum) を返す関数（maximum が0なら常に0）"""
+    if maximum <= 0:
+        return lambda x: 0.0
+    denom = math.log1p(maximum)
+    return lambda x: math.log1p(x) / denom if x > 0 else 0.0
+
+
+class ScoreResult:
+    """スコアと上位K件
+
+    scores[企業キー][i]              行iのスコア（0〜100）
+    top_by_company[企業キー]         [行番号, ...] スコアの降順
+    top_by_category[企業キー][コード] [行番号, ...] スコアの降順
+    """
+
+    def __init__(self, weights, scores, top_by_company, top_by_category):
+        self.weights = weights
+        self.scores = scores
+        self.top_by_company = top_by_company
+        self.top_by_category = top_by_category
+
+
+def _push(heap, k, item):
+    if len(heap) < k:
+        heapq.heappush(heap, item)
+    elif item > heap[0]:
+        heapq.heappushpop(heap, item)
+
+
+def _drain(heap, table, k):
+    """ヒープをスコア降順の行番号にする（表記ゆれを含め同じキーワードは1回だけ）"""
+    rows = []
+    seen = set()
+    for _, neg_i in sorted(heap, reverse=True):
+        i = -neg_i
+        keyword = normalize_keyword(table.keywords[i])
+        if keyword in seen:
+            continue
+        seen.add(keyword)
+        rows.append(i)
+        if len(rows) >= k:
+            break
+    return rows
+
+
+def score_keywords(all_data, weights=None, k=TOP_K):
+    """{企業キー: KeywordTable} の全行をスコアリングして上位K件を集める
+
+    正規化の上限（最大検索数など）は全社共通なので、企業をまたいで比較できる。
+    """
+    weights = weights or ScoreWeights()
+    # 分母は分子に入る指標の重みの合計: 検索順位のある行は全指標、順位が無く流入だけある行は
+    # 検索順位を除いたもの、どちらも無い行（自社調査など）は推定流入数・検索順位を除いたもの
+    base_weight = weights.volume + weights.difficulty + weights.cpc + weights.competition
+    ranked_weight = sum(weights) or 1.0
+    traffic_weight = (base_weight + weights.traffic) or 1.0
+    unranked_weight = base_weight or 1.0
+    tables = list(all_data.items())
+
+    volume_scale = _log_scale(max((max(t.volume, default=0) for _, t in tables), default=0))
+    cpc_scale = _log_scale(max((max(t.cpc, default=0) for _, t in tables), default=0))
+    traffic_scale = _log_scale(max((max(t.traffic, default=0) for _, t in tables), default=0))
+    near_low, near_high = STRIKING_RANK
+
+    scores = {}
+    top_by_company = {}
+    top_by_category = {}
+    # 同じキーワードがカテゴリ重複で並んでも k 件残るよう、ヒープは少し大きめに持つ
+    heap_size = k * 3
+
+    for key, table in tables:
+        values = [
+            100.0 * (
+                weights.volume * volume_scale(volume)
+                + weights.difficulty * (UNKNOWN_EASE if difficulty == MISSING else 1.0 - min(max(difficulty, 0), 100) / 100)
+                + weights.cpc * cpc_scale(cpc)
+                + weights.competition * (1.0 - min(max(competition, 0), 100) / 100)
+                + weights.traffic * traffic_scale(traffic)
+                + weights.rank * (1.0 if near_low <= rank <= near_high else 0.0)
+            ) / (ranked_weight if rank else traffic_weight if traffic else unranked_weight)
+            for volume, difficulty, cpc, competition, traffic, rank in zip(
+                table.volume, table.difficulty, table.cpc, table.competition,
+                table.traffic, table.rank,
+            )
+        ]
+        scores[key] = values
+
+        company_heap = []
+        category_heaps = {}
+        for i, (score, code) in enumerate(zip(values, table.category)):
+            # 同点は行番号の小さいもの（CSVの上の行）を優先
+            item = (score, -i)
+            _push(company_heap, heap_size, item)
+            _push(category_heaps.setdefault(code, []), heap_size, item)
+
+        top_by_company[key] = _drain(company_heap, table, k)
+        top_by_category[key] = {
+            code: _drain(heap, table, k) for code, heap in sorted(category_heaps.items())
+        }
+
+    return ScoreResult(weights, scores, top_by_company, top_by_category)
+
+
+def _score_table(out, title, table, scores, rows, with_rank=False):
+    rank_headers = "<th>検索順位</th><th>推定流入数</th>" if with_rank else ""
+    out.write(f'''            <div class="table-container" style="margin-bottom: 20px;">
+                <div class="table-header">
+                    <h3>{title}</h3>
+                </div>
+                <div class="table-wrapper">
+                    <table>
+                        <thead>
+                            <tr><th class="col-no">#</th><th>キーワード</th><th>スコア</th><th>月間検索数</th><th>SEO難易度</th><th>CPC</th>{rank_headers}<th>カテゴリ</th></tr>
+                        </thead>
+                        <tbody>
+''')
+    for n, i in enumerate(rows, 1):
+        code = table.category[i]
+        category = table.category_names[code]
+        badge = f'<span class="badge badge-cat">{table.category_icons[code]} {html.escape(category)}</span>' if category else ""
+        rank_cells = ""
+        if with_rank:
+            rank_cells = f'<td class="col-vol">{table.rank[i] or "-"}</td><td class="col-vol">{table.traffic[i]:,}</td>'
+        out.write(f'''                            <tr><td class="col-no">{n}</td><td class="col-kw">{html.escape(table.keywords[i])}</td><td class="col-vol">{scores[i]:.1f}</td><td class="col-vol">{table.volume[i]:,}</td><td class="col-vol">{"-" if table.difficulty[i] == MISSING else table.difficulty[i]}</td><td class="col-vol">${table.cpc[i] / 100:.2f}</td>{rank_cells}<td>{badge}</td></tr>
+''')
+    out.write('''                        </tbody>
+                    </table>
+                </div>
+            </div>
+''')
+
+
+def render_scoring_page(out, result, all_data, companies, self_key):
+    """狙い目ページの本体を書き出す
+
+    companies は [(企業キー, 表示名, アイコン), ...]。自社はカテゴリ別、競合は企業別に出す。
+    """
+    weights = " / ".join(f"{name} {value:g}" for name, value in zip(ScoreWeights._fields, result.weights))
+    out.write(f'''            <div class="header-card" style="--primary-color: #ff6b6b; --secondary-color: #16213e;">
+                <h2>🎯 狙い目キーワード</h2>
+                <p>検索数・難易度・CPC・競合性・推定流入数・検索順位から算出したスコア（0〜100、重み: {weights}。検索順位の無いキーワードはそれ以外の指標で換算）</p>
+            </div>
+''')
+    for key, name, icon in companies:
+        table = all_data.get(key)
+        if table is None or not len(table):
+            continue
+        scores = result.scores[key]
+        if key == self_key:
+            _score_table(out, f"{icon} {html.escape(name)}：総合上位{TOP_K}件", table, scores, result.top_by_company[key])
+            for code, rows in result.top_by_category[key].items():
+                title = f"{table.category_icons[code]} {html.escape(table.category_names[code])}：上位{TOP_K}件"
+                _score_table(out, title, table, scores, rows)
+        else:
+            _score_table(out, f"{icon} {html.escape(name)}：上位{TOP_K}件", table, scores,
+                         result.top_by_company[key], with_rank=True)
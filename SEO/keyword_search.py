@@ -0,0 +1,308 @@
+"""
+全社横断のキーワード検索インデックス
+
+キーワードを正規化（NFKC・カタカナ→ひらがな・小文字化・空白除去）して
+文字bigramの転置インデックスを作る。
+ダッシュボードからは file:// でも読めるように、JSON を代入するだけの
+.js ファイル（サイドカー）として書き出す。
+サイドカーには表示用キーワード・検索数・出現企業だけを入れ、正規化した語と
+転置インデックスは読み込む側（ブラウザ・from_payload）で作り直す。
+"""
+
+import json
+import unicodedata
+from array import array
+
+INDEX_VERSION = 3
+INDEX_VARIABLE = "KEYWORD_INDEX"
+
+# カタカナ（ァ〜ヶ）をひらがなに寄せる変換表
+KANA_FOLD = {code: code - 0x60 for code in range(0x30A1, 0x30F7)}
+
+
+def normalize_keyword(text):
+    """検索・突き合わせ用にキーワードを正規化
+
+    NFKCで全角/半角を揃え、小文字化し、カタカナをひらがなに寄せ、空白を除く。
+    """
+    text = unicodedata.normalize('NFKC', text).lower().translate(KANA_FOLD)
+    return "".join(text.split())
+
+
+def bigrams(text):
+    """文字bigramの集合（1文字ならその1文字）"""
+    if len(text) < 2:
+        return {text} if text else set()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def build_postings(norms):
+    """{bigram: array(文書番号の昇順)} を作る"""
+    postings = {}
+    for doc_id, norm in enumerate(norms):
+        for gram in bigrams(norm):
+            posting = postings.get(gram)
+            if posting is None:
+                posting = postings[gram] = array('I')
+            posting.append(doc_id)
+    return postings
+
+
+class KeywordIndex:
+    """正規化キーワード単位の転置インデックス
+
+    文書（正規化後のユニークなキーワード）は最大月間検索数の降順に番号を振るので、
+    ポスティングを先頭から見れば検索数の大きい順に結果が得られる。
+    """
+
+    def __init__(self, companies, norms, keywords, volumes, masks, postings):
+        self.companies = companies   # [(企業キー, 表示名, アイコン), ...]
+        self.norms = norms           # 正規化キーワード
+        self.keywords = keywords     # 表示用キーワード（検索数最大の表記）
+        self.volumes = volumes       # array: 最大月間検索数
+        self.masks = masks           # 出現企業のビットマスク（int なので企業数に上限はない）
+        self.postings = postings     # {bigram: array(文書番号の昇順)}
+
+    def __len__(self):
+        return len(self.norms)
+
+    @classmethod
+    def build(cls, all_data, companies):
+        """{企業キー: KeywordTable} からインデックスを作る
+
+        companies は (企業キー, 表示名, アイコン) のリスト。ビットの並びもこの順。
+        """
+        bits = {key: 1 << i for i, (key, _, _) in enumerate(companies)}
+        docs = {}
+        for key, table in all_data.items():
+            bit = bits.get(key, 0)
+            for keyword, volume in zip(table.keywords, table.volume):
+                norm = normalize_keyword(keyword)
+                if not norm:
+                    continue
+                doc = docs.get(norm)
+                if doc is None:
+                    docs[norm] = [keyword, volume, bit]
+                else:
+                    if volume > doc[1]:
+                        doc[0] = keyword
+                        doc[1] = volume
+                    doc[2] |= bit
+
+        ordered = sorted(docs.items(), key=lambda item: item[1][1], reverse=True)
+        norms = [norm for norm, _ in ordered]
+        return cls(
+            companies=list(companies),
+            norms=norms,
+            keywords=[doc[0] for _, doc in ordered],
+            volumes=array('q', (doc[1] for _, doc in ordered)),
+            masks=[doc[2] for _, doc in ordered],
+            postings=build_postings(norms),
+        )
+
+    def candidates(self, norm):
+        """正規化済みクエリの候補文書番号（最も短いポスティング）"""
+        if len(norm) < 2:
+            # 1文字クエリはbigramで絞れないので全件を照合する
+            return range(len(self.norms))
+        shortest = None
+        for gram in bigrams(norm):
+            posting = self.postings.get(gram)
+            if posting is None:
+                return ()
+            if shortest is None or len(posting) < len(shortest):
+                shortest = posting
+        return shortest
+
+    def search(self, query, limit=50):
+        """部分一致検索。結果は最大月間検索数の降順
+
+        戻り値は {"keyword", "volume", "companies": [企業キー, ...]} のリスト。
+        """
+        norm = normalize_keyword(query)
+        if not norm:
+            return []
+        results = []
+        for doc_id in self.candidates(norm):
+            if norm in self.norms[doc_id]:
+                results.append(self.document(doc_id))
+                if limit and len(results) >= limit:
+                    break
+        return results
+
+    def company_ids(self, doc_id):
+        """文書に出現する企業の番号（companies の並び）のリスト"""
+        mask = self.masks[doc_id]
+        return [i for i in range(len(self.companies)) if mask >> i & 1]
+
+    def document(self, doc_id):
+        """文書番号を表示用のdictにして返す"""
+        return {
+            "keyword": self.keywords[doc_id],
+            "volume": self.volumes[doc_id],
+            "companies": [self.companies[i][0] for i in self.company_ids(doc_id)],
+        }
+
+    def to_payload(self):
+        """JSONにする形（正規化した語とポスティングは表示用キーワードから作り直せるので入れない）"""
+        return {
+            "version": INDEX_VERSION,
+            "companies": [list(c) for c in self.companies],
+            "k": self.keywords,
+            "v": list(self.volumes),
+            # JS のビット演算は32ビットなので、出現企業はマスクではなく企業番号の配列で渡す
+            "c": [self.company_ids(doc_id) for doc_id in range(len(self.norms))],
+        }
+
+    @classmethod
+    def from_payload(cls, payload):
+        """to_payload() の逆変換"""
+        if payload.get("version") != INDEX_VERSION:
+            raise ValueError(f"未対応のインデックス形式です: {payload.get('version')}")
+        # 表示用キーワードは同じ正規化語の表記の1つなので、正規化し直せば元の語になる
+        norms = [normalize_keyword(keyword) for keyword in payload["k"]]
+        return cls(
+            companies=[tuple(c) for c in payload["companies"]],
+            norms=norms,
+            keywords=payload["k"],
+            volumes=array('q', payload["v"]),
+            masks=[sum(1 << i for i in ids) for ids in payload["c"]],
+            postings=build_postings(norms),
+        )
+
+    def dumps(self):
+        """サイドカー（window.KEYWORD_INDEX = {...};）の中身"""
+        text = json.dumps(self.to_payload(), ensure_ascii=False, separators=(',', ':'))
+        return f"window.{INDEX_VARIABLE} = {text};\n"
+
+    def save(self, path, text=None):
+        """サイドカーとして書き出す（text は dumps() 済みならそれを使う）"""
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.dumps() if text is None else text)
+
+    @classmethod
+    def load(cls, path):
+        """save() で書き出したサイドカーを読み込む"""
+        with open(path, encoding='utf-8') as f:
+            text = f.read()
+        prefix = f"window.{INDEX_VARIABLE} = "
+        if not text.startswith(prefix):
+            raise ValueError(f"検索インデックスではありません: {path}")
+        return cls.from_payload(json.loads(text[len(prefix):].rstrip().rstrip(";")))
+
+
+def render_search_page(out, index_src):
+    """横断検索ページの本体を書き出す"""
+    out.write(f'''            <div class="header-card" style="--primary-color: #0f9b8e; --secondary-color: #16213e;">
+                <h2>🔎 全社横断キーワード検索</h2>
+                <p>表記ゆれ（全角/半角・カタカナ/ひらがな・空白）を吸収して部分一致で検索します</p>
+            </div>
+
+            <div class="table-container">
+                <div class="table-header">
+                    <h3>検索結果 <span class="result-count" id="search-count"></span></h3>
+                    <input type="text" class="search-box" placeholder="例: マイクラ" oninput="searchAll(this)" data-index-src="{index_src}">
+                </div>
+                <div class="table-wrapper">
+                    <table id="table-search">
+                        <thead>
+                            <tr>
+                                <th class="col-no">#</th>
+                                <th>キーワード</th>
+                                <th>月間検索数</th>
+                                <th>出現企業</th>
+                            </tr>
+                        </thead>
+                        <tbody id="search-results"></tbody>
+                    </table>
+                </div>
+            </div>
+''')
+
+
+SEARCH_SCRIPT = r'''
+// ===== 全社横断検索 =====
+// インデックスはサイドカーの .js を初回入力時に読み込む（file:// でも動く）
+const SEARCH_LIMIT = 200;
+let searchIndex = null;
+let searchTimer = null;
+
+function normalizeKeyword(text) {
+    return text.normalize('NFKC').toLowerCase()
+        .replace(/[ァ-ヶ]/g, c => String.fromCharCode(c.charCodeAt(0) - 0x60))
+        .replace(/\s+/g, '');
+}
+
+function loadSearchIndex(src, callback) {
+    if (searchIndex) return callback();
+    if (window.KEYWORD_INDEX) { prepareIndex(window.KEYWORD_INDEX); return callback(); }
+    const tag = document.createElement('script');
+    tag.src = src;
+    tag.onload = () => { prepareIndex(window.KEYWORD_INDEX); callback(); };
+    tag.onerror = () => {
+        document.getElementById('search-count').textContent = '(インデックスを読み込めません: ' + src + ')';
+    };
+    document.head.appendChild(tag);
+}
+
+function prepareIndex(raw) {
+    // 正規化した語と bigram の転置インデックスはサイドカーに入れず、ここで作る
+    const norms = raw.k.map(normalizeKeyword);
+    const postings = new Map();
+    norms.forEach((norm, id) => {
+        for (let i = 0; i < norm.length - 1; i++) {
+            const gram = norm.slice(i, i + 2);
+            let ids = postings.get(gram);
+            if (!ids) postings.set(gram, ids = []);
+            if (ids[ids.length - 1] !== id) ids.push(id);
+        }
+    });
+    searchIndex = { raw: raw, norms: norms, postings: postings };
+}
+
+function searchCandidates(norm) {
+    const norms = searchIndex.norms;
+    if (norm.length < 2) return norms.map((_, i) => i);
+    let shortest = null;
+    for (let i = 0; i < norm.length - 1; i++) {
+        const posting = searchIndex.postings.get(norm.slice(i, i + 2));
+        if (!posting) return [];
+        if (!shortest || posting.length < shortest.length) shortest = posting;
+    }
+    return shortest;
+}
+
+function runSearch(query) {
+    const raw = searchIndex.raw;
+    const norm = normalizeKeyword(query);
+    const tbody = document.getElementById('search-results');
+    if (!norm) { tbody.innerHTML = ''; document.getElementById('search-count').textContent = ''; return; }
+
+    const hits = [];
+    let total = 0;
+    for (const id of searchCandidates(norm)) {
+        if (searchIndex.norms[id].includes(norm)) {
+            total++;
+            if (hits.length < SEARCH_LIMIT) hits.push(id);
+        }
+    }
+
+    const parts = [];
+    hits.forEach((id, i) => {
+        const companies = raw.companies
+            .filter((_, i) => raw.c[id].includes(i))
+            .map(c => '<span class="badge badge-cat">' + esc(c[2] + ' ' + c[1]) + '</span>')
+            .join(' ');
+        parts.push('<tr><td class="col-no">' + (i + 1) + '</td><td class="col-kw">' + esc(raw.k[id])
+            + '</td><td class="col-vol">' + raw.v[id].toLocaleString('en-US') + '</td><td>' + companies + '</td></tr>');
+    });
+    tbody.innerHTML = parts.join('');
+    document.getElementById('search-count').textContent =
+        '(' + total.toLocaleString('en-US') + '件' + (total > SEARCH_LIMIT ? '、上位' + SEARCH_LIMIT + '件を表示' : '') + ')';
+}
+
+function searchAll(input) {
+    clearTimeout(searchTimer);
+    searchTimer = setTimeout(() => loadSearchIndex(input.dataset.indexSrc, () => runSearch(input.value)), FILTER_DELAY);
+}
+'''
@@ -0,0 +1,429 @@
+"""
+キーワードデータのローカル問い合わせサーバー（--serve）
+
+読み込んだ KeywordTable をメモリに持ったまま、企業・カテゴリ・検索数の範囲・
+部分一致で絞り込み、並べ替えてページ単位のJSONで返す。
+同じ条件の問い合わせは LRU キャッシュからそのまま返す。
+ダッシュボードは表のデータを埋め込まず、見えている範囲だけをAPIから取る。
+
+    GET /                   ダッシュボード（API版）
+    GET /api/companies      企業とカテゴリの一覧
+    GET /api/keywords       ?company=&category=&min_volume=&max_volume=&q=&sort=&order=&offset=&limit=
+    GET /api/stats          キャッシュの利用状況
+
+標準ライブラリの asyncio だけで動く、ローカル用の最小限のHTTP/1.1実装。
+"""
+
+import asyncio
+import gzip
+import json
+import mimetypes
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from keyword_table import MISSING
+
+QUERY_CACHE_SIZE = 256
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+MAX_REQUEST_BYTES = 16 * 1024
+SORT_COLUMNS = ("volume", "keyword", "difficulty", "cpc", "competition", "rank", "traffic")
+
+
+class QueryError(ValueError):
+    """問い合わせのパラメータが不正"""
+
+
+class KeywordQuery:
+    """{企業キー: KeywordTable} への問い合わせ
+
+    companies は [(企業キー, 表示名, アイコン), ...]。
+    query() の結果（JSONのバイト列）は条件ごとに LRU でキャッシュする。
+    """
+
+    def __init__(self, all_data, companies, cache_size=QUERY_CACHE_SIZE):
+        self.tables = all_data
+        self.companies = [c for c in companies if c[0] in all_data]
+        # 部分一致用の小文字化は起動時に1回だけ
+        self._lower = {key: [k.lower() for k in table.keywords] for key, table in all_data.items()}
+        self._category_lower = {
+            key: [name.lower() for name in table.category_names] for key, table in all_data.items()
+        }
+        self._orders = {}
+        self.query = lru_cache(maxsize=cache_size)(self._query)
+
+    def company_list(self):
+        """企業ごとの件数・検索数合計・カテゴリ"""
+        result = []
+        for key, name, icon in self.companies:
+            table = self.tables[key]
+            totals = table.category_totals()
+            result.append({
+                "key": key,
+                "name": name,
+                "icon": icon,
+                "rows": len(table),
+                "volume": table.total_volume(),
+                "categories": [
+                    {"name": cat, "icon": cat_icon, "count": totals[cat]["count"]}
+                    for cat, cat_icon in zip(table.category_names, table.category_icons)
+                    if cat in totals
+                ],
+            })
+        return result
+
+    def _values(self, key, sort):
+        table = self.tables[key]
+        return table.keywords if sort == "keyword" else getattr(table, sort)
+
+    def _order(self, key, sort, descending):
+        """並べ替え済みの行番号（同値は行番号順）を企業・列・向きごとに1回だけ作る"""
+        order = self._orders.get((key, sort, descending))
+        if order is None:
+            values = self._values(key, sort)
+            order = sorted(range(len(values)), key=values.__getitem__, reverse=descending)
+            self._orders[(key, sort, descending)] = order
+        return order
+
+    def parse(self, params):
+        """URLのクエリ（parse_qs の結果）を query() の引数タプルにする"""
+        def get(name, default=""):
+            return params.get(name, [default])[-1].strip()
+
+        def get_int(name, default):
+            value = get(name)
+            if not value:
+                return default
+            try:
+                return int(value)
+            except ValueError:
+                raise QueryError(f"{name} は整数で指定してください: {value}") from None
+
+        company = get("company")
+        if company and company not in self.tables:
+            raise QueryError(f"不明な企業です: {company}")
+        sort = get("sort", "volume")
+        if sort not in SORT_COLUMNS:
+            raise QueryError(f"sort に指定できるのは {', '.join(SORT_COLUMNS)} です: {sort}")
+        order = get("order", "asc" if sort == "keyword" else "desc")
+        if order not in ("asc", "desc"):
+            raise QueryError(f"order は asc か desc です: {order}")
+        offset = max(get_int("offset", 0), 0)
+        limit = min(max(get_int("limit", DEFAULT_LIMIT), 1), MAX_LIMIT)
+        return (
+            company, get("category"), get_int("min_volume", None), get_int("max_volume", None),
+            get("q").lower(), sort, order == "desc", offset, limit,
+        )
+
+    def _matches(self, key, category, min_volume, max_volume, q):
+        """条件に合う行番号の判定関数"""
+        table = self.tables[key]
+        volume = table.volume
+        lower = self._lower[key]
+        category_lower = self._category_lower[key]
+        codes = table.category
+        category_code = None
+        if category:
+            if category not in table.category_names:
+                return None
+            category_code = table.category_names.index(category)
+
+        def match(i):
+            if category_code is not None and codes[i] != category_code:
+                return False
+            if min_volume is not None and volume[i] < min_volume:
+                return False
+            if max_volume is not None and volume[i] > max_volume:
+                return False
+            return not q or q in lower[i] or q in category_lower[codes[i]]
+        return match
+
+    def _query(self, company, category, min_volume, max_volume, q, sort, descending, offset, limit):
+        keys = [company] if company else [key for key, _, _ in self.companies]
+        hits = []
+        for key in keys:
+            match = self._matches(key, category, min_volume, max_volume, q)
+            if match is None:
+                continue
+            hits.extend((key, i) for i in self._order(key, sort, descending) if match(i))
+        if len(keys) > 1:
+            # 企業をまたぐときは値で並べ直す（企業ごとの並びは安定ソートで保たれる）
+            columns = {key: self._values(key, sort) for key in keys}
+            hits.sort(key=lambda hit: columns[hit[0]][hit[1]], reverse=descending)
+
+        rows = [self._row(key, i) for key, i in hits[offset:offset + limit]]
+        payload = {"total": len(hits), "offset": offset, "limit": limit, "rows": rows}
+        return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def _row(self, key, i):
+        table = self.tables[key]
+        code = table.category[i]
+        difficulty = table.difficulty[i]
+        return {
+            "company": key,
+            "n": i + 1,
+            "keyword": table.keywords[i],
+            "volume": table.volume[i],
+            "difficulty": None if difficulty == MISSING else difficulty,
+            "cpc": table.cpc[i] / 100,
+            "competition": table.competition[i],
+            "rank": table.rank[i],
+            "traffic": table.traffic[i],
+            "url": table.url_names[table.url[i]],
+            "category": table.category_names[code],
+            "icon": table.category_icons[code],
+        }
+
+    def stats(self):
+        info = self.query.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
+
+
+class KeywordServer:
+    """KeywordQuery をHTTPで公開する
+
+    dashboard はAPI版のダッシュボードHTML（文字列）、static_dir と static_files は
+    ダッシュボードが読むサイドカー（検索インデックスなど）の置き場所とファイル名。
+    """
+
+    def __init__(self, query, dashboard, static_dir=None, static_files=()):
+        self.query = query
+        self.dashboard = dashboard.encode('utf-8')
+        self.dashboard_gzip = gzip.compress(self.dashboard)
+        self.static_dir = Path(static_dir) if static_dir else None
+        self.static_files = set(static_files)
+        self._static = {}  # ファイル名 → (mtime_ns, 本文, gzip済み本文)
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                if len(head) > MAX_REQUEST_BYTES:
+                    break
+                lines = head.decode('latin-1').split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                    # ブラウザはURLを%エンコードするが、生のUTF-8で来ても読めるようにする
+                    target = target.encode('latin-1').decode('utf-8')
+                except (ValueError, UnicodeDecodeError):
+                    await self._send(writer, 400, self._error("リクエストが不正です"), "application/json")
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, sep, value = line.partition(":")
+                    if sep:
+                        headers[name.strip().lower()] = value.strip()
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+                if method not in ("GET", "HEAD"):
+                    status, body, content_type, encoding = 405, self._error("GET のみ対応しています"), "application/json", None
+                else:
+                    status, body, content_type, encoding = self.route(target, headers)
+                await self._send(writer, status, body, content_type, encoding,
+                                 keep_alive=keep_alive, head_only=(method == "HEAD"))
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    def route(self, target, headers):
+        """(ステータス, 本文, Content-Type, Content-Encoding) を返す"""
+        url = urlsplit(target)
+        path = unquote(url.path)
+        gzip_ok = "gzip" in headers.get("accept-encoding", "")
+        if path in ("/", "/index.html"):
+            if gzip_ok:
+                return 200, self.dashboard_gzip, "text/html; charset=utf-8", "gzip"
+            return 200, self.dashboard, "text/html; charset=utf-8", None
+        if path == "/api/companies":
+            return 200, self._json(self.query.company_list()), "application/json", None
+        if path == "/api/stats":
+            return 200, self._json(self.query.stats()), "application/json", None
+        if path == "/api/keywords":
+            try:
+                args = self.query.parse(parse_qs(url.query))
+            except QueryError as e:
+                return 400, self._error(str(e)), "application/json", None
+            return 200, self.query.query(*args), "application/json", None
+        name = path.lstrip("/")
+        if self.static_dir is not None and name in self.static_files:
+            static = self._load_static(name)
+            if static is not None:
+                content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+                if gzip_ok:
+                    return 200, static[2], content_type, "gzip"
+                return 200, static[1], content_type, None
+        return 404, self._error(f"見つかりません: {path}"), "application/json", None
+
+    def _load_static(self, name):
+        """サイドカーを読み、gzip済みのものと一緒に保持する（更新されたら読み直す）"""
+        try:
+            mtime_ns = (self.static_dir / name).stat().st_mtime_ns
+        except OSError:
+            return None
+        static = self._static.get(name)
+        if static is None or static[0] != mtime_ns:
+            body = (self.static_dir / name).read_bytes()
+            static = self._static[name] = (mtime_ns, body, gzip.compress(body))
+        return static
+
+    @staticmethod
+    def _json(payload):
+        return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def _error(self, message):
+        return self._json({"error": message})
+
+    @staticmethod
+    async def _send(writer, status, body, content_type, encoding=None, keep_alive=False, head_only=False):
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}.get(status, "")
+        if content_type.startswith(("application/json", "text/")) and "charset" not in content_type:
+            content_type += "; charset=utf-8"
+        headers = [
+            f"HTTP/1.1 {status} {reason}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(body)}",
+            "Cache-Control: no-cache",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if encoding:
+            headers.append(f"Content-Encoding: {encoding}")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode('latin-1'))
+        if not head_only:
+            writer.write(body)
+        await writer.drain()
+
+    async def serve(self, host, port, ready=None):
+        """Ctrl-C まで待ち受ける（ready には待ち受け開始後に (host, port) を渡して呼ぶ）"""
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_REQUEST_BYTES)
+        if ready is not None:
+            ready(*server.sockets[0].getsockname()[:2])
+        async with server:
+            await server.serve_forever()
+
+
+# API版ダッシュボードの表（generate_unified_html の仮想スクロール表の関数を置き換える）
+# 表示中の範囲を API_BLOCK 行単位で取り、絞り込み・並べ替えはサーバー側で行う。
+API_CLIENT_SCRIPT = '''
+// ===== APIから読む表（--serve） =====
+const API_BLOCK = 200;
+
+function getTable(pageId) {
+    if (tables[pageId]) return tables[pageId];
+    const el = document.getElementById('data-' + pageId);
+    if (!el) return null;
+
+    const meta = JSON.parse(el.textContent);
+    const t = {
+        pageId: pageId,
+        company: meta.company,
+        withCategory: meta.cats,
+        total: 0,
+        blocks: new Map(),
+        generation: 0,
+        query: '',
+        sort: 'volume',
+        sortCol: 2,
+        sortDir: -1,
+        rowHeight: 37,
+        wrapper: document.getElementById('wrap-' + pageId),
+        tbody: document.querySelector('#table-' + pageId + ' tbody'),
+        colCount: meta.cats ? 4 : 3,
+        scheduled: false,
+        filterTimer: null,
+    };
+    t.wrapper.addEventListener('scroll', () => scheduleRender(t));
+    tables[pageId] = t;
+    fetchBlock(t, 0);
+    return t;
+}
+
+function fetchBlock(t, block) {
+    if (t.blocks.has(block)) return;
+    t.blocks.set(block, null);  // 取得中
+    const generation = t.generation;
+    const params = new URLSearchParams({
+        company: t.company, sort: t.sort, order: t.sortDir < 0 ? 'desc' : 'asc',
+        offset: block * API_BLOCK, limit: API_BLOCK,
+    });
+    if (t.query) params.set('q', t.query);
+    fetch(KEYWORD_API + '/keywords?' + params)
+        .then(r => r.json())
+        .then(res => {
+            if (generation !== t.generation) return;
+            t.total = res.total;
+            t.blocks.set(block, res.rows);
+            scheduleRender(t);
+        })
+        .catch(() => { if (generation === t.generation) t.blocks.delete(block); });
+}
+
+function renderTable(t) {
+    t.scheduled = false;
+    const total = t.total;
+    const viewport = t.wrapper.clientHeight || 600;
+    const start = Math.max(0, Math.floor(t.wrapper.scrollTop / t.rowHeight) - OVERSCAN);
+    const end = Math.min(total, start + Math.ceil(viewport / t.rowHeight) + OVERSCAN * 2);
+
+    const parts = [spacerRow(t, start * t.rowHeight)];
+    for (let i = start; i < end; i++) {
+        const block = Math.floor(i / API_BLOCK);
+        const rows = t.blocks.get(block);
+        if (!rows) {
+            fetchBlock(t, block);
+            parts.push('<tr><td class="col-no">…</td><td colspan="' + (t.colCount - 1) + '"></td></tr>');
+            continue;
+        }
+        const r = rows[i - block * API_BLOCK];
+        let row = '<tr><td class="col-no">' + r.n + '</td><td class="col-kw">' + esc(r.keyword)
+            + '</td><td class="col-vol">' + r.volume.toLocaleString('en-US') + '</td>';
+        if (t.withCategory) {
+            row += '<td><span class="badge badge-cat">' + esc(r.icon + ' ' + r.category) + '</span></td>';
+        }
+        parts.push(row + '</tr>');
+    }
+    parts.push(spacerRow(t, (total - end) * t.rowHeight));
+    t.tbody.innerHTML = parts.join('');
+
+    const first = t.tbody.rows[1];
+    if (first && first.offsetHeight && first.offsetHeight !== t.rowHeight && end > start) {
+        t.rowHeight = first.offsetHeight;
+        scheduleRender(t);
+    }
+
+    const count = document.getElementById('count-' + t.pageId);
+    if (count) count.textContent = '(' + total.toLocaleString('en-US') + '件)';
+}
+
+function applyFilter(t) {
+    t.generation++;
+    t.blocks = new Map();
+    t.total = 0;
+    t.wrapper.scrollTop = 0;
+    fetchBlock(t, 0);
+    renderTable(t);
+}
+
+function filterTable(input, pageId) {
+    const t = getTable(pageId);
+    if (!t) return;
+    clearTimeout(t.filterTimer);
+    t.filterTimer = setTimeout(() => {
+        t.query = input.value.trim().toLowerCase();
+        applyFilter(t);
+    }, FILTER_DELAY);
+}
+
+function sortTable(pageId, colIndex) {
+    const t = getTable(pageId);
+    if (!t) return;
+    t.sortDir = (t.sortCol === colIndex && t.sortDir === 1) ? -1 : 1;
+    t.sortCol = colIndex;
+    t.sort = colIndex === 2 ? 'volume' : 'keyword';
+    applyFilter(t);
+}
+'''
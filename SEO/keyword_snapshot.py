@@ -0,0 +1,232 @@
+"""
+読み込み済みキーワードデータの列指向スナップショット（バイナリ1ファイル）
+
+UTF-16のCSVを毎回デコードし直す代わりに、全社の KeywordTable を
+列ごとのバイナリで1ファイルに書き出し、mmap で開いて使う。
+
+    [magic 8B][version u32][予約 u32][header_offset u64][header_size u64]
+    [データ部（各列を8バイト境界に詰める）]
+    [ヘッダ（JSON）]
+
+- 文字列（キーワードとURL）は全社共通の辞書にまとめ、列には辞書の番号（int32）を入れる。
+  辞書は NUL 区切りの UTF-8 と、各文字列の開始位置（uint32, 件数+1）。
+- 数値列・月別行列は int64、カテゴリ・出典コードは uint16。
+  列の型はヘッダに列ごとに記録するので、int32 で書いた古いファイルもそのまま読める。
+- カテゴリ名・月のラベルなど小さいものはヘッダのJSONに入れる。
+
+Snapshot.column() は mmap 上の memoryview をそのまま返す（コピーしない）ので、
+同じファイルを開く複数のプロセスはページキャッシュ上の1つのコピーを共有する。
+Snapshot.tables() は KeywordTable に組み立て直す（列の幅を揃えるコピーだけで、パースはしない）。
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from keyword_table import KeywordTable
+
+SNAPSHOT_MAGIC = b"KWSNAP\x00\x01"
+SNAPSHOT_VERSION = 1
+_PREAMBLE = struct.Struct("<8sIIQQ")
+_ALIGN = 8
+
+# KeywordTable の同名の列に対応する（ディスク上は int64 / uint16）
+INT_COLUMNS = ("volume", "difficulty", "cpc", "competition", "rank", "traffic")
+CODE_COLUMNS = ("category", "source")
+
+
+class SnapshotError(Exception):
+    """スナップショットとして読めないファイル"""
+
+
+class _Writer:
+    def __init__(self, f):
+        self.f = f
+        self.offset = _PREAMBLE.size
+
+    def column(self, values):
+        """array を8バイト境界に書き、[offset, 型, 件数] を返す"""
+        pad = -self.offset % _ALIGN
+        if pad:
+            self.f.write(b"\0" * pad)
+            self.offset += pad
+        data = values.tobytes()
+        self.f.write(data)
+        entry = [self.offset, values.typecode, len(values)]
+        self.offset += len(data)
+        return entry
+
+
+def save_snapshot(all_data, path):
+    """{企業キー: KeywordTable} をスナップショットに書き出す
+
+    一時ファイルに書いてから置き換えるので、読み込み中のプロセスを壊さない。
+    """
+    strings = {}
+
+    def string_ids(values):
+        ids = array('i')
+        for value in values:
+            code = strings.get(value)
+            if code is None:
+                code = strings[value] = len(strings)
+            ids.append(code)
+        return ids
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(b"\0" * _PREAMBLE.size)
+        writer = _Writer(f)
+        tables = []
+        for key, table in all_data.items():
+            columns = {"keywords": writer.column(string_ids(table.keywords))}
+            for name in INT_COLUMNS:
+                columns[name] = writer.column(array('q', getattr(table, name)))
+            for name in CODE_COLUMNS:
+                columns[name] = writer.column(array('H', getattr(table, name)))
+            columns["url"] = writer.column(array('i', table.url))
+            columns["url_names"] = writer.column(string_ids(table.url_names))
+            columns["monthly"] = writer.column(array('q', table.monthly))
+            tables.append({
+                "key": key,
+                "rows": len(table),
+                "months": table.months,
+                "category_names": table.category_names,
+                "category_icons": table.category_icons,
+                "source_names": table.source_names,
+                "columns": columns,
+            })
+
+        encoded = [s.encode('utf-8') for s in strings]
+        offsets = array('I', [0])
+        position = 0
+        for data in encoded:
+            position += len(data) + 1
+            offsets.append(position)
+        string_offsets = writer.column(offsets)
+        blob = b"\0".join(encoded) + b"\0" if encoded else b""
+        string_blob = writer.column(array('B', blob))
+
+        header = json.dumps({
+            "byteorder": sys.byteorder,
+            "strings": {"count": len(encoded), "offsets": string_offsets, "blob": string_blob},
+            "tables": tables,
+        }, ensure_ascii=False).encode('utf-8')
+        header_offset = writer.offset
+        f.write(header)
+        f.seek(0)
+        f.write(_PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, header_offset, len(header)))
+    os.replace(tmp_path, path)
+
+
+class Snapshot:
+    """スナップショットを mmap で開いたもの
+
+    keys は企業キーの並び。column(key, name) はコピーなしの memoryview、
+    string(i) は辞書のi番目の文字列を返す。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._map) < _PREAMBLE.size:
+                raise SnapshotError(f"スナップショットではありません: {path}")
+            magic, version, _, header_offset, header_size = _PREAMBLE.unpack_from(self._map)
+            if magic != SNAPSHOT_MAGIC:
+                raise SnapshotError(f"スナップショットではありません: {path}")
+            if version != SNAPSHOT_VERSION:
+                raise SnapshotError(f"未対応のバージョンです（{version}）: {path}")
+            header = json.loads(self._map[header_offset:header_offset + header_size].decode('utf-8'))
+        except Exception:
+            self._map.close()
+            raise
+        # 書いたマシンとバイト順が違えば、読むときに入れ替える（その場合はコピーになる）
+        self._swap = header["byteorder"] != sys.byteorder
+        self._strings = header["strings"]
+        self._tables = {t["key"]: t for t in header["tables"]}
+        self.keys = list(self._tables)
+        self._view = memoryview(self._map)
+        self._decoded = None
+
+    def __len__(self):
+        return len(self.keys)
+
+    def rows(self, key):
+        return self._tables[key]["rows"]
+
+    def _array(self, entry):
+        offset, typecode, count = entry
+        size = array(typecode).itemsize * count
+        view = self._view[offset:offset + size]
+        if not self._swap:
+            return view.cast(typecode)
+        values = array(typecode, bytes(view))
+        values.byteswap()
+        return values
+
+    def column(self, key, name):
+        """企業 key の列 name（keywords と url_names は辞書の番号）"""
+        return self._array(self._tables[key]["columns"][name])
+
+    def string(self, i):
+        """辞書のi番目の文字列（全件デコードせずに1件だけ読む）"""
+        offsets = self._array(self._strings["offsets"])
+        blob_offset = self._strings["blob"][0]
+        return bytes(self._view[blob_offset + offsets[i]:blob_offset + offsets[i + 1] - 1]).decode('utf-8')
+
+    def strings(self):
+        """辞書の全文字列（初回にまとめてデコードして保持）"""
+        if self._decoded is None:
+            count = self._strings["count"]
+            if count:
+                offset, _, size = self._strings["blob"]
+                text = bytes(self._view[offset:offset + size - 1]).decode('utf-8')
+                self._decoded = [sys.intern(s) for s in text.split("\0")]
+            else:
+                self._decoded = []
+        return self._decoded
+
+    def table(self, key):
+        """企業 key を KeywordTable に組み立てる"""
+        meta = self._tables[key]
+        strings = self.strings()
+        table = KeywordTable()
+        table.keywords = [strings[i] for i in self.column(key, "keywords")]
+        for name in INT_COLUMNS + CODE_COLUMNS + ("url", "monthly"):
+            # ディスク上の型（int64 / 古いファイルは int32）をテーブルの型に合わせて詰め直す
+            getattr(table, name).fromlist(self.column(key, name).tolist())
+        table.months = list(meta["months"])
+        for name, icon in zip(meta["category_names"], meta["category_icons"]):
+            table.category_code(name, icon)
+        for name in meta["source_names"]:
+            table.source_code(name)
+        for i in self.column(key, "url_names"):
+            table.url_code(strings[i])
+        return table
+
+    def tables(self):
+        """{企業キー: KeywordTable}"""
+        return {key: self.table(key) for key in self.keys}
+
+    def close(self):
+        """mmap を閉じる（column() の memoryview を使い終えてから呼ぶ）"""
+        self._view.release()
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def load_snapshot(path):
+    """スナップショットを {企業キー: KeywordTable} にして返す"""
+    with Snapshot(path) as snapshot:
+        return snapshot.tables()
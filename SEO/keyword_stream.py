@@ -0,0 +1,431 @@
+"""
+巨大なエクスポート向けの概算集計（--stream）
+
+KeywordTable に全行を載せる代わりに、CSVのジェネレータから1行ずつ受け取って
+上限のあるメモリで集計する。行数が増えてもメモリは企業・カテゴリの数と
+各要約の大きさ（k・ビン数・スケッチの幅）でしか増えない。
+
+- StreamingSum     件数・合計・最小・最大（正確）
+- SpaceSaving      企業×カテゴリごとの上位キーワード（Space-Saving、誤差の上限つき）
+- QuantileSketch   検索数・SEO難易度の分布（対数ビン、相対誤差 relative_accuracy）
+- CountMinSketch   全社横断の キーワード → 出現数・検索数（過大側にだけずれる）
+
+どれも merge() でき、CSVごとに別プロセスで集計したものを後から足し合わせられる。
+"""
+
+import hashlib
+import heapq
+import html
+import math
+import sys
+from array import array
+
+from keyword_reports import close_document, html_table, open_document, stat_card
+from keyword_search import normalize_keyword
+
+STREAM_TOP_K = 200          # 企業×カテゴリごとに追う上位キーワードの数
+STREAM_TOP_LIMIT = 50       # ページに出す上位キーワードの数
+SKETCH_ACCURACY = 0.01      # QuantileSketch の相対誤差
+SKETCH_MAX_BINS = 2048      # QuantileSketch のビン数の上限（超えたら小さい側をまとめる）
+CMS_WIDTH = 1 << 16         # CountMinSketch の幅（誤差 ≒ 総量 × e / 幅）
+CMS_DEPTH = 4               # CountMinSketch の段数（誤差を超える確率 ≒ e^-段数）
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class StreamingSum:
+    """件数・合計・最小・最大"""
+
+    __slots__ = ("count", "total", "minimum", "maximum")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.minimum = None
+        self.maximum = None
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def merge(self, other):
+        self.count += other.count
+        self.total += other.total
+        for value in (other.minimum, other.maximum):
+            if value is not None:
+                self.minimum = value if self.minimum is None else min(self.minimum, value)
+                self.maximum = value if self.maximum is None else max(self.maximum, value)
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class SpaceSaving:
+    """重み付き Space-Saving（Metwally ほか）による上位 k キーワード
+
+    キーごとに (推定値, 誤差) を最大 k 個だけ持ち、真の値は 推定値-誤差 〜 推定値 の範囲。
+    満杯のときに新しいキーが来たら1つ追い出し、追い出したキーの推定値の最大（bound、
+    追っていないキーの値の上限）を新しいキーの誤差として引き継ぐ。
+    元の Space-Saving は推定値が最小のキーを追い出すが、キーワードはほとんど1回しか
+    来ないので、それだと入ったばかりの小さいキーが残って大きいキーが押し出される。
+    ここでは下限（推定値-誤差）が最小のキーを追い出す（上の範囲の保証は変わらない）。
+    """
+
+    def __init__(self, k=STREAM_TOP_K):
+        self.k = k
+        self.bound = 0
+        self.counters = {}   # キー → [推定値, 誤差]
+        self._heap = []      # (下限, キー)。値が古くなった要素は取り出すときに捨てる
+
+    def __len__(self):
+        return len(self.counters)
+
+    def add(self, key, weight=1):
+        counter = self.counters.get(key)
+        if counter is not None:
+            counter[0] += weight
+            self._push(counter[0] - counter[1], key)
+            return
+        if len(self.counters) >= self.k:
+            evicted = self._pop_min()
+            self.bound = max(self.bound, self.counters.pop(evicted)[0])
+        self.counters[key] = [self.bound + weight, self.bound]
+        self._push(weight, key)
+
+    def _push(self, lower, key):
+        heapq.heappush(self._heap, (lower, key))
+        # 更新のたびに積まれる古い要素で膨らまないよう、ときどき作り直す
+        if len(self._heap) > 4 * self.k:
+            self._rebuild()
+
+    def _rebuild(self):
+        self._heap = [(c[0] - c[1], k) for k, c in self.counters.items()]
+        heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        while True:
+            lower, key = heapq.heappop(self._heap)
+            counter = self.counters.get(key)
+            if counter is not None and counter[0] - counter[1] == lower:
+                return key
+
+    def merge(self, other):
+        """別の要約を足し込む（片方にしか無いキーは、もう片方の bound を誤差として足す）"""
+        merged = {}
+        for key, (value, error) in self.counters.items():
+            theirs = other.counters.get(key, (other.bound, other.bound))
+            merged[key] = [value + theirs[0], error + theirs[1]]
+        for key, (value, error) in other.counters.items():
+            if key not in merged:
+                merged[key] = [value + self.bound, error + self.bound]
+        self.k = max(self.k, other.k)
+        self.bound += other.bound
+        keep = heapq.nlargest(self.k, merged.items(), key=lambda x: x[1][0] - x[1][1])
+        dropped = len(merged) - len(keep)
+        if dropped:
+            kept = {key for key, _ in keep}
+            self.bound = max([self.bound] + [c[0] for key, c in merged.items() if key not in kept])
+        self.counters = dict(keep)
+        self._rebuild()
+
+    def top(self, n=None):
+        """[(キー, 下限, 誤差), ...] を下限の降順で返す（真の値は 下限〜下限+誤差）"""
+        items = heapq.nlargest(n or self.k, self.counters.items(), key=lambda x: x[1][0] - x[1][1])
+        return [(key, value - error, error) for key, (value, error) in items]
+
+
+class QuantileSketch:
+    """対数ビンのヒストグラムによる分位点の概算（DDSketch と同じ考え方）
+
+    正の値 x はビン ceil(log_γ x) に数える（γ = (1+α)/(1-α)）。
+    ビンの代表値を返すので、分位点の相対誤差は α 以下。0以下の値はまとめて数える。
+    ビン数が max_bins を超えたら小さい側のビンをまとめる（上側の分位点の精度を優先）。
+    """
+
+    def __init__(self, relative_accuracy=SKETCH_ACCURACY, max_bins=SKETCH_MAX_BINS):
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins = {}
+        self.zero = 0
+        self.count = 0
+        self._index = {}     # 値 → ビン（検索数は決まった段階の値が多いので覚えておく）
+
+    def add(self, value):
+        self.count += 1
+        if value <= 0:
+            self.zero += 1
+            return
+        i = self._index.get(value)
+        if i is None:
+            i = math.ceil(math.log(value) / self._log_gamma)
+            if len(self._index) < self.max_bins:
+                self._index[value] = i
+        self.bins[i] = self.bins.get(i, 0) + 1
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def _collapse(self):
+        ordered = sorted(self.bins)
+        excess = len(ordered) - self.max_bins
+        target = ordered[excess]
+        self.bins[target] += sum(self.bins.pop(i) for i in ordered[:excess])
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError("精度の違う QuantileSketch は足し合わせられません")
+        self.count += other.count
+        self.zero += other.zero
+        for i, n in other.bins.items():
+            self.bins[i] = self.bins.get(i, 0) + n
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def quantile(self, q):
+        """q（0〜1）分位点の概算（データが無ければ None）"""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero
+        if rank < seen:
+            return 0
+        for i in sorted(self.bins):
+            seen += self.bins[i]
+            if rank < seen:
+                return 2 * self.gamma ** i / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+
+def _add_counts(a, b):
+    """int64 の array 同士を要素ごとに足す
+
+    どちらの要素も0以上で和が2^63未満なら、バイト列を1つの多倍長整数として足しても
+    桁上がりが隣の要素に漏れないので、Pythonのループを回さずに済む。
+    """
+    total = int.from_bytes(a.tobytes(), sys.byteorder) + int.from_bytes(b.tobytes(), sys.byteorder)
+    result = array('q')
+    result.frombytes(total.to_bytes(len(a) * a.itemsize, sys.byteorder))
+    return result
+
+
+class CountMinSketch:
+    """Count-Min スケッチ（キー → 重みの合計の概算）
+
+    推定値は真の値以上で、確率 1 - e^-depth 以上で 真の値 + 総量×e/width 以下。
+    重みは0以上。ハッシュはプロセスをまたいで同じになるよう blake2b から作る。
+    """
+
+    def __init__(self, width=CMS_WIDTH, depth=CMS_DEPTH):
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self.rows = [array('q', bytes(8 * width)) for _ in range(depth)]
+
+    def cells(self, key):
+        """key が入る各段のセル（同じ幅・段数のスケッチ同士なら使い回せる）"""
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        width = self.width
+        return [(h1 + d * h2) % width for d in range(self.depth)]
+
+    def add(self, key, weight=1):
+        self.total += weight
+        for row, cell in zip(self.rows, self.cells(key)):
+            row[cell] += weight
+
+    def estimate(self, key):
+        return min(row[cell] for row, cell in zip(self.rows, self.cells(key)))
+
+    def merge(self, other):
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("大きさの違う CountMinSketch は足し合わせられません")
+        self.total += other.total
+        self.rows = [_add_counts(mine, theirs) for mine, theirs in zip(self.rows, other.rows)]
+
+
+class CompanyStream:
+    """1企業分の概算集計
+
+    volume / difficulty は分布のスケッチ、categories は
+    {カテゴリ名: (StreamingSum, SpaceSaving)}（競合はカテゴリ "" の1つだけ）。
+    """
+
+    def __init__(self, k=STREAM_TOP_K):
+        self.k = k
+        self.volume = QuantileSketch()
+        self.difficulty = QuantileSketch()
+        self.missing_difficulty = 0
+        self.categories = {}
+
+    def category(self, name):
+        entry = self.categories.get(name)
+        if entry is None:
+            entry = self.categories[name] = (StreamingSum(), SpaceSaving(self.k))
+        return entry
+
+    def totals(self):
+        """全カテゴリの StreamingSum を合わせたもの"""
+        total = StreamingSum()
+        for sums, _ in self.categories.values():
+            total.merge(sums)
+        return total
+
+    def top(self, n=STREAM_TOP_LIMIT):
+        """企業全体の上位キーワード [(キーワード, 下限, 誤差, カテゴリ名), ...]
+
+        同じキーワードが複数カテゴリにあっても検索数は同じなので、足さずに最大のものを採る。
+        """
+        best = {}
+        for name, (_, summary) in self.categories.items():
+            for keyword, value, error in summary.top():
+                current = best.get(keyword)
+                if current is None or value > current[1]:
+                    best[keyword] = (keyword, value, error, name)
+        return heapq.nlargest(n, best.values(), key=lambda x: x[1])
+
+    def merge(self, other):
+        self.volume.merge(other.volume)
+        self.difficulty.merge(other.difficulty)
+        self.missing_difficulty += other.missing_difficulty
+        for name, (sums, summary) in other.categories.items():
+            own_sums, own_summary = self.category(name)
+            own_sums.merge(sums)
+            own_summary.merge(summary)
+
+
+class StreamAggregator:
+    """全社の概算集計（1行ずつ add() する）
+
+    companies は {企業キー: CompanyStream}。mentions / volumes は
+    正規化キーワード → 出現行数 / 検索数の合計 の Count-Min スケッチ（全社横断）。
+    """
+
+    def __init__(self, k=STREAM_TOP_K, cms_width=CMS_WIDTH, cms_depth=CMS_DEPTH):
+        self.k = k
+        self.companies = {}
+        self.mentions = CountMinSketch(cms_width, cms_depth)
+        self.volumes = CountMinSketch(cms_width, cms_depth)
+        self.rows = 0
+
+    def company(self, key):
+        stream = self.companies.get(key)
+        if stream is None:
+            stream = self.companies[key] = CompanyStream(self.k)
+        return stream
+
+    def add(self, key, category, keyword, volume, difficulty=None):
+        """1行分を足す（difficulty は未計測なら None）"""
+        self.rows += 1
+        stream = self.company(key)
+        sums, summary = stream.category(category)
+        sums.add(volume)
+        summary.add(keyword, volume)
+        stream.volume.add(volume)
+        if difficulty is None:
+            stream.missing_difficulty += 1
+        else:
+            stream.difficulty.add(difficulty)
+        # 2つのスケッチは同じ幅・段数なので、ハッシュは1回で済ませる
+        mentions, volumes = self.mentions, self.volumes
+        volume = max(volume, 0)
+        mentions.total += 1
+        volumes.total += volume
+        for mention_row, volume_row, cell in zip(mentions.rows, volumes.rows,
+                                                 mentions.cells(normalize_keyword(keyword))):
+            mention_row[cell] += 1
+            volume_row[cell] += volume
+
+    def merge(self, other):
+        self.rows += other.rows
+        for key, stream in other.companies.items():
+            self.company(key).merge(stream)
+        self.mentions.merge(other.mentions)
+        self.volumes.merge(other.volumes)
+
+    def mention_count(self, keyword):
+        """全社で keyword（正規化後）が出てくる行数の概算"""
+        return self.mentions.estimate(normalize_keyword(keyword))
+
+
+def _number(value, digits=0):
+    if value is None:
+        return "-"
+    return f"{value:,.{digits}f}"
+
+
+def render_stream_report(out, aggregator, companies, colors=None, sources=0):
+    """概算集計のレポート（1ページのHTML）を書き出す
+
+    companies は [(企業キー, 表示名, アイコン), ...]、colors は {企業キー: テーマ色}。
+    """
+    colors = colors or {}
+    listed = [(key, name, icon) for key, name, icon in companies if key in aggregator.companies]
+    nav = [("overview", "📊 全体")] + [(f"company-{n}", f"{icon} {html.escape(name)}")
+                                      for n, (_, name, icon) in enumerate(listed)]
+    open_document(out, "キーワード分析 - 概算集計", "#10ac84", "📊 概算集計",
+                  f"{aggregator.rows:,}行 / CSV {sources}件（ストリーム処理）", nav)
+
+    cards = []
+    for key, name, icon in listed:
+        stream = aggregator.companies[key]
+        totals = stream.totals()
+        cards.append(stat_card(f"{icon} {html.escape(name)}", f"{totals.count:,}",
+                               f"月間検索数 {totals.total:,}"))
+    out.write(f'''        <div class="section" id="overview">
+            <h2>📊 全体</h2>
+            <div class="stats-grid">{"".join(cards)}</div>
+            <p style="margin-top: 14px; font-size: 12px; color: #7f8c8d;">
+                件数・合計は正確な値。分位点は相対誤差{SKETCH_ACCURACY:.0%}以内、
+                上位キーワードは企業×カテゴリごとに{aggregator.k}件を追う Space-Saving の下限値（+は誤差の上限）、
+                出現数は Count-Min スケッチによる全社横断の概算（実際より多めになることがある）。
+            </p>
+        </div>
+''')
+
+    for n, (key, name, icon) in enumerate(listed):
+        stream = aggregator.companies[key]
+        totals = stream.totals()
+        volume_q = [stream.volume.quantile(q) for q in QUANTILES]
+        difficulty_q = [stream.difficulty.quantile(q) for q in QUANTILES]
+        cards = [
+            stat_card("キーワード数", f"{totals.count:,}"),
+            stat_card("月間検索数", f"{totals.total:,}", f"平均 {totals.mean():,.1f} / 最大 {_number(totals.maximum)}"),
+            stat_card("検索数の分位点", _number(volume_q[0]),
+                      f"中央値 / 90% {_number(volume_q[1])} / 99% {_number(volume_q[2])}"),
+            stat_card("SEO難易度の分位点", _number(difficulty_q[0]),
+                      f"中央値 / 90% {_number(difficulty_q[1])} / 未計測 {stream.missing_difficulty:,}件"),
+        ]
+        out.write(f'''        <div class="section" id="company-{n}" style="--accent-color: {colors.get(key, "#10ac84")};">
+            <h2>{icon} {html.escape(name)}</h2>
+            <div class="stats-grid">{"".join(cards)}</div>
+''')
+        if len(stream.categories) > 1:
+            rows = []
+            for category, (sums, summary) in sorted(stream.categories.items(), key=lambda x: x[1][0].total, reverse=True):
+                top = summary.top(1)
+                rows.append(
+                    f'<td>{html.escape(category or "（なし）")}</td><td class="number">{sums.count:,}</td>'
+                    f'<td class="number">{sums.total:,}</td><td class="number">{_number(sums.maximum)}</td>'
+                    f'<td>{html.escape(top[0][0]) if top else ""}</td>'
+                )
+            out.write('''            <h3 style="margin: 16px 0 8px; font-size: 14px;">カテゴリ別</h3>
+''')
+            html_table(out, ["カテゴリ", "キーワード数", "月間検索数", "最大", "トップキーワード"], rows)
+
+        rows = [
+            f'<td>{html.escape(keyword)}</td><td class="number">{value:,}</td>'
+            f'<td class="number">{"+" + format(error, ",") if error else ""}</td>'
+            f'<td>{html.escape(category)}</td><td class="number">{aggregator.mention_count(keyword):,}</td>'
+            for keyword, value, error, category in stream.top()
+        ]
+        out.write(f'''            <h3 style="margin: 16px 0 8px; font-size: 14px;">上位キーワード（{len(rows)}件）</h3>
+''')
+        html_table(out, ["キーワード", "月間検索数", "誤差", "カテゴリ", "全社の出現数"], rows)
+        out.write('''        </div>
+''')
+    close_document(out)
@@ -0,0 +1,214 @@
+"""
+キーワードデータを列ごとに保持するテーブル
+
+1キーワード=1dictだと件数が増えるほどメモリと集計コストが膨らむため、
+文字列はinternしたリスト、数値は array に詰めて持つ。
+カテゴリと出典は小さい整数コードで保持し、名前は別リストで引く。
+月別の検索数は キーワード × 月 の行優先の1本の array に詰める。
+"""
+
+import heapq
+import sys
+from array import array
+
+# 月別検索数が無い（その月の列がCSVに無い）ことを表す値
+MISSING = -1
+
+
+class KeywordTable:
+    """列指向のキーワードテーブル
+
+    数値列:
+        volume      月間検索数
+        difficulty  SEO難易度（未計測は MISSING）
+        cpc         CPC（セント単位の整数）
+        competition 競合性
+        rank        検索順位（競合のキーワードのみ、無ければ0）
+        traffic     推定流入数（競合のキーワードのみ、無ければ0）
+    コード列:
+        category    category_names / category_icons のインデックス
+        source      source_names のインデックス
+        url         url_names のインデックス（順位を取っているURL、無ければ""）
+    月別:
+        months      月のラベル（"202411" など）の昇順リスト
+        monthly     len(self) × len(months) の行優先行列（無い月は MISSING）
+    """
+
+    def __init__(self):
+        self.keywords = []
+        self.volume = array('q')
+        self.difficulty = array('l')
+        self.cpc = array('l')
+        self.competition = array('l')
+        self.rank = array('l')
+        self.traffic = array('q')
+        self.category = array('H')
+        self.source = array('H')
+        self.url = array('L')
+        self.months = []
+        self.monthly = array('q')
+        self.category_names = []
+        self.category_icons = []
+        self.source_names = []
+        self.url_names = []
+        self._category_codes = {}
+        self._source_codes = {}
+        self._url_codes = {}
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def category_code(self, name, icon=""):
+        """カテゴリ名をコードに変換（未登録なら追加）"""
+        code = self._category_codes.get(name)
+        if code is None:
+            code = len(self.category_names)
+            self._category_codes[name] = code
+            self.category_names.append(name)
+            self.category_icons.append(icon)
+        return code
+
+    def source_code(self, name):
+        """出典名をコードに変換（未登録なら追加）"""
+        code = self._source_codes.get(name)
+        if code is None:
+            code = len(self.source_names)
+            self._source_codes[name] = code
+            self.source_names.append(name)
+        return code
+
+    def url_code(self, url):
+        """URLをコードに変換（未登録なら追加）"""
+        code = self._url_codes.get(url)
+        if code is None:
+            code = len(self.url_names)
+            self._url_codes[url] = code
+            self.url_names.append(url)
+        return code
+
+    def set_months(self, months):
+        """月別検索数の列を months（昇順）に揃える
+
+        既存の行は値を保ったまま並べ替え、無い月は MISSING で埋める。
+        """
+        months = list(months)
+        if months == self.months:
+            return
+        self.monthly = _align_monthly(self, months)
+        self.months = months
+
+    def append(self, keyword, volume, difficulty=0, cpc=0, competition=0,
+               category="", icon="", source="", series=None, rank=0, traffic=0, url=""):
+        """1キーワードを追加
+
+        series は self.months に対応する月別検索数（省略時は MISSING）。
+        """
+        self.keywords.append(sys.intern(keyword))
+        self.volume.append(volume)
+        self.difficulty.append(difficulty)
+        self.cpc.append(cpc)
+        self.competition.append(competition)
+        self.rank.append(rank)
+        self.traffic.append(traffic)
+        self.category.append(self.category_code(category, icon))
+        self.source.append(self.source_code(source))
+        self.url.append(self.url_code(url))
+        if self.months:
+            if series is None:
+                self.monthly.extend([MISSING] * len(self.months))
+            else:
+                self.monthly.extend(series)
+
+    def extend(self, other):
+        """別のテーブルの行を末尾に連結（コードは付け替える）"""
+        category_map = [
+            self.category_code(name, icon)
+            for name, icon in zip(other.category_names, other.category_icons)
+        ]
+        source_map = [self.source_code(name) for name in other.source_names]
+        url_map = [self.url_code(url) for url in other.url_names]
+
+        if other.months != self.months:
+            self.set_months(sorted(set(self.months) | set(other.months)))
+        if self.months:
+            if other.months == self.months:
+                self.monthly.extend(other.monthly)
+            else:
+                self.monthly.extend(_align_monthly(other, self.months))
+
+        self.keywords.extend(other.keywords)
+        self.volume.extend(other.volume)
+        self.difficulty.extend(other.difficulty)
+        self.cpc.extend(other.cpc)
+        self.competition.extend(other.competition)
+        self.rank.extend(other.rank)
+        self.traffic.extend(other.traffic)
+        self.category.extend(category_map[c] for c in other.category)
+        self.source.extend(source_map[s] for s in other.source)
+        self.url.extend(url_map[u] for u in other.url)
+
+    def series(self, i):
+        """行番号iの月別検索数（self.months の順）"""
+        width = len(self.months)
+        return self.monthly[i * width:(i + 1) * width]
+
+    def total_volume(self):
+        """月間検索数の合計"""
+        return sum(self.volume)
+
+    def category_totals(self):
+        """カテゴリ別の {名前: {"count", "volume"}} を返す"""
+        counts = [0] * len(self.category_names)
+        volumes = [0] * len(self.category_names)
+        for code, vol in zip(self.category, self.volume):
+            counts[code] += 1
+            volumes[code] += vol
+        return {
+            name: {"count": counts[code], "volume": volumes[code]}
+            for code, name in enumerate(self.category_names)
+            if counts[code]
+        }
+
+    def top(self, n, column="volume"):
+        """指定列の上位n件の行番号を降順で返す（同値は元の順序）
+
+        全件ソートせず heapq で上位だけを選ぶ。
+        """
+        values = getattr(self, column)
+        if n is None or n >= len(values):
+            return sorted(range(len(values)), key=values.__getitem__, reverse=True)
+        return heapq.nlargest(n, range(len(values)), key=values.__getitem__)
+
+    def row(self, i):
+        """行番号iを表示用のdictにして返す"""
+        code = self.category[i]
+        return {
+            "keyword": self.keywords[i],
+            "volume": self.volume[i],
+            "difficulty": self.difficulty[i],
+            "cpc": self.cpc[i],
+            "competition": self.competition[i],
+            "rank": self.rank[i],
+            "traffic": self.traffic[i],
+            "url": self.url_names[self.url[i]],
+            "category": self.category_names[code],
+            "icon": self.category_icons[code],
+            "source": self.source_names[self.source[i]],
+            "monthly": dict(zip(self.months, self.series(i))),
+        }
+
+
+def _align_monthly(table, months):
+    """table の月別行列を months の列並びに直した array を返す"""
+    width = len(months)
+    monthly = array('q', [MISSING]) * (len(table) * width)
+    if table.months:
+        position = {month: j for j, month in enumerate(months)}
+        mapping = [position[month] for month in table.months]
+        old_width = len(table.months)
+        for i in range(len(table)):
+            base = i * width
+            old = i * old_width
+            for k, j in enumerate(mapping):
+                monthly[base + j] = table.monthly[old + k]
+    return monthly
@@ -0,0 +1,273 @@
+"""
+月別検索数（「YYYYMM（検索数）」列）のトレンド分析
+
+KeywordTable.monthly（キーワード × 月 の行列）を月ごとの列に分けて集計し、
+傾き・直近伸び率・スパイクを行ごとに、季節性指数をカテゴリごとにまとめて求める。
+傾きは月の並びが全行共通なので、最小二乗の重みを先に作って月ごとの列に掛けて足す。
+"""
+
+import heapq
+import html
+from array import array
+from itertools import compress, repeat
+from operator import and_, itemgetter, le, mul, truediv
+
+from keyword_table import MISSING
+
+MIN_TREND_VOLUME = 100   # 伸び率を出す最低の平均検索数
+SPIKE_RATIO = 3.0        # 中央値の何倍でスパイクとみなすか
+MIN_SPIKE_VOLUME = 1000  # スパイクとみなす最低の検索数
+RISER_LIMIT = 10
+CATEGORY_RISER_LIMIT = 5
+SPIKE_LIMIT = 20
+
+
+class TrendMetrics:
+    """1つの KeywordTable に対するトレンド指標（行番号で引く）
+
+    slope        月あたりの検索数の増減（最小二乗）
+    growth       直近月 ÷ 期間平均 − 1（平均が MIN_TREND_VOLUME 未満なら0）
+    mean         期間平均
+    spike_month  スパイクした月のインデックス（無ければ -1）
+    spike_ratio  最大値 ÷ 中央値
+    valid        全ての月が揃っている行なら1
+    seasonality  {カテゴリコード: [月ごとの指数（1.0 = 平均）]}
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.months = list(table.months)
+        n = len(table)
+        self.slope = array('d', bytes(8 * n))
+        self.growth = array('d', bytes(8 * n))
+        self.mean = array('d', bytes(8 * n))
+        self.spike_ratio = array('d', bytes(8 * n))
+        self.spike_month = array('b', [-1]) * n
+        self.valid = bytearray(n)
+        self.seasonality = {}
+
+
+def slope_weights(width):
+    """等間隔 x に対する最小二乗の傾きの重み（整数）と割る数
+
+    x を中心からの距離の2倍（2j − (width − 1)）に取ると重みが整数になり、
+    傾きは Σ 重み×検索数 ÷ 割る数 で求まる。
+    """
+    weights = [2 * j - (width - 1) for j in range(width)]
+    return weights, sum(w * w for w in weights) / 2
+
+
+def compute_trends(table):
+    """KeywordTable の月別行列からトレンド指標をまとめて計算
+
+    行ごとにスライスして回さず、月ごとの列（monthly[j::width]）と
+    それを zip で束ねた行タプルに、map で組み込み関数を当てて求める。
+    """
+    metrics = TrendMetrics(table)
+    width = len(table.months)
+    n = len(table)
+    if width < 2 or not n:
+        return metrics
+
+    columns = [table.monthly[j::width] for j in range(width)]
+    rows = list(zip(*columns))
+    # 検索数は0以上なので、行の最小値が MISSING より大きければ全ての月が揃っている
+    valid = bytearray(map(MISSING.__lt__, map(min, rows)))
+    metrics.valid = valid
+
+    # 欠けのある行は valid（0/1）を掛けて0にする
+    means = array('d', map(truediv, map(sum, rows), repeat(width)))
+    metrics.mean = array('d', map(mul, means, valid))
+    weights, divisor = slope_weights(width)
+    weighted = [map(mul, column, repeat(weight)) for weight, column in zip(weights, columns)]
+    metrics.slope = array('d', map(mul, map(truediv, map(sum, zip(*weighted)), repeat(divisor)), valid))
+
+    latest = columns[-1]
+    for i in compress(range(n), map(and_, valid, map(le, repeat(MIN_TREND_VOLUME), means))):
+        metrics.growth[i] = latest[i] / means[i] - 1
+
+    # スパイク: 最大値 ÷ 中央値（中央値が0なら比は0）
+    peaks = list(map(max, rows))
+    medians = list(map(itemgetter(width // 2), map(sorted, rows)))
+    positive = list(map(and_, valid, map((0).__lt__, medians)))
+    metrics.spike_ratio = array('d', map(mul, map(truediv, peaks, map(max, medians, repeat(1))), positive))
+    for i in compress(range(n), map(le, repeat(SPIKE_RATIO), metrics.spike_ratio)):
+        if peaks[i] >= MIN_SPIKE_VOLUME:
+            metrics.spike_month[i] = rows[i].index(peaks[i])
+
+    # カテゴリ別の季節性指数（カテゴリが一致する有効行を月ごとに足す）
+    rows_by_code = {}
+    for i, code in compress(enumerate(table.category), valid):
+        rows_by_code.setdefault(code, []).append(i)
+    for code, picked in rows_by_code.items():
+        sums = list(map(sum, zip(*map(rows.__getitem__, picked))))
+        average = sum(sums) / width
+        metrics.seasonality[code] = [s / average if average else 0.0 for s in sums]
+
+    return metrics
+
+
+def top_risers(metrics, rows=None, limit=RISER_LIMIT):
+    """伸び率の上位（同じキーワードは1回だけ）を行番号で返す"""
+    if rows is None:
+        rows = range(len(metrics.table))
+    candidates = (i for i in rows if metrics.valid[i] and metrics.growth[i] > 0)
+    picked = []
+    seen = set()
+    for i in heapq.nlargest(limit * 3, candidates, key=metrics.growth.__getitem__):
+        keyword = metrics.table.keywords[i]
+        if keyword in seen:
+            continue
+        seen.add(keyword)
+        picked.append(i)
+        if len(picked) >= limit:
+            break
+    return picked
+
+
+def category_risers(metrics, limit=CATEGORY_RISER_LIMIT):
+    """カテゴリコードごとの伸び率上位 {コード: [行番号]}"""
+    rows_by_code = {}
+    for i, code in enumerate(metrics.table.category):
+        if metrics.valid[i]:
+            rows_by_code.setdefault(code, []).append(i)
+    return {code: top_risers(metrics, rows, limit) for code, rows in rows_by_code.items()}
+
+
+def spikes(metrics, limit=SPIKE_LIMIT):
+    """スパイクした行を（最大値 − 中央値）の大きい順に返す"""
+    table = metrics.table
+    width = len(metrics.months)
+    candidates = [i for i in range(len(table)) if metrics.spike_month[i] >= 0]
+
+    def excess(i):
+        row = table.monthly[i * width:(i + 1) * width]
+        return max(row) - sorted(row)[width // 2]
+
+    picked = []
+    seen = set()
+    for i in heapq.nlargest(limit * 3, candidates, key=excess):
+        if table.keywords[i] in seen:
+            continue
+        seen.add(table.keywords[i])
+        picked.append(i)
+        if len(picked) >= limit:
+            break
+    return picked
+
+
+def format_month(label):
+    """月ラベルを表示用に整形（202504 → 2025/04）"""
+    return f"{label[:4]}/{label[4:]}" if len(label) == 6 else label
+
+
+def _riser_rows(out, metrics, rows):
+    table = metrics.table
+    for rank, i in enumerate(rows, 1):
+        code = table.category[i]
+        out.write(f'''                            <tr><td class="col-no">{rank}</td><td class="col-kw">{html.escape(table.keywords[i])}</td><td class="col-vol">{table.volume[i]:,}</td><td class="col-vol">{metrics.growth[i]:+.0%}</td><td class="col-vol">{metrics.slope[i]:+,.0f}</td><td><span class="badge badge-cat">{table.category_icons[code]} {html.escape(table.category_names[code])}</span></td></tr>
+''')
+
+
+def _table_open(out, title, headers):
+    out.write(f'''            <div class="table-container" style="margin-bottom: 20px;">
+                <div class="table-header">
+                    <h3>{title}</h3>
+                </div>
+                <div class="table-wrapper">
+                    <table>
+                        <thead>
+                            <tr>
+''')
+    for header in headers:
+        out.write(f'''                                <th>{header}</th>
+''')
+    out.write('''                            </tr>
+                        </thead>
+                        <tbody>
+''')
+
+
+def _table_close(out):
+    out.write('''                        </tbody>
+                    </table>
+                </div>
+            </div>
+''')
+
+
+def render_trend_page(out, trends):
+    """トレンドページの本体を書き出す
+
+    trends は [(表示名, アイコン, TrendMetrics), ...]（月別データのある企業のみ）。
+    """
+    out.write('''            <div class="header-card" style="--primary-color: #10ac84; --secondary-color: #16213e;">
+                <h2>📈 検索数トレンド</h2>
+                <p>月別検索数から傾き・直近伸び率・季節性・スパイクを算出</p>
+            </div>
+''')
+    if not trends:
+        out.write('''            <div class="summary-card"><p>月別検索数の列を持つデータがありません。</p></div>
+''')
+        return
+
+    for name, icon, metrics in trends:
+        table = metrics.table
+        months = metrics.months
+        valid = sum(metrics.valid)
+        rising = sum(1 for i in range(len(table)) if metrics.valid[i] and metrics.slope[i] > 0)
+        spike_count = sum(1 for m in metrics.spike_month if m >= 0)
+        out.write(f'''
+            <h3 style="margin: 10px 0 15px;">{icon} {html.escape(name)}（{format_month(months[0])}〜{format_month(months[-1])}）</h3>
+            <div class="stats-grid">
+                <div class="stat-card">
+                    <h4>月別データのあるキーワード</h4>
+                    <div class="value">{valid:,}</div>
+                </div>
+                <div class="stat-card">
+                    <h4>上昇傾向</h4>
+                    <div class="value">{rising:,}</div>
+                    <div class="sub">傾きが正のキーワード</div>
+                </div>
+                <div class="stat-card">
+                    <h4>スパイク</h4>
+                    <div class="value">{spike_count:,}</div>
+                    <div class="sub">中央値の{SPIKE_RATIO:g}倍以上の月があるキーワード</div>
+                </div>
+            </div>
+''')
+
+        _table_open(out, f"直近の伸びが大きいキーワード（上位{RISER_LIMIT}件）",
+                    ["#", "キーワード", "月間検索数", "伸び率", "傾き/月", "カテゴリ"])
+        _riser_rows(out, metrics, top_risers(metrics))
+        _table_close(out)
+
+        _table_open(out, f"スパイク（上位{SPIKE_LIMIT}件）",
+                    ["#", "キーワード", "ピーク月", "ピーク", "中央値比", "カテゴリ"])
+        width = len(months)
+        for rank, i in enumerate(spikes(metrics), 1):
+            row = table.monthly[i * width:(i + 1) * width]
+            code = table.category[i]
+            out.write(f'''                            <tr><td class="col-no">{rank}</td><td class="col-kw">{html.escape(table.keywords[i])}</td><td>{format_month(months[metrics.spike_month[i]])}</td><td class="col-vol">{max(row):,}</td><td class="col-vol">×{metrics.spike_ratio[i]:.1f}</td><td><span class="badge badge-cat">{table.category_icons[code]} {html.escape(table.category_names[code])}</span></td></tr>
+''')
+        _table_close(out)
+
+        if metrics.seasonality:
+            _table_open(out, "カテゴリ別の季節性指数（1.00 = 期間平均）",
+                        ["カテゴリ"] + [format_month(m) for m in months])
+            for code, index in sorted(metrics.seasonality.items()):
+                cells = "".join(
+                    f'<td class="col-vol" style="{"color: #e74c3c;" if v >= 1.2 else "color: #3498db;" if v <= 0.8 else ""}">{v:.2f}</td>'
+                    for v in index
+                )
+                out.write(f'''                            <tr><td class="col-kw">{table.category_icons[code]} {html.escape(table.category_names[code])}</td>{cells}</tr>
+''')
+            _table_close(out)
+
+        risers = category_risers(metrics)
+        if len(risers) > 1:
+            _table_open(out, f"カテゴリ別の伸び上位（各{CATEGORY_RISER_LIMIT}件）",
+                        ["#", "キーワード", "月間検索数", "伸び率", "傾き/月", "カテゴリ"])
+            for code in sorted(risers):
+                _riser_rows(out, metrics, risers[code])
+            _table_close(out)
@@ -0,0 +1,155 @@
+"""
+処理段階ごとの計測（--profile）
+
+    with profiler.span("load", rows=n):
+        ...
+
+で囲んだ区間の経過時間・CPU時間・行/秒を記録し、必要なら tracemalloc の
+ピークも取る。span は入れ子にでき、親子関係は深さで表す。
+無効時は NULL_PROFILER の span() が何もしない同じオブジェクトを返すだけなので、
+計測コードを残したままでも実行コストはほぼ無い。
+"""
+
+import json
+import time
+import tracemalloc
+import unicodedata
+
+
+def _width(text):
+    """端末での表示幅（全角は2）"""
+    return sum(2 if unicodedata.east_asian_width(c) in "WF" else 1 for c in text)
+
+
+def _ljust(text, width):
+    return text + " " * max(width - _width(text), 0)
+
+
+def _rjust(text, width):
+    return " " * max(width - _width(text), 0) + text
+
+
+class _NullSpan:
+    """計測しないときの span（何もしない）"""
+
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class NullProfiler:
+    """計測しないときの Profiler"""
+
+    enabled = False
+
+    def span(self, name, rows=None):
+        return _NULL_SPAN
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class _Span:
+    def __init__(self, profiler, name, rows):
+        self.profiler = profiler
+        self.name = name
+        self.rows = rows  # 区間の中で分かる場合は span.rows = n と後から入れてよい
+
+    def __enter__(self):
+        self.profiler._enter(self)
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._exit(self)
+        return False
+
+
+class Profiler:
+    """区間ごとの計測結果を貯める
+
+    records は終了順ではなく開始順の dict のリスト
+    （name, depth, wall_seconds, cpu_seconds, rows, rows_per_sec, traced_peak_mb）。
+    """
+
+    enabled = True
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.records = []
+        self._stack = []
+        self._started = time.perf_counter()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def span(self, name, rows=None):
+        return _Span(self, name, rows)
+
+    def _enter(self, span):
+        record = {"name": span.name, "depth": len(self._stack)}
+        self.records.append(record)
+        if self.trace_memory:
+            # 親の区間のピークを退避してから、この区間用にピークを取り直す
+            if self._stack:
+                parent = self._stack[-1]
+                parent["peak"] = max(parent["peak"], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        self._stack.append({"span": span, "record": record, "peak": 0,
+                            "wall": time.perf_counter(), "cpu": time.process_time()})
+
+    def _exit(self, span):
+        frame = self._stack.pop()
+        wall = time.perf_counter() - frame["wall"]
+        cpu = time.process_time() - frame["cpu"]
+        record = frame["record"]
+        record["wall_seconds"] = round(wall, 6)
+        record["cpu_seconds"] = round(cpu, 6)
+        if span.rows is not None:
+            record["rows"] = span.rows
+            record["rows_per_sec"] = round(span.rows / wall) if wall > 0 else None
+        if self.trace_memory:
+            peak = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+            record["traced_peak_mb"] = round(peak / (1024 * 1024), 2)
+            # 親のピークにも子のピークを反映する
+            if self._stack:
+                self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+
+    def summary(self):
+        """機械可読なまとめ（JSONにそのまま書ける dict）"""
+        return {
+            "total_wall_seconds": round(time.perf_counter() - self._started, 6),
+            "trace_memory": self.trace_memory,
+            "spans": self.records,
+        }
+
+    def report(self):
+        """区間ごとの表（文字列）"""
+        header = ("区間", "経過(s)", "CPU(s)", "行/秒", "ピーク(MB)")
+        widths = (40, 10, 10, 14, 12)
+        rows = [header]
+        for record in self.records:
+            rate = record.get("rows_per_sec")
+            peak = record.get("traced_peak_mb")
+            rows.append((
+                "  " * record["depth"] + record["name"],
+                f"{record['wall_seconds']:.3f}",
+                f"{record['cpu_seconds']:.3f}",
+                f"{rate:,}" if rate else "-",
+                f"{peak:,.1f}" if peak is not None else "-",
+            ))
+        lines = [
+            _ljust(row[0], widths[0]) + "".join(_rjust(cell, w) for cell, w in zip(row[1:], widths[1:]))
+            for row in rows
+        ]
+        return "\n".join(lines)
+
+    def save(self, path):
+        """summary() をJSONで書き出す"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2)
@@ -0,0 +1,137 @@
+"""
+CSVのパス解決と自動検出（NFC/NFD対応）
+
+Macから同期したファイル名はNFDのことがあるので、書いたとおりのパスでは
+見つからないことがある。ディレクトリごとに一度だけ中身を読み、
+NFC正規化した名前 → 実際の名前 の辞書を作って引く。
+ディレクトリの一覧はmtimeと一緒にJSONで保存しておき、
+次回はディレクトリのmtimeが同じなら読み直さない。
+"""
+
+import json
+import os
+import unicodedata
+from pathlib import Path
+
+# キャッシュの持ち方を変えたら上げる
+PATH_CACHE_VERSION = 1
+
+# 競合フォルダ内のCSV名（NFC）の末尾
+KEYWORDS_SUFFIX = "キーワード.csv"
+PAGES_SUFFIX = "ページ.csv"
+DOMAINS_SUFFIXES = ("競合.csv", "競合抽出.csv")
+
+
+def nfc(text):
+    return unicodedata.normalize('NFC', text)
+
+
+class PathResolver:
+    """base_dir 以下の相対パスをNFC/NFDの違いを吸収して実パスにする
+
+    cache_file を渡すとディレクトリ一覧を保存・再利用する（save() で書き出し）。
+    """
+
+    def __init__(self, base_dir, cache_file=None):
+        self.base_dir = Path(base_dir)
+        self.cache_file = cache_file
+        self.scans = 0
+        self._dirs = {}     # 実ディレクトリ → {NFC名: 実名}
+        self._stored = {}   # 保存済みの {実ディレクトリ: {"mtime_ns", "names"}}
+        self._dirty = False
+        if cache_file is not None:
+            try:
+                with open(cache_file, encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get("version") == PATH_CACHE_VERSION:
+                    self._stored = data.get("dirs", {})
+            except (OSError, ValueError):
+                pass
+
+    def _index(self, directory):
+        """ディレクトリの {NFC名: 実名}（無ければ空）"""
+        key = str(directory)
+        index = self._dirs.get(key)
+        if index is not None:
+            return index
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError:
+            index = self._dirs[key] = {}
+            return index
+        stored = self._stored.get(key)
+        if stored is not None and stored["mtime_ns"] == mtime_ns:
+            names = stored["names"]
+        else:
+            self.scans += 1
+            with os.scandir(directory) as it:
+                names = sorted(entry.name for entry in it)
+            self._stored[key] = {"mtime_ns": mtime_ns, "names": names}
+            self._dirty = True
+        index = self._dirs[key] = {nfc(name): name for name in names}
+        return index
+
+    def resolve(self, relative):
+        """相対パス（文字列かPath）の実パス
+
+        見つからない部分は書いたとおりのまま返すので、存在確認は呼び出し側で行う。
+        """
+        path = self.base_dir
+        for part in Path(relative).parts:
+            path = path / self._index(path).get(nfc(part), part)
+        return path
+
+    def listdir(self, relative=""):
+        """ディレクトリ内の (NFC名, 実パス) を名前順で返す"""
+        directory = self.resolve(relative) if relative else self.base_dir
+        index = self._index(directory)
+        return [(name, directory / index[name]) for name in sorted(index)]
+
+    def save(self):
+        """ディレクトリ一覧をキャッシュファイルに書き出す（変化が無ければ何もしない）"""
+        if self.cache_file is None or not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        tmp_path = f"{self.cache_file}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": PATH_CACHE_VERSION, "dirs": self._stored}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_file)
+        self._dirty = False
+
+
+def discover_categories(resolver, keyword_dir):
+    """キーワード調査フォルダのCSVを (カテゴリ名, 相対パス) で返す（カテゴリ名はNFCの拡張子なし）"""
+    return [
+        (name[:-4], f"{keyword_dir}/{name}")
+        for name, path in resolver.listdir(keyword_dir)
+        if name.lower().endswith(".csv") and path.is_file()
+    ]
+
+
+def discover_competitors(resolver, exclude=()):
+    """キーワードCSV（*キーワード.csv）を持つフォルダを競合として返す
+
+    各要素は {"dir", "keywords_csv", "pages_csv", "domains_csv"}（パスは相対、無ければNone）。
+    exclude はNFCのフォルダ名で、隠しフォルダも対象外。
+    """
+    exclude = {nfc(name) for name in exclude}
+    found = []
+    for dir_name, dir_path in resolver.listdir():
+        if dir_name.startswith((".", "_")) or dir_name in exclude or not dir_path.is_dir():
+            continue
+        files = {"keywords_csv": None, "pages_csv": None, "domains_csv": None}
+        for name, _ in resolver.listdir(dir_name):
+            if name.endswith(KEYWORDS_SUFFIX):
+                field = "keywords_csv"
+            elif name.endswith(PAGES_SUFFIX):
+                field = "pages_csv"
+            elif name.endswith(DOMAINS_SUFFIXES):
+                field = "domains_csv"
+            else:
+                continue
+            # 同じ種類が複数あれば名前順で最初のもの
+            if files[field] is None:
+                files[field] = f"{dir_name}/{name}"
+        if files["keywords_csv"] is not None:
+            found.append({"dir": dir_name, **files})
+    return found
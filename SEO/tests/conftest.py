@@ -0,0 +1,6 @@
+"""SEO/ のモジュールを import できるようにする（pytest をリポジトリのどこから実行しても）"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
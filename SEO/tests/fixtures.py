@@ -0,0 +1,43 @@
+"""テスト用の小さなCSVツリー（ラッコキーワード形式のUTF-16 TSV）"""
+
+from pathlib import Path
+
+KEYWORD_HEADER = ["キーワード", "月間検索数", "SEO難易度", "CPC($)", "競合性", "202410（検索数）", "202411（検索数）"]
+COMPETITOR_HEADER = ["キーワード", "月間検索数", "SEO難易度", "検索順位", "推定流入数", "URL"]
+
+
+def write_csv(path, header, rows, encoding='utf-16'):
+    """header と rows をタブ区切りで書く（encoding='utf-8-sig' ならカンマ区切り）"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    delimiter = "\t" if encoding == 'utf-16' else ","
+    lines = [delimiter.join(header)] + [delimiter.join(str(v) for v in row) for row in rows]
+    path.write_text("\n".join(lines) + "\n", encoding=encoding)
+    return path
+
+
+def make_base_dir(root):
+    """自社2カテゴリ・競合2社のCSVを root の下に作る（他の競合はファイル無し）"""
+    root = Path(root)
+    write_csv(root / "キーワード調査" / "小学生.csv", KEYWORD_HEADER, [
+        ["小学生 プログラミング", "1,200", 35, "1.50", 80, 1000, 1400],
+        ["小学生 英語", 800, "-", "0.80", 60, 700, ""],
+        ["小学生 ドリル", 300, 10, "0", 20, "", ""],
+    ])
+    write_csv(root / "キーワード調査" / "プログラミング.csv", KEYWORD_HEADER, [
+        ["プログラミング 教室", 2000, 50, "2.10", 90, 1800, 2200],
+        ["小学生 プログラミング", 1200, 35, "1.50", 80, 1000, 1400],
+    ])
+    write_csv(root / "コエテコ" / "キーワード.csv", COMPETITOR_HEADER, [
+        ["プログラミング 教室", 2000, 50, 3, 400, "https://coeteco.jp/a"],
+        ["ロボット 教室", 600, 30, 0, 0, ""],
+    ])
+    write_csv(root / "リタリコ" / "リタリコ_キーワード.csv", COMPETITOR_HEADER, [
+        ["プログラミング 教室", 2000, 50, 8, 120, "https://wonder.litalico.jp/"],
+        ["マイクラ プログラミング", 900, 20, 2, 300, "https://wonder.litalico.jp/mc"],
+    ])
+    return root
+
+
+def table_rows(table):
+    return [table.row(i) for i in range(len(table))]
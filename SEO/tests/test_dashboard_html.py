@@ -0,0 +1,72 @@
+"""write_html のストリーム書き出し"""
+
+import io
+import unittest
+
+import generate_unified_html as g
+from keyword_table import KeywordTable
+
+
+def sample_data():
+    all_data = {key: KeywordTable() for key in g.COMPANIES}
+    all_data["できたよ"].append("小学生 プログラミング", 1200, category="小学生", icon="🎒")
+    all_data["できたよ"].append("小学生 英語", 800, category="小学生", icon="🎒")
+    all_data["コエテコ"].append("プログラミング 教室", 2000)
+    return all_data
+
+
+class CountingWriter(io.StringIO):
+    """write() の回数を数える StringIO"""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+class WriteHtmlTest(unittest.TestCase):
+    def test_streams_the_same_document_as_generate_html(self):
+        data = sample_data()
+        out = CountingWriter()
+        g.write_html(out, data)
+        html = out.getvalue()
+        self.assertEqual(html, g.generate_html(data))
+        self.assertTrue(html.startswith("<!DOCTYPE html>"))
+        self.assertTrue(html.rstrip().endswith("</html>"))
+        # 1つの文字列に連結せず、セクションごとに書き出している
+        self.assertGreater(out.writes, len(g.COMPANIES))
+
+    def test_company_pages_and_summary(self):
+        html = g.generate_html(sample_data())
+        for key in g.COMPANIES:
+            page_id = "dekitayo" if key == "できたよ" else key
+            self.assertIn(f'id="page-{page_id}"', html)
+        self.assertIn("<div class=\"value\">3</div>", html)
+        self.assertIn("自社調査 + 競合1社の分析データを統合", html)
+        self.assertIn("2,000", html)
+
+    def test_extra_pages(self):
+        rendered = []
+
+        def render(out):
+            rendered.append(True)
+            out.write("<p>追加ページ本体</p>\n")
+
+        page = g.DashboardPage("extra", "🧪", "追加", render=render, script="const EXTRA = 1;\n", badge="9")
+        html = g.generate_html(sample_data(), pages=[page])
+        self.assertEqual(rendered, [True])
+        self.assertIn("横断分析", html)
+        self.assertIn("showPage('extra')", html)
+        self.assertIn('<div id="page-extra" class="page">\n<p>追加ページ本体</p>', html)
+        self.assertIn('<span class="badge">9</span>', html)
+        self.assertLess(html.index("const EXTRA = 1;"), html.index("</script>\n</body>"))
+
+    def test_no_extra_pages_no_section(self):
+        self.assertNotIn("横断分析", g.generate_html(sample_data()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""企業ページの表を埋め込みJSONで持つ部分"""
+
+import io
+import json
+import re
+import unittest
+
+import generate_unified_html as g
+from keyword_table import KeywordTable
+
+
+def embedded(html, element_id):
+    """<script type="application/json" id=...> の中身をパースして返す"""
+    match = re.search(f'<script type="application/json" id="{element_id}">(.*?)</script>', html, re.S)
+    return json.loads(match.group(1))
+
+
+class TablePayloadTest(unittest.TestCase):
+    def setUp(self):
+        self.table = KeywordTable()
+        self.table.append("小学生 プログラミング", 300, category="小学生", icon="🎒")
+        self.table.append("英語", 1200, category="英語", icon="🔤")
+        self.table.append("ドリル", 700, category="小学生", icon="🎒")
+
+    def test_columns_in_row_order(self):
+        payload = g.table_payload(self.table, self.table.top(None))
+        self.assertEqual(payload, {"k": ["英語", "ドリル", "小学生 プログラミング"], "v": [1200, 700, 300]})
+
+    def test_category_codes(self):
+        payload = g.table_payload(self.table, self.table.top(2), with_category=True)
+        self.assertEqual(payload["c"], [1, 0])
+        self.assertEqual(payload["cats"], [["小学生", "🎒"], ["英語", "🔤"]])
+
+    def test_script_tag_cannot_be_closed_from_data(self):
+        out = io.StringIO()
+        payload = {"k": ["</script><b>x</b>", "a</b"], "v": [1, 2]}
+        g.write_json_script(out, "data-x", payload)
+        text = out.getvalue()
+        self.assertEqual(text.count("</script>"), 1)
+        self.assertEqual(embedded(text, "data-x"), payload)
+
+
+class DashboardTablesTest(unittest.TestCase):
+    def setUp(self):
+        self.all_data = {key: KeywordTable() for key in g.COMPANIES}
+        for i in range(5):
+            self.all_data["コエテコ"].append(f"語{i}", i * 100)
+        self.all_data["できたよ"].append("<自社>", 10, category="小学生", icon="🎒")
+
+    def test_rows_are_embedded_not_rendered(self):
+        html = g.generate_html(self.all_data)
+        self.assertEqual(embedded(html, "data-コエテコ")["k"], ["語4", "語3", "語2", "語1", "語0"])
+        self.assertEqual(embedded(html, "data-dekitayo")["cats"], [["小学生", "🎒"]])
+        # 行は <tr> として書かず、表示時にJSで描画する
+        self.assertNotIn("<td", html.split("<script>")[0])
+        self.assertNotIn("<自社>", html.replace('"<自社>"', ""))
+
+    def test_row_limit(self):
+        html = g.generate_html(self.all_data, row_limit=2)
+        self.assertEqual(embedded(html, "data-コエテコ"), {"k": ["語4", "語3"], "v": [400, 300]})
+
+    def test_api_mode_embeds_settings_only(self):
+        html = g.generate_html(self.all_data, api_base="/api")
+        self.assertEqual(embedded(html, "data-コエテコ"), {"company": "コエテコ", "cats": False})
+        self.assertIn('const KEYWORD_API = "/api";', html)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""keyword_articles の記事との突き合わせ（語の境界）"""
+
+import unittest
+
+from keyword_articles import ArticleCoverage, Post, PostIndex
+from keyword_search import KeywordIndex
+from keyword_table import KeywordTable
+
+POSTS = [
+    Post("scratch-game", "Scratchでゲームを作ろう", "2024-05-01"),
+    Post("programming-kids", "小学生のプログラミング教室の選び方", "2024-06-01"),
+    Post("python-intro", "Python 入門 for kids", "2024-07-01"),
+]
+
+
+class PostIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = PostIndex(POSTS)
+
+    def posts(self, keyword):
+        mask = self.index.match_keyword(keyword)
+        return [post.slug for i, post in enumerate(POSTS) if mask >> i & 1]
+
+    def test_whole_words_match(self):
+        self.assertEqual(self.posts("scratch ゲーム"), ["scratch-game"])
+        self.assertEqual(self.posts("プログラミング 小学生"), ["programming-kids"])
+        self.assertEqual(self.posts("python kids"), ["python-intro"])
+        self.assertEqual(self.posts("ＰＹＴＨＯＮ"), ["python-intro"])
+
+    def test_partial_words_do_not_match(self):
+        # 「scratch」の中の r、「プログラミング」の中の「プログラミン」は一致させない
+        self.assertEqual(self.posts("プログラミング r"), [])
+        self.assertEqual(self.posts("小学生 プログラミン"), [])
+        self.assertEqual(self.posts("scr"), [])
+        self.assertEqual(self.posts("kid"), [])
+
+    def test_kanji_substrings_still_match(self):
+        self.assertEqual(self.posts("教室"), ["programming-kids"])
+        self.assertEqual(self.posts("選び"), ["programming-kids"])
+
+    def test_no_match_across_title_and_slug(self):
+        # タイトル末尾「作ろう」とスラッグ先頭「scratch」をまたがない
+        self.assertEqual(self.posts("ろうscratch"), [])
+
+    def test_repeated_words_need_repeated_matches(self):
+        # 「ゲーム」が1回しか無い記事は「ゲーム ゲーム」の記事にしない
+        self.assertEqual(self.posts("ゲーム ゲーム"), [])
+        self.assertEqual(self.posts("ゲーム"), ["scratch-game"])
+        index = PostIndex(POSTS + [Post("game-game", "ゲームでゲームを学ぶ", "2024-08-01"),
+                                   Post("mama", "ままま", "2024-09-01")])
+        self.assertEqual(index.match_keyword("ゲーム ゲーム"), 1 << 3)
+        # 重なった出現は1回と数える（「ままま」の「まま」は1回）
+        self.assertEqual(index.match_keyword("まま"), 1 << 4)
+        self.assertEqual(index.match_keyword("まま まま"), 0)
+
+    def test_empty_keyword(self):
+        self.assertEqual(self.index.match_keyword("   "), 0)
+
+
+class ArticleCoverageTest(unittest.TestCase):
+    def test_gaps_and_hits(self):
+        table = KeywordTable()
+        for keyword, volume in (("プログラミング 教室", 500), ("ロボット", 300), ("scratch", 100), ("r", 50)):
+            table.append(keyword, volume)
+        index = KeywordIndex.build({"self": table}, [("self", "自社", "")])
+        coverage = ArticleCoverage(index, POSTS)
+        self.assertEqual([index.keywords[i] for i, _ in coverage.covered], ["プログラミング 教室", "scratch"])
+        self.assertEqual([index.keywords[i] for i in coverage.gaps], ["ロボット", "r"])
+        self.assertEqual(coverage.post_hits, [[1, 100], [1, 500], [0, 0]])
+        payload = coverage.to_payload()
+        self.assertEqual(payload["total"]["covered_volume"], 600)
+        self.assertEqual(payload["gaps"]["c"], [[0], [0]])
+
+
+if __name__ == "__main__":
+    unittest.main()
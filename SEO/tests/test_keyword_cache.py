@@ -0,0 +1,139 @@
+"""keyword_cache の読み込みキャッシュと集計キャッシュの無効化"""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from keyword_cache import AnalysisCache, KeywordCache, source_digest
+from keyword_table import KeywordTable
+
+
+def make_table(*keywords):
+    table = KeywordTable()
+    for keyword in keywords:
+        table.append(keyword, 10)
+    return table
+
+
+class KeywordCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.cache_dir = root / ".cache"
+        self.csv = root / "a.csv"
+        self.csv.write_text("キーワード,月間検索数\nscratch,10\n", encoding='utf-8')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def store(self, source="v1", table=None):
+        cache = KeywordCache(self.cache_dir, source=source)
+        key = cache.make_key(self.csv, "カテゴリ")
+        cache.store(self.csv, key, table or make_table("scratch"))
+        return key
+
+    def load(self, key, source="v1"):
+        cache = KeywordCache(self.cache_dir, source=source)
+        return cache.load(self.csv, key), cache
+
+    def test_hit(self):
+        key = self.store()
+        table, cache = self.load(key)
+        self.assertEqual(table.keywords, ["scratch"])
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    def test_touch_without_change_still_hits(self):
+        key = self.store()
+        stat = self.csv.stat()
+        os.utime(self.csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertIsNotNone(self.load(key)[0])
+
+    def test_content_change_misses(self):
+        key = self.store()
+        self.csv.write_text("キーワード,月間検索数\nscratch,99\n", encoding='utf-8')
+        table, cache = self.load(key)
+        self.assertIsNone(table)
+        self.assertEqual(cache.misses, 1)
+
+    def test_same_size_content_change_misses(self):
+        key = self.store()
+        stat = self.csv.stat()
+        self.csv.write_text("キーワード,月間検索数\nscratch,20\n", encoding='utf-8')
+        os.utime(self.csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertIsNone(self.load(key)[0])
+
+    def test_parser_source_change_misses(self):
+        key = self.store(source="v1")
+        self.assertIsNone(self.load(key, source="v2")[0])
+
+    def test_other_key_misses(self):
+        self.store()
+        cache = KeywordCache(self.cache_dir, source="v1")
+        self.assertIsNone(cache.load(self.csv, cache.make_key(self.csv, "別カテゴリ")))
+
+    def test_reuse_false_only_writes(self):
+        key = self.store()
+        cache = KeywordCache(self.cache_dir, reuse=False, source="v1")
+        self.assertIsNone(cache.load(self.csv, key))
+
+    def test_fingerprint_follows_digests_and_source(self):
+        key = self.store()
+        _, first = self.load(key)
+        _, again = self.load(key)
+        self.assertEqual(first.fingerprint(["a"]), again.fingerprint(["a"]))
+        self.assertNotEqual(first.fingerprint(["a"]), first.fingerprint(["b"]))
+        other = KeywordCache(self.cache_dir, source="v2")
+        other.digests = dict(first.digests)
+        self.assertNotEqual(first.fingerprint(["a"]), other.fingerprint(["a"]))
+
+
+class SourceDigestTest(unittest.TestCase):
+    def test_subset(self):
+        self.assertEqual(source_digest("keyword_table.py"), source_digest("keyword_table.py"))
+        self.assertNotEqual(source_digest("keyword_table.py"), source_digest("keyword_cache.py"))
+        self.assertNotEqual(source_digest(), source_digest("keyword_table.py"))
+
+
+class AnalysisCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = Path(self.tmp.name)
+        self.tables = {"self": make_table("a", "b")}
+        self.calls = 0
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def compute(self):
+        self.calls += 1
+        return {"table": self.tables["self"], "rows": len(self.tables["self"])}
+
+    def get(self, fingerprint, *parts, tables=None):
+        cache = AnalysisCache(self.cache_dir, fingerprint, tables or self.tables)
+        return cache.get("result", self.compute, *parts), cache
+
+    def test_reuse_relinks_tables(self):
+        self.get("f1", "w=1")
+        tables = {"self": make_table("a", "b")}
+        value, cache = self.get("f1", "w=1", tables=tables)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(cache.hits, ["result"])
+        # テーブルの中身は保存せず、今回読み込んだテーブルにつなぎ直す
+        self.assertIs(value["table"], tables["self"])
+
+    def test_fingerprint_or_parts_change_recomputes(self):
+        self.get("f1", "w=1")
+        self.get("f2", "w=1")
+        self.get("f2", "w=2")
+        self.assertEqual(self.calls, 3)
+
+    def test_no_fingerprint_never_writes(self):
+        self.get(None)
+        self.get(None)
+        self.assertEqual(self.calls, 2)
+        self.assertFalse((self.cache_dir / "analysis").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
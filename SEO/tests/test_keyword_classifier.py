@@ -0,0 +1,105 @@
+"""keyword_classifier の Aho–Corasick と辞書分類"""
+
+import os
+import pickle
+import tempfile
+import unittest
+
+from keyword_classifier import (
+    AhoCorasick, KeywordClassifier, classify_tables, holdout_agreement, keyword_hash,
+)
+from keyword_table import KeywordTable
+
+
+def naive_find(terms, text):
+    """総当たりで (終了位置, 用語番号) を数える（照合用）"""
+    return sorted(
+        (start + len(term), term_id)
+        for term_id, term in enumerate(terms)
+        for start in range(len(text) - len(term) + 1)
+        if text.startswith(term, start)
+    )
+
+
+class AhoCorasickTest(unittest.TestCase):
+    def test_overlapping_terms(self):
+        terms = ["he", "she", "his", "hers"]
+        found = AhoCorasick(terms).find("ushers")
+        self.assertEqual(sorted(terms[i] for i in found), ["he", "hers", "she"])
+
+    def test_matches_brute_force(self):
+        terms = ["プログラミング", "プログラム", "グラ", "ミング", "教室", "室"]
+        text = "プログラミング教室とプログラム教室"
+        automaton = AhoCorasick(terms)
+        self.assertEqual(sorted(automaton.find(text)), sorted(i for _, i in naive_find(terms, text)))
+
+    def test_no_terms(self):
+        self.assertEqual(list(AhoCorasick([]).find("abc")), [])
+
+
+class ClassifierTest(unittest.TestCase):
+    def setUp(self):
+        self.seed_terms = {
+            "category": {"プログラミング学習": ("プログラミング", "scratch"), "英語学習": ("英語",)},
+            "target": {"保護者（子育て層）": ("小学生",)},
+        }
+        self.classifier = KeywordClassifier.build(seed_terms=self.seed_terms)
+
+    def classify(self, keyword):
+        return self.classifier.label_names(self.classifier.classify(keyword))
+
+    def test_labels(self):
+        labels = self.classify("小学生 プログラミング")
+        self.assertEqual(labels["category"], "プログラミング学習")
+        self.assertEqual(labels["target"], "保護者（子育て層）")
+        self.assertEqual(labels["cv_distance"], "遠い（情報収集）")
+
+    def test_longer_term_wins(self):
+        # 「プログラミング」(7文字) は「英語」(2文字) より強い
+        self.assertEqual(self.classify("英語 プログラミング")["category"], "プログラミング学習")
+
+    def test_normalized_match(self):
+        self.assertEqual(self.classify("ＳＣＲＡＴＣＨ")["category"], "プログラミング学習")
+
+    def test_default_labels(self):
+        self.assertEqual(self.classifier.classify("天気"), (0, 0, 0))
+
+    def test_hand_labels_take_priority(self):
+        labeled = [{"keyword": "プログラミング", "category": "英語学習"}]
+        classifier = KeywordClassifier.build(labeled=labeled, seed_terms=self.seed_terms)
+        labels = classifier.label_names(classifier.classify("プログラミング 教室"))
+        self.assertEqual(labels["category"], "英語学習")
+
+    def test_holdout_does_not_see_its_own_label(self):
+        # 手作業ラベルにしか無い語は、除いた分割では当てられない
+        labeled = [{"keyword": f"語{i}", "category": "英語学習"} for i in range(10)]
+        agree = holdout_agreement(labeled, folds=5)
+        self.assertEqual(agree["category"], (0, 10))
+        self.assertEqual(agree["target"], (10, 10))
+
+
+class ClassifyTablesTest(unittest.TestCase):
+    def make_table(self, keywords):
+        table = KeywordTable()
+        for keyword in keywords:
+            table.append(keyword, 1)
+        return table
+
+    def test_cache_keeps_only_current_keywords(self):
+        classifier = KeywordClassifier.build(seed_terms={"category": {"英語学習": ("英語",)}})
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache", "classification.pickle")
+            first = classify_tables(classifier, {"a": self.make_table(["英語 教室", "天気"])}, path)
+            self.assertEqual(first.counts("a", "category"), {"その他": 1, "英語学習": 1})
+
+            classify_tables(classifier, {"a": self.make_table(["英語 教室", "英語 アプリ"])}, path)
+            with open(path, 'rb') as f:
+                labels = pickle.load(f)["labels"]
+            self.assertEqual(set(labels), {keyword_hash("英語 教室"), keyword_hash("英語 アプリ")})
+
+            second = classify_tables(classifier, {"a": self.make_table(["英語 アプリ"])}, path)
+            self.assertEqual(second.row_labels("a", 0)["category"], "英語学習")
+
+
+if __name__ == "__main__":
+    unittest.main()
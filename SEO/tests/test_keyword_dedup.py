@@ -0,0 +1,84 @@
+"""keyword_dedup の表記ゆれクラスタ（空白・カナ・助詞の違いだけをまとめる）"""
+
+import unittest
+
+from keyword_dedup import cluster_keywords, variant_key
+from keyword_table import KeywordTable
+
+
+def make_table(rows):
+    table = KeywordTable()
+    for keyword, volume, category in rows:
+        table.append(keyword, volume, category=category)
+    return table
+
+
+class VariantKeyTest(unittest.TestCase):
+    def test_particles_between_content_words(self):
+        self.assertEqual(variant_key("capslockの解除"), variant_key("capslock解除"))
+        self.assertEqual(variant_key("自己肯定感が低い"), variant_key("自己肯定感 低い"))
+        self.assertEqual(variant_key("ゲーム を作る"), variant_key("ゲーム作る"))
+        self.assertEqual(variant_key("ＰＣの 使い方"), variant_key("pc使い方"))
+
+    def test_hiragana_words_are_kept(self):
+        # ひらがなに挟まれた「の」「も」は語の一部なので除かない
+        self.assertEqual(variant_key("こどものくに"), "こどものくに")
+        self.assertEqual(variant_key("ドラえもん"), "どらえもん")
+
+
+class ClusterTest(unittest.TestCase):
+    def setUp(self):
+        self.table = make_table([
+            ("プログラミング教室 おすすめ 小学生", 900, "教室"),
+            # 仕込んだ表記ゆれ（助詞の有無だけが違う）
+            ("プログラミング教室の おすすめ 小学生", 300, "教室"),
+            # 正規化で完全一致（空白・カナ）→ 同じ語として1回だけ数える
+            ("プログラミング教室おすすめ小学生", 500, "比較"),
+            # 文字の大半が同じでも語が足されたものは別の語
+            ("プログラミング教室 おすすめ 小学生向け", 200, "教室"),
+            ("ロボット 教室 体験", 400, "教室"),
+            ("マイクラ", 100, "教材"),
+        ])
+        self.result = cluster_keywords(self.table)
+
+    def test_planted_pair_is_clustered(self):
+        head = self.result.cluster_of(0)
+        self.assertIs(self.result.cluster_of(1), head)
+        self.assertIs(self.result.cluster_of(2), head)
+        self.assertEqual(head.head, "プログラミング教室 おすすめ 小学生")
+        self.assertEqual(head.rows, 3)
+        self.assertEqual(len(head.variants), 2)
+
+    def test_unrelated_keywords_stay_apart(self):
+        self.assertIsNot(self.result.cluster_of(3), self.result.cluster_of(0))
+        self.assertIsNot(self.result.cluster_of(4), self.result.cluster_of(0))
+        self.assertIsNot(self.result.cluster_of(5), self.result.cluster_of(4))
+        self.assertEqual(len(self.result.clusters), 4)
+
+    def test_totals_count_normalized_duplicates_once(self):
+        self.assertEqual(self.result.total_volume(), 900 + 300 + 200 + 400 + 100)
+        totals = self.result.category_totals()
+        self.assertEqual(totals["教室"], {"count": 4, "volume": 900 + 300 + 200 + 400})
+        self.assertEqual(totals["比較"], {"count": 1, "volume": 900})
+
+    def test_merged_lists_multi_variant_clusters(self):
+        merged = self.result.merged()
+        self.assertEqual([c.head for c in merged], ["プログラミング教室 おすすめ 小学生"])
+        self.assertEqual(merged[0].volume, 1200)
+
+    def test_distinct_long_tail_keywords_stay_apart(self):
+        # 文字bigramの Jaccard では 0.7 を超えるが、意味の違う語
+        groups = [
+            ["自己肯定感 部屋", "自己肯定感 部下"],
+            ["非認知能力 教育", "非認知能力 教室", "非認知能力 教材"],
+            ["小学生ドリル 算数", "小学生ドリル 国語", "小学生ドリル 大人"],
+            ["プログラミング教室 料金", "プログラミング教室 料理"],
+        ]
+        table = make_table([(kw, 1000 - n, "") for n, kw in enumerate(kw for group in groups for kw in group)])
+        result = cluster_keywords(table)
+        self.assertEqual(len(result.clusters), len(table))
+        self.assertEqual(result.merged(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
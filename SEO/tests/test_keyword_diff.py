@@ -0,0 +1,61 @@
+"""keyword_diff の新旧比較"""
+
+import unittest
+
+from keyword_diff import diff_keywords
+from keyword_table import KeywordTable
+
+
+def make_table(rows):
+    table = KeywordTable()
+    for keyword, volume, rank in rows:
+        table.append(keyword, volume, rank=rank, category="オーガニック")
+    return table
+
+
+class DiffTest(unittest.TestCase):
+    def setUp(self):
+        old = {
+            "rival": make_table([("プログラミング 教室", 1000, 5), ("ロボット", 200, 0), ("消える語", 50, 9)]),
+            "gone": make_table([("撤退", 70, 1)]),
+        }
+        new = {
+            "rival": make_table([("プログラミング 教室", 1200, 2), ("ロボット", 150, 12), ("新しい語", 80, 0)]),
+            "fresh": make_table([("新規参入", 40, 3)]),
+        }
+        self.diffs = diff_keywords(old, new)
+
+    def test_union_of_companies(self):
+        self.assertEqual(list(self.diffs), ["rival", "fresh", "gone"])
+        gone = self.diffs["gone"]
+        self.assertEqual([gone.old.keywords[j] for j in gone.lost], ["撤退"])
+        self.assertEqual(gone.volume_delta(), -70)
+        fresh = self.diffs["fresh"]
+        self.assertEqual([fresh.new.keywords[i] for i in fresh.added], ["新規参入"])
+
+    def test_added_lost_and_movers(self):
+        d = self.diffs["rival"]
+        self.assertEqual([d.new.keywords[i] for i in d.added], ["新しい語"])
+        self.assertEqual([d.old.keywords[j] for j in d.lost], ["消える語"])
+        self.assertEqual(d.volume_delta(), (1200 + 150 + 80) - (1000 + 200 + 50))
+        up, down = d.movers()
+        self.assertEqual([delta for _, _, delta in up], [200])
+        self.assertEqual([delta for _, _, delta in down], [-50])
+        self.assertEqual(d.category_counts["オーガニック"], {"added": 1, "lost": 1, "volume_delta": 180})
+
+    def test_rank_changes(self):
+        d = self.diffs["rival"]
+        up, down = d.rank_changes()
+        # 圏外からの12位は、5位→2位より大きな上昇として数える
+        self.assertEqual([d.new.keywords[i] for _, i in up], ["ロボット", "プログラミング 教室"])
+        self.assertEqual(down, [])
+        self.assertEqual(d.rank_change_count(), 2)
+        self.assertTrue(d.has_changes())
+
+    def test_no_changes(self):
+        table = make_table([("同じ", 10, 1)])
+        self.assertFalse(diff_keywords({"a": table}, {"a": table})["a"].has_changes())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""keyword_overlap の共通・固有・ギャップの集計"""
+
+import unittest
+
+from keyword_overlap import bitset_from_ids, compute_overlap, iter_bits
+from keyword_table import KeywordTable
+
+COMPANIES = [("self", "自社", ""), ("a", "競合A", ""), ("b", "競合B", "")]
+
+
+def make_table(rows):
+    table = KeywordTable()
+    for keyword, volume in rows:
+        table.append(keyword, volume)
+    return table
+
+
+class BitsetTest(unittest.TestCase):
+    def test_round_trip(self):
+        ids = [0, 3, 8, 9, 63, 64, 200]
+        self.assertEqual(list(iter_bits(bitset_from_ids(ids, 201))), ids)
+
+    def test_empty(self):
+        self.assertEqual(list(iter_bits(0)), [])
+
+
+class OverlapTest(unittest.TestCase):
+    def setUp(self):
+        all_data = {
+            # 表記ゆれ（全角・カナ・空白）は正規化して同じ語として数える
+            "self": make_table([("プログラミング 教室", 100), ("scratch", 50), ("自社だけ", 10)]),
+            "a": make_table([("ぷろぐらみんぐ教室", 120), ("ＳＣＲＡＴＣＨ", 40), ("ロボット", 300)]),
+            "b": make_table([("ロボット", 200), ("マイクラ", 80)]),
+        }
+        self.result = compute_overlap(all_data, COMPANIES, "self")
+
+    def test_shared_and_only(self):
+        r = self.result
+        self.assertEqual(r.shared("self", "a"), 2)
+        self.assertEqual(r.shared("self", "b"), 0)
+        self.assertEqual(r.shared("a", "b"), 1)
+        self.assertEqual(r.only("self", "a"), 1)
+        self.assertEqual(r.only("a", "self"), 1)
+
+    def test_matrix_is_symmetric(self):
+        matrix = self.result.matrix()
+        self.assertEqual(matrix, [[3, 2, 0], [2, 3, 1], [0, 1, 2]])
+
+    def test_pairs(self):
+        pairs = {row["key"]: row for row in self.result.pairs()}
+        self.assertEqual(set(pairs), {"a", "b"})
+        self.assertEqual(pairs["a"]["shared"], 2)
+        self.assertAlmostEqual(pairs["a"]["jaccard"], 2 / 4)
+        self.assertEqual(pairs["b"]["jaccard"], 0.0)
+
+    def test_gaps_by_volume(self):
+        gaps = self.result.gaps()
+        self.assertEqual([g["keyword"] for g in gaps], ["ロボット", "マイクラ"])
+        self.assertEqual(gaps[0]["volume"], 300)
+        self.assertEqual(gaps[0]["competitors"], ["a", "b"])
+        self.assertEqual(gaps[1]["competitors"], ["b"])
+        self.assertEqual(len(self.result.gaps(limit=1)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
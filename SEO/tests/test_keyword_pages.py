@@ -0,0 +1,98 @@
+"""競合のページ・競合ドメインCSVとキーワードの結合"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import generate_unified_html as g
+from fixtures import make_base_dir, write_csv
+from keyword_pages import DomainIndex, url_domain
+
+PAGE_HEADER = ["タイトル", "URL", "推定流入数", "キーワード数", "価値 ($)", "トップキーワード"]
+DOMAIN_HEADER = ["ドメイン名", "サイトタイトル", "重複", "重複率", "競合固有", "調査対象固有",
+                 "推定流入数", "キーワード数", "価値 ($)", "ページ数"]
+
+
+class UrlDomainTest(unittest.TestCase):
+    def test_host_is_lowercased_without_www(self):
+        self.assertEqual(url_domain("https://www.Example.jp/a?b=1"), "example.jp")
+        self.assertEqual(url_domain("https://wonder.litalico.jp/"), "wonder.litalico.jp")
+        self.assertEqual(url_domain(""), "")
+
+
+class SiteDataTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = make_base_dir(self.tmp.name)
+        patcher = mock.patch.object(g, "BASE_DIR", Path(self.root))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        write_csv(self.root / "コエテコ" / "ページ.csv", PAGE_HEADER, [
+            ["教室まとめ", "https://coeteco.jp/a", "1,500", 40, 300, "プログラミング 教室"],
+            ["トップ", "https://coeteco.jp/", 800, 10, 100, "コエテコ"],
+            # 同じURLが続いたら最初の行を残す
+            ["教室まとめ（重複）", "https://coeteco.jp/a", 1, 1, 1, ""],
+        ])
+        write_csv(self.root / "コエテコ" / "競合抽出.csv", DOMAIN_HEADER, [
+            ["Wonder.Litalico.jp", "LITALICOワンダー", 120, "45.5%", 30, 50, 9000, 400, 1000, 80],
+            ["example.com", "例", 5, "1%", 1, 2, 10, 3, 0, 1],
+        ])
+        write_csv(self.root / "リタリコ" / "リタリコ_競合.csv", DOMAIN_HEADER, [
+            ["coeteco.jp", "コエテコ", 100, "40%", 20, 60, 5000, 300, 800, 70],
+            ["example.com", "例", 5, "1%", 1, 2, 20, 3, 0, 1],
+        ])
+        all_data, _ = g.load_all_keywords()
+        self.sites, self.errors = g.load_site_data(all_data)
+
+    def test_keywords_join_to_pages(self):
+        site = self.sites["コエテコ"]
+        self.assertEqual(site.pages.urls, ["https://coeteco.jp/a", "https://coeteco.jp/"])
+        self.assertEqual(site.pages.traffic[0], 1500)
+        # キーワード行0（プログラミング 教室）だけがURLを持つ
+        self.assertEqual(list(site.keyword_page), [0, -1])
+        self.assertEqual(site.joined(), 1)
+        self.assertEqual(list(site.page_keywords), [1, 0])
+        self.assertEqual(list(site.page_traffic), [400, 0])
+        self.assertEqual(site.top_pages(1), [0])
+        self.assertEqual(site.domain_totals(), {"coeteco.jp": {"pages": 2, "traffic": 2300, "keywords": 1}})
+
+    def test_domains_are_parsed(self):
+        domains = self.sites["コエテコ"].domains
+        self.assertEqual(domains.domains, ["wonder.litalico.jp", "example.com"])
+        self.assertAlmostEqual(domains.shared_rate[0], 0.455)
+        self.assertEqual(domains.traffic[0], 9000)
+
+    def test_missing_files_give_empty_tables(self):
+        # リタリコはページCSVが無い、QUREO はどちらも無い
+        self.assertEqual(len(self.sites["リタリコ"].pages), 0)
+        self.assertEqual(self.sites["リタリコ"].joined(), 0)
+        self.assertEqual(len(self.sites["QUREO"].domains), 0)
+        self.assertNotIn("できたよ", self.sites)
+        self.assertEqual(self.errors, {})
+
+    def test_domain_index(self):
+        index = DomainIndex(self.sites)
+        self.assertEqual(index.lookup("Example.com"), [("コエテコ", 1), ("リタリコ", 1)])
+        self.assertEqual(index.owners, {"coeteco.jp": "コエテコ"})
+        ranked = index.ranked()
+        self.assertEqual(ranked[0]["domain"], "example.com")
+        self.assertEqual(ranked[0]["traffic"], 20)
+        self.assertEqual(ranked[1]["domain"], "wonder.litalico.jp")
+        self.assertEqual(next(r for r in ranked if r["domain"] == "coeteco.jp")["owner"], "コエテコ")
+
+    def test_broken_file_is_reported(self):
+        path = self.root / "コエテコ" / "ページ.csv"
+        with open(path, 'ab') as f:
+            f.write(b"\x00\xd8\x41\x00" * 4)
+        all_data, _ = g.load_all_keywords()
+        sites, errors = g.load_site_data(all_data)
+        self.assertEqual(len(errors["コエテコ"]), 1)
+        self.assertEqual(len(sites["コエテコ"].pages), 0)
+        self.assertEqual(list(sites["コエテコ"].keyword_page), [-1, -1])
+
+
+if __name__ == "__main__":
+    unittest.main()
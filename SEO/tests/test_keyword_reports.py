@@ -0,0 +1,123 @@
+"""--reports のレポート（ReportContext / run_renderers / 標準レポート）"""
+
+import csv
+import json
+import re
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from keyword_classifier import Classification, KeywordClassifier, classify_tables
+from keyword_reports import STANDARD_RENDERERS, ReportContext, ReportRenderer, run_renderers
+from keyword_scoring import ScoreWeights, score_keywords
+from keyword_table import KeywordTable
+
+COMPANIES = [("self", "自社", "🏠"), ("rival", "<競合&>", "🏢")]
+
+
+def sample_data():
+    mine = KeywordTable()
+    mine.append("小学生 プログラミング", 1200, difficulty=35, category="小学生", icon="🎒")
+    mine.append("小学生 英語", 800, category="小学生", icon="🎒")
+    rival = KeywordTable()
+    rival.append("プログラミング 教室", 2000, rank=3, traffic=400)
+    rival.append("</script> 教室", 10)
+    return {"self": mine, "rival": rival}
+
+
+def embedded_keys(text, table_id):
+    """keys-{table_id} に埋め込んだ検索用の文字列"""
+    match = re.search(f'<script type="application/json" id="keys-{table_id}">(.*?)</script>', text)
+    return json.loads(match.group(1))
+
+
+class ReportTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.output_dir = Path(self.tmp.name) / "レポート"
+        self.data = sample_data()
+
+    def context(self, **analyses):
+        return ReportContext(self.data, COMPANIES, self.output_dir, "self", **analyses)
+
+    def run_all(self, context):
+        results = run_renderers(STANDARD_RENDERERS, context)
+        for renderer, _, _, error in results:
+            self.assertIsNone(error, renderer.name)
+        return {renderer.name: paths for renderer, paths, _, _ in results}
+
+
+class RunRenderersTest(ReportTestCase):
+    def test_results_keep_order_and_failures_are_isolated(self):
+        seen = {}
+
+        def ok(context):
+            return [context.path("ok.txt")]
+
+        def broken(context):
+            raise RuntimeError("壊れた")
+
+        def portal(context):
+            # final のレポートは他のレポートが終わってから呼ばれる
+            seen.update(context.outputs)
+            return []
+
+        renderers = [ReportRenderer("portal", "P", portal, final=True),
+                     ReportRenderer("broken", "B", broken), ReportRenderer("ok", "O", ok)]
+        results = run_renderers(renderers, self.context(), jobs=2)
+        self.assertEqual([r.name for r, _, _, _ in results], ["portal", "broken", "ok"])
+        self.assertIsInstance(results[1][3], RuntimeError)
+        self.assertEqual(results[2][1], [self.output_dir / "ok.txt"])
+        self.assertEqual(seen, {"broken": [], "ok": [self.output_dir / "ok.txt"]})
+
+
+class StandardRenderersTest(ReportTestCase):
+    def test_without_analyses(self):
+        # --scores / --classify 無しでも書き出せる（載せるのは読み込んだ分だけ）
+        outputs = self.run_all(self.context())
+        self.assertEqual(outputs["classification"], [])
+        self.assertEqual(len(outputs["wiki"]), 2)
+        wiki = (self.output_dir / "self_キーワード分析.html").read_text(encoding='utf-8')
+        self.assertNotIn('id="scoring"', wiki)
+        self.assertNotIn('id="classification"', wiki)
+        with open(outputs["csv"][0], encoding='utf-8-sig', newline='') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[1][10], "")
+
+    def test_with_analyses(self):
+        classifier = KeywordClassifier.build(seed_terms={"category": {"プログラミング学習": ("プログラミング",)}})
+        classification = Classification(classifier, classify_tables(classifier, self.data).codes)
+        outputs = self.run_all(self.context(scoring=score_keywords(self.data, ScoreWeights()),
+                                            classification=classification))
+        wiki = (self.output_dir / "self_キーワード分析.html").read_text(encoding='utf-8')
+        self.assertIn('id="scoring"', wiki)
+        listing = outputs["classification"][0].read_text(encoding='utf-8')
+        self.assertIn("プログラミング学習", listing)
+        with zipfile.ZipFile(outputs["xlsx"][0]) as zf:
+            self.assertEqual(len([n for n in zf.namelist() if n.startswith("xl/worksheets/")]), 2)
+
+    def test_filter_uses_embedded_keys(self):
+        self.run_all(self.context())
+        wiki = (self.output_dir / "self_キーワード分析.html").read_text(encoding='utf-8')
+        self.assertNotIn("textContent.toLowerCase", wiki)
+        self.assertEqual(embedded_keys(wiki, "kw-table"), ["小学生 プログラミング 小学生", "小学生 英語 小学生"])
+        rival = (self.output_dir / "rival_キーワード分析.html").read_text(encoding='utf-8')
+        self.assertIn("&lt;競合&amp;&gt;", rival)
+        # 埋め込んだ文字列の中の </script> で script 要素が閉じない
+        self.assertEqual(embedded_keys(rival, "kw-table"), ["プログラミング 教室 ", "</script> 教室 "])
+
+    def test_portal_lists_labels(self):
+        self.run_all(self.context())
+        portal = (self.output_dir / "index.html").read_text(encoding='utf-8')
+        for renderer in STANDARD_RENDERERS:
+            if renderer.name not in ("portal", "classification"):
+                self.assertIn(f"<td>{renderer.label}</td>", portal)
+        self.assertNotIn("<td>wiki</td>", portal)
+        self.assertIn('href="self_キーワード分析.html"', portal)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""狙い目スコアの重みの検証と 0〜100 の範囲"""
+
+import contextlib
+import io
+import unittest
+
+import generate_unified_html as g
+from keyword_scoring import ScoreWeights, parse_weights, score_keywords
+from keyword_table import MISSING, KeywordTable
+
+
+def make_table(rows):
+    """rows は (キーワード, 検索数, 難易度, CPC, 競合性, 順位, 流入, カテゴリ) のリスト"""
+    table = KeywordTable()
+    for keyword, volume, difficulty, cpc, competition, rank, traffic, category in rows:
+        table.append(keyword, volume, difficulty=difficulty, cpc=cpc, competition=competition,
+                     rank=rank, traffic=traffic, category=category)
+    return table
+
+
+class ParseWeightsTest(unittest.TestCase):
+    def test_defaults_and_override(self):
+        self.assertEqual(parse_weights(""), ScoreWeights())
+        weights = parse_weights("volume=2, rank=0")
+        self.assertEqual((weights.volume, weights.rank, weights.cpc), (2.0, 0.0, ScoreWeights().cpc))
+
+    def test_rejects_invalid_weights(self):
+        for text in ("volume=-1", "cpc=nan", "traffic=inf", "volume=abc", "speed=1", "volume"):
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                parse_weights(text)
+
+    def test_command_line_error(self):
+        with contextlib.redirect_stderr(io.StringIO()) as err, self.assertRaises(SystemExit) as cm:
+            g.main(["--weights", "difficulty=-2"])
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn("difficulty=-2", err.getvalue())
+
+
+class ScoreBoundsTest(unittest.TestCase):
+    def setUp(self):
+        self.data = {
+            "自社": make_table([
+                ("満点", 10000, 0, 500, 0, 0, 0, "A"),
+                ("最低", 0, 100, 0, 100, 0, 0, "A"),
+                ("難易度未計測", 100, MISSING, 10, 50, 0, 0, "B"),
+            ]),
+            "競合": make_table([
+                ("順位あり", 10000, 0, 500, 0, 5, 9000, ""),
+                ("圏外", 10000, 0, 500, 0, 50, 0, ""),
+                # 順位が無く流入だけある行（以前は分母から流入の重みが抜けて100を超えた）
+                ("流入のみ", 10000, 0, 500, 0, 0, 9000, ""),
+                ("範囲外の値", 10000, -20, 500, -5, 0, 0, ""),
+            ]),
+        }
+
+    def check_bounds(self, weights):
+        result = score_keywords(self.data, weights)
+        for key, scores in result.scores.items():
+            for i, score in enumerate(scores):
+                with self.subTest(weights=weights, keyword=self.data[key].keywords[i]):
+                    self.assertGreaterEqual(score, 0.0)
+                    self.assertLessEqual(score, 100.0 + 1e-9)
+        return result
+
+    def test_scores_stay_within_0_100(self):
+        for weights in (ScoreWeights(), parse_weights("traffic=5"), parse_weights("volume=0,difficulty=0,cpc=0,competition=0"),
+                        parse_weights("volume=0,difficulty=0,cpc=0,competition=0,traffic=0,rank=0")):
+            self.check_bounds(weights)
+
+    def test_perfect_rows_score_100(self):
+        result = self.check_bounds(ScoreWeights())
+        self.assertAlmostEqual(result.scores["自社"][0], 100.0)
+        self.assertAlmostEqual(result.scores["自社"][1], 0.0)
+        self.assertAlmostEqual(result.scores["競合"][0], 100.0)
+        self.assertAlmostEqual(result.scores["競合"][2], 100.0)
+        # 範囲外の難易度・競合性は 0〜100 に丸める
+        self.assertAlmostEqual(result.scores["競合"][3], 100.0)
+
+    def test_top_rows_are_ordered_and_unique(self):
+        self.data["自社"].append("満点", 10000, category="B")
+        result = score_keywords(self.data, ScoreWeights(), k=2)
+        self.assertEqual(result.top_by_company["自社"], [0, 2])
+        top = result.top_by_category["自社"]
+        self.assertEqual(sorted(top), [0, 1])
+        self.assertEqual(top[0], [0, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+"""keyword_search の正規化と転置インデックス"""
+
+import os
+import tempfile
+import unittest
+
+from keyword_search import KeywordIndex, bigrams, normalize_keyword
+from keyword_table import KeywordTable
+
+
+def make_table(rows):
+    table = KeywordTable()
+    for keyword, volume in rows:
+        table.append(keyword, volume)
+    return table
+
+
+class NormalizeTest(unittest.TestCase):
+    def test_normalize(self):
+        self.assertEqual(normalize_keyword("プログラミング　教室"), "ぷろぐらみんぐ教室")
+        self.assertEqual(normalize_keyword("ＳＣＲＡＴＣＨ 3.0"), "scratch3.0")
+        self.assertEqual(normalize_keyword("  "), "")
+
+    def test_bigrams(self):
+        self.assertEqual(bigrams("abc"), {"ab", "bc"})
+        self.assertEqual(bigrams("a"), {"a"})
+        self.assertEqual(bigrams(""), set())
+
+
+class KeywordIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.companies = [("self", "自社", ""), ("a", "競合A", "")]
+        self.all_data = {
+            "self": make_table([("プログラミング 教室", 100), ("scratch", 30)]),
+            "a": make_table([("ぷろぐらみんぐ教室", 300), ("ロボット 教室", 50)]),
+        }
+        self.index = KeywordIndex.build(self.all_data, self.companies)
+
+    def test_search_merges_variants(self):
+        results = self.index.search("プログラミング")
+        self.assertEqual(results, [{"keyword": "ぷろぐらみんぐ教室", "volume": 300, "companies": ["self", "a"]}])
+
+    def test_results_by_volume(self):
+        self.assertEqual([r["keyword"] for r in self.index.search("教室")], ["ぷろぐらみんぐ教室", "ロボット 教室"])
+        self.assertEqual(len(self.index.search("教", limit=1)), 1)
+        self.assertEqual(self.index.search("存在しない"), [])
+        self.assertEqual(self.index.search(" "), [])
+
+    def test_many_companies(self):
+        # 32社を超えても出現企業が落ちない
+        companies = [(f"c{i}", f"企業{i}", "") for i in range(40)]
+        all_data = {key: make_table([("共通", 10)]) for key, _, _ in companies}
+        all_data["c39"].append("最後だけ", 5)
+        index = KeywordIndex.build(all_data, companies)
+        self.assertEqual(index.search("共通")[0]["companies"], [key for key, _, _ in companies])
+        self.assertEqual(index.search("最後だけ")[0]["companies"], ["c39"])
+        restored = KeywordIndex.from_payload(index.to_payload())
+        self.assertEqual(restored.search("最後だけ")[0]["companies"], ["c39"])
+
+    def test_payload_has_display_columns_only(self):
+        payload = self.index.to_payload()
+        self.assertEqual(set(payload), {"version", "companies", "k", "v", "c"})
+        restored = KeywordIndex.from_payload(payload)
+        self.assertEqual(restored.norms, self.index.norms)
+        self.assertEqual({g: list(p) for g, p in restored.postings.items()},
+                         {g: list(p) for g, p in self.index.postings.items()})
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "keyword_index.js")
+            self.index.save(path)
+            loaded = KeywordIndex.load(path)
+        self.assertEqual(loaded.search("教室"), self.index.search("教室"))
+        self.assertEqual(list(loaded.volumes), list(self.index.volumes))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""keyword_server の問い合わせとHTTPの処理"""
+
+import asyncio
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from keyword_server import KeywordQuery, KeywordServer, QueryError
+from keyword_table import KeywordTable
+
+COMPANIES = [("self", "自社", "🏠"), ("rival", "競合", "🏢")]
+
+
+def sample_query():
+    self_table = KeywordTable()
+    self_table.append("プログラミング 教室", 1200, category="教室")
+    self_table.append("Scratch 使い方", 300, category="教材")
+    rival = KeywordTable()
+    rival.append("ロボット 教室", 800, rank=4, category="オーガニック")
+    return KeywordQuery({"self": self_table, "rival": rival}, COMPANIES)
+
+
+class KeywordQueryTest(unittest.TestCase):
+    def setUp(self):
+        self.query = sample_query()
+
+    def run_query(self, **params):
+        args = self.query.parse({name: [str(value)] for name, value in params.items()})
+        return json.loads(self.query.query(*args))
+
+    def test_filters_and_sorts_across_companies(self):
+        result = self.run_query(q="教室")
+        self.assertEqual(result["total"], 2)
+        self.assertEqual([row["keyword"] for row in result["rows"]], ["プログラミング 教室", "ロボット 教室"])
+        result = self.run_query(company="self", sort="keyword")
+        self.assertEqual([row["keyword"] for row in result["rows"]], ["Scratch 使い方", "プログラミング 教室"])
+        self.assertEqual(self.run_query(q="scratch")["total"], 1)
+        self.assertEqual(self.run_query(min_volume=500, max_volume=1000)["rows"][0]["company"], "rival")
+
+    def test_paging_is_clamped(self):
+        result = self.run_query(offset=-5, limit=0)
+        self.assertEqual((result["offset"], result["limit"]), (0, 1))
+        self.assertEqual(len(result["rows"]), 1)
+
+    def test_bad_parameters(self):
+        for params in ({"company": "nobody"}, {"sort": "password"}, {"order": "up"}, {"limit": "ten"}):
+            with self.subTest(params=params), self.assertRaises(QueryError):
+                self.query.parse({name: [value] for name, value in params.items()})
+
+    def test_repeated_queries_hit_the_cache(self):
+        self.run_query(q="教室")
+        self.run_query(q="教室")
+        self.assertEqual(self.query.stats()["hits"], 1)
+
+
+class KeywordServerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        (root / "secret.txt").write_text("do not serve", encoding='utf-8')
+        public = root / "public"
+        public.mkdir()
+        (public / "keyword_index.js").write_text("window.KEYWORD_INDEX = {};", encoding='utf-8')
+        self.server = KeywordServer(sample_query(), "<html>dashboard</html>",
+                                    static_dir=public, static_files=["keyword_index.js"])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def exchange(self, raw):
+        """生のリクエストを送り、接続が閉じるまでの応答を返す"""
+        async def run():
+            server = await asyncio.start_server(self.server.handle, "127.0.0.1", 0)
+            async with server:
+                host, port = server.sockets[0].getsockname()[:2]
+                reader, writer = await asyncio.open_connection(host, port)
+                writer.write(raw)
+                writer.write_eof()
+                response = await reader.read()
+                writer.close()
+                await writer.wait_closed()
+            return response
+        return asyncio.run(run())
+
+    def request(self, raw):
+        """(ステータス, 本文) を返す"""
+        head, _, body = self.exchange(raw).partition(b"\r\n\r\n")
+        return int(head.split(b" ", 2)[1]), body
+
+    def get(self, target):
+        return self.request(f"GET {target} HTTP/1.1\r\nConnection: close\r\n\r\n".encode('utf-8'))
+
+    def test_dashboard_and_api(self):
+        self.assertEqual(self.get("/"), (200, b"<html>dashboard</html>"))
+        status, body = self.get("/api/keywords?company=rival")
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)["rows"][0]["rank"], 4)
+        status, body = self.get("/api/keywords?sort=nope")
+        self.assertEqual(status, 400)
+        self.assertIn("error", json.loads(body))
+
+    def test_static_whitelist(self):
+        self.assertEqual(self.get("/keyword_index.js"), (200, b"window.KEYWORD_INDEX = {};"))
+
+    def test_parent_paths_are_not_served(self):
+        for target in ("/../secret.txt", "/%2e%2e/secret.txt", "/public/../secret.txt",
+                       "/..%2fsecret.txt", "/keyword_index.js/../../secret.txt"):
+            with self.subTest(target=target):
+                status, body = self.get(target)
+                self.assertEqual(status, 404)
+                self.assertNotIn(b"do not serve", body)
+
+    def test_malformed_requests(self):
+        self.assertEqual(self.request(b"GARBAGE\r\n\r\n")[0], 400)
+        self.assertEqual(self.request(b"GET /\xff\xfe HTTP/1.1\r\n\r\n")[0], 400)
+        self.assertEqual(self.request(b"POST /api/keywords HTTP/1.1\r\nConnection: close\r\n\r\n")[0], 405)
+
+    def test_incomplete_request_gets_no_response(self):
+        self.assertEqual(self.exchange(b"GET / HTTP/1.1\r\n"), b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
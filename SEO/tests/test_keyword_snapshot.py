@@ -0,0 +1,73 @@
+"""keyword_snapshot の書き出し・読み込み"""
+
+import os
+import tempfile
+import unittest
+
+from keyword_snapshot import Snapshot, SnapshotError, load_snapshot, save_snapshot
+from keyword_table import MISSING, KeywordTable
+
+
+def sample_data():
+    self_table = KeywordTable()
+    self_table.set_months(["202410", "202411"])
+    self_table.append("プログラミング 教室", 1200, difficulty=35, cpc=150, competition=80,
+                      category="教室", icon="🏫", source="a.csv", series=[1000, 1400])
+    self_table.append("scratch", 300, difficulty=MISSING, category="教材", icon="📚", source="a.csv")
+    competitor = KeywordTable()
+    competitor.append("プログラミング 教室", 1300, rank=3, traffic=220,
+                      category="オーガニック", source="b.csv", url="https://example.com/a")
+    competitor.append("ロボット", 90, rank=0, category="オーガニック", source="b.csv")
+    return {"self": self_table, "rival": competitor, "empty": KeywordTable()}
+
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "keywords.snapshot")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        data = sample_data()
+        save_snapshot(data, self.path)
+        loaded = load_snapshot(self.path)
+        self.assertEqual(list(loaded), list(data))
+        for key, table in data.items():
+            restored = loaded[key]
+            self.assertEqual(len(restored), len(table))
+            self.assertEqual([restored.row(i) for i in range(len(restored))],
+                             [table.row(i) for i in range(len(table))])
+        self.assertEqual(loaded["self"].months, ["202410", "202411"])
+        self.assertEqual(list(loaded["self"].series(1)), [MISSING, MISSING])
+
+    def test_columns_are_shared_strings(self):
+        save_snapshot(sample_data(), self.path)
+        with Snapshot(self.path) as snapshot:
+            self.assertEqual(snapshot.rows("rival"), 2)
+            self.assertEqual(list(snapshot.column("rival", "rank")), [3, 0])
+            # column() は mmap 上のビューなので、閉じる前に手放す
+            with snapshot.column("self", "keywords") as mine, snapshot.column("rival", "keywords") as theirs:
+                self.assertEqual(mine[0], theirs[0])
+                self.assertEqual(snapshot.string(mine[0]), "プログラミング 教室")
+
+    def test_rejects_other_files(self):
+        with open(self.path, 'wb') as f:
+            f.write(b"not a snapshot at all, just some bytes")
+        with self.assertRaises(SnapshotError):
+            load_snapshot(self.path)
+
+    def test_large_values(self):
+        # int32 に収まらない値も int64 の列でそのまま往復する
+        table = KeywordTable()
+        table.set_months(["202411"])
+        table.append("huge", 1 << 40, traffic=(1 << 31) + 5, series=[-(1 << 35)])
+        save_snapshot({"self": table}, self.path)
+        restored = load_snapshot(self.path)["self"]
+        self.assertEqual(restored.row(0), table.row(0))
+        self.assertEqual(list(restored.series(0)), [-(1 << 35)])
+
+
+if __name__ == "__main__":
+    unittest.main()
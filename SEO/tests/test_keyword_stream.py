@@ -0,0 +1,134 @@
+"""keyword_stream の要約（Space-Saving・Count-Min・分位点）"""
+
+import random
+import unittest
+from collections import Counter
+
+from keyword_stream import CountMinSketch, QuantileSketch, SpaceSaving, StreamingSum
+
+
+def small_stream():
+    """上位3語がはっきりした小さいストリーム（順番は混ぜる）"""
+    items = ["a"] * 50 + ["b"] * 30 + ["c"] * 20 + [f"rare{i}" for i in range(40)]
+    random.Random(7).shuffle(items)
+    return items
+
+
+class StreamingSumTest(unittest.TestCase):
+    def test_add_and_merge(self):
+        left, right = StreamingSum(), StreamingSum()
+        for value in (3, 1, 4):
+            left.add(value)
+        for value in (1, 5, 9):
+            right.add(value)
+        left.merge(right)
+        self.assertEqual((left.count, left.total, left.minimum, left.maximum), (6, 23, 1, 9))
+        self.assertAlmostEqual(left.mean(), 23 / 6)
+
+    def test_merge_empty(self):
+        total = StreamingSum()
+        total.merge(StreamingSum())
+        self.assertEqual((total.count, total.minimum, total.maximum), (0, None, None))
+        self.assertEqual(total.mean(), 0.0)
+
+
+class SpaceSavingTest(unittest.TestCase):
+    def test_exact_when_k_covers_all_keys(self):
+        summary = SpaceSaving(k=100)
+        items = small_stream()
+        for key in items:
+            summary.add(key)
+        expected = Counter(items)
+        for key, lower, error in summary.top():
+            self.assertEqual(error, 0)
+            self.assertEqual(lower, expected[key])
+        self.assertEqual([key for key, _, _ in summary.top(3)], ["a", "b", "c"])
+
+    def test_top_k_with_evictions(self):
+        summary = SpaceSaving(k=10)
+        items = small_stream()
+        for key in items:
+            summary.add(key)
+        self.assertLessEqual(len(summary), 10)
+        expected = Counter(items)
+        top = summary.top(3)
+        self.assertEqual([key for key, _, _ in top], ["a", "b", "c"])
+        # 真の値は 下限〜下限+誤差 に入る
+        for key, lower, error in summary.top():
+            self.assertLessEqual(lower, expected[key])
+            self.assertLessEqual(expected[key], lower + error)
+
+    def test_weighted_merge(self):
+        left, right = SpaceSaving(k=5), SpaceSaving(k=5)
+        left.add("x", 10)
+        left.add("y", 3)
+        right.add("x", 5)
+        right.add("z", 7)
+        left.merge(right)
+        self.assertEqual(left.top(), [("x", 15, 0), ("z", 7, 0), ("y", 3, 0)])
+
+
+class CountMinSketchTest(unittest.TestCase):
+    def test_never_underestimates(self):
+        sketch = CountMinSketch(width=16, depth=3)
+        counts = Counter()
+        for i, key in enumerate(small_stream()):
+            weight = i % 5 + 1
+            sketch.add(key, weight)
+            counts[key] += weight
+        self.assertEqual(sketch.total, sum(counts.values()))
+        for key, count in counts.items():
+            self.assertGreaterEqual(sketch.estimate(key), count)
+
+    def test_exact_without_collisions(self):
+        sketch = CountMinSketch(width=1 << 12, depth=4)
+        for key, weight in (("a", 3), ("b", 5), ("a", 4)):
+            sketch.add(key, weight)
+        self.assertEqual(sketch.estimate("a"), 7)
+        self.assertEqual(sketch.estimate("b"), 5)
+        self.assertEqual(sketch.estimate("missing"), 0)
+
+    def test_merge_adds_counts(self):
+        left, right = CountMinSketch(width=64, depth=2), CountMinSketch(width=64, depth=2)
+        left.add("a", 2)
+        right.add("a", 3)
+        right.add("b", 1)
+        left.merge(right)
+        self.assertEqual(left.total, 6)
+        self.assertGreaterEqual(left.estimate("a"), 5)
+        with self.assertRaises(ValueError):
+            left.merge(CountMinSketch(width=32, depth=2))
+
+
+class QuantileSketchTest(unittest.TestCase):
+    def test_relative_error(self):
+        rng = random.Random(3)
+        values = sorted(rng.randint(1, 100000) for _ in range(2000))
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+        for q in (0.1, 0.5, 0.9, 0.99):
+            exact = values[int(q * (len(values) - 1))]
+            self.assertLessEqual(abs(sketch.quantile(q) - exact), 0.01 * exact + 1e-9, q)
+
+    def test_zero_and_empty(self):
+        sketch = QuantileSketch()
+        self.assertIsNone(sketch.quantile(0.5))
+        for value in (0, 0, 0, 10):
+            sketch.add(value)
+        self.assertEqual(sketch.quantile(0.5), 0)
+        self.assertAlmostEqual(sketch.quantile(1.0), 10, delta=0.1)
+
+    def test_merge_matches_single_sketch(self):
+        whole, left, right = QuantileSketch(), QuantileSketch(), QuantileSketch()
+        for value in range(1, 1001):
+            whole.add(value)
+            (left if value % 2 else right).add(value)
+        left.merge(right)
+        self.assertEqual(left.quantile(0.9), whole.quantile(0.9))
+        with self.assertRaises(ValueError):
+            left.merge(QuantileSketch(relative_accuracy=0.05))
+
+
+if __name__ == "__main__":
+    unittest.main()
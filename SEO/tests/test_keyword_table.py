@@ -0,0 +1,78 @@
+"""keyword_table の列指向テーブル"""
+
+import unittest
+
+from keyword_table import MISSING, KeywordTable
+
+
+def sample_table():
+    table = KeywordTable()
+    table.set_months(["202410", "202411"])
+    table.append("プログラミング 教室", 1200, difficulty=35, cpc=150, competition=80,
+                 category="教室", icon="🏫", source="a.csv", series=[1000, 1400],
+                 rank=3, traffic=220, url="https://example.com/a")
+    table.append("scratch", 300, difficulty=MISSING, category="教材", icon="📚", source="b.csv")
+    table.append("ロボット", 90, category="教室", icon="🏫", source="a.csv", series=[80, 100])
+    return table
+
+
+class KeywordTableTest(unittest.TestCase):
+    def test_row_round_trip(self):
+        table = sample_table()
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.row(0), {
+            "keyword": "プログラミング 教室", "volume": 1200, "difficulty": 35, "cpc": 150,
+            "competition": 80, "rank": 3, "traffic": 220, "url": "https://example.com/a",
+            "category": "教室", "icon": "🏫", "source": "a.csv",
+            "monthly": {"202410": 1000, "202411": 1400},
+        })
+        row = table.row(1)
+        self.assertEqual((row["difficulty"], row["url"], row["rank"]), (MISSING, "", 0))
+        # 月別を渡さなかった行は全月 MISSING
+        self.assertEqual(row["monthly"], {"202410": MISSING, "202411": MISSING})
+
+    def test_codes_are_shared(self):
+        table = sample_table()
+        self.assertEqual(table.category_names, ["教室", "教材"])
+        self.assertEqual(list(table.category), [0, 1, 0])
+        self.assertEqual(table.source_names, ["a.csv", "b.csv"])
+
+    def test_totals_and_top(self):
+        table = sample_table()
+        self.assertEqual(table.total_volume(), 1590)
+        self.assertEqual(table.category_totals(), {
+            "教室": {"count": 2, "volume": 1290},
+            "教材": {"count": 1, "volume": 300},
+        })
+        self.assertEqual(table.top(2), [0, 1])
+        self.assertEqual(table.top(None, column="traffic"), [0, 1, 2])
+
+    def test_set_months_keeps_values(self):
+        table = sample_table()
+        table.set_months(["202409", "202410", "202411", "202412"])
+        self.assertEqual(list(table.series(0)), [MISSING, 1000, 1400, MISSING])
+        self.assertEqual(list(table.series(2)), [MISSING, 80, 100, MISSING])
+
+    def test_extend_aligns_months_and_codes(self):
+        table = sample_table()
+        other = KeywordTable()
+        other.set_months(["202411", "202412"])
+        other.append("マイクラ", 500, category="ゲーム", icon="🎮", source="c.csv", series=[450, 550])
+        other.append("ロボット 教室", 70, category="教室", icon="🏫", source="a.csv")
+        table.extend(other)
+        self.assertEqual(table.months, ["202410", "202411", "202412"])
+        self.assertEqual(list(table.series(0)), [1000, 1400, MISSING])
+        self.assertEqual(list(table.series(3)), [MISSING, 450, 550])
+        self.assertEqual(list(table.series(4)), [MISSING, MISSING, MISSING])
+        self.assertEqual(table.row(3)["category"], "ゲーム")
+        self.assertEqual(table.row(4)["category"], "教室")
+        self.assertEqual(table.category_names, ["教室", "教材", "ゲーム"])
+
+    def test_extend_empty(self):
+        table = KeywordTable()
+        table.extend(sample_table())
+        self.assertEqual([table.row(i) for i in range(3)], [sample_table().row(i) for i in range(3)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""月別検索数のトレンド指標と、空欄の月の扱い"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+import generate_unified_html as g
+from fixtures import KEYWORD_HEADER, write_csv
+from keyword_table import MISSING, KeywordTable
+from keyword_trends import MIN_SPIKE_VOLUME, compute_trends, slope_weights, spikes, top_risers
+
+MONTHS = ["202501", "202502", "202503", "202504"]
+
+
+def make_table(rows):
+    """rows は (キーワード, カテゴリ, 月別検索数) のリスト"""
+    table = KeywordTable()
+    table.set_months(MONTHS)
+    for keyword, category, series in rows:
+        table.append(keyword, max(series), category=category, series=series)
+    return table
+
+
+class TrendTest(unittest.TestCase):
+    def test_slope_matches_least_squares(self):
+        weights, divisor = slope_weights(4)
+        self.assertEqual(weights, [-3, -1, 1, 3])
+        table = make_table([
+            ("直線", "A", [100, 200, 300, 400]),
+            ("横ばい", "A", [500, 500, 500, 500]),
+            ("下降", "A", [400, 300, 200, 100]),
+        ])
+        metrics = compute_trends(table)
+        self.assertEqual(list(metrics.slope), [100.0, 0.0, -100.0])
+        self.assertEqual(list(metrics.mean), [250.0, 500.0, 250.0])
+        self.assertAlmostEqual(metrics.growth[0], 400 / 250 - 1)
+        self.assertEqual(metrics.growth[1], 0.0)
+        self.assertEqual(top_risers(metrics), [0])
+
+    def test_growth_needs_minimum_volume(self):
+        table = make_table([("少ない", "A", [10, 20, 30, 40])])
+        metrics = compute_trends(table)
+        self.assertEqual(metrics.growth[0], 0.0)
+        self.assertGreater(metrics.slope[0], 0)
+
+    def test_spike(self):
+        peak = MIN_SPIKE_VOLUME * 2
+        table = make_table([
+            ("スパイク", "A", [300, peak, 300, 300]),
+            ("小さい山", "A", [10, 100, 10, 10]),
+            ("中央値0", "A", [0, 0, 0, peak]),
+        ])
+        metrics = compute_trends(table)
+        self.assertEqual(metrics.spike_month[0], 1)
+        self.assertAlmostEqual(metrics.spike_ratio[0], peak / 300)
+        # 中央値比は大きくても検索数が足りなければスパイクにしない
+        self.assertEqual(metrics.spike_month[1], -1)
+        self.assertEqual(metrics.spike_ratio[2], 0.0)
+        self.assertEqual(metrics.spike_month[2], -1)
+        self.assertEqual(spikes(metrics), [0])
+
+    def test_missing_months_are_not_zero(self):
+        table = make_table([
+            ("揃っている", "A", [100, 100, 200, 200]),
+            ("欠けあり", "A", [MISSING, 100, 5000, 9000]),
+        ])
+        metrics = compute_trends(table)
+        self.assertEqual(list(metrics.valid), [1, 0])
+        self.assertEqual((metrics.slope[1], metrics.mean[1], metrics.growth[1]), (0.0, 0.0, 0.0))
+        self.assertEqual(metrics.spike_month[1], -1)
+        # 季節性指数も欠けのある行を含めない
+        self.assertEqual(metrics.seasonality, {table.category_code("A"): [2 / 3, 2 / 3, 4 / 3, 4 / 3]})
+
+    def test_seasonality_by_category(self):
+        table = make_table([
+            ("夏1", "夏", [100, 300, 300, 100]),
+            ("夏2", "夏", [100, 300, 300, 100]),
+            ("冬", "冬", [400, 0, 0, 400]),
+        ])
+        metrics = compute_trends(table)
+        self.assertEqual(metrics.seasonality[table.category_code("夏")], [0.5, 1.5, 1.5, 0.5])
+        self.assertEqual(metrics.seasonality[table.category_code("冬")], [2.0, 0.0, 0.0, 2.0])
+
+    def test_single_month_has_no_trend(self):
+        table = KeywordTable()
+        table.set_months(["202501"])
+        table.append("1か月", 100, series=[100])
+        metrics = compute_trends(table)
+        self.assertEqual(list(metrics.valid), [0])
+        self.assertEqual(metrics.seasonality, {})
+
+
+class MissingMonthParseTest(unittest.TestCase):
+    def test_blank_months_parse_as_missing(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_csv(Path(tmp) / "a.csv", KEYWORD_HEADER, [
+                ["両月あり", 100, 10, "0", 0, 0, 100],
+                ["11月だけ", 100, 10, "0", 0, "", 100],
+            ])
+            table = g.parse_keyword_file(path)
+        self.assertEqual(table.months, ["202410", "202411"])
+        # 0件の月は0のまま、空欄の月だけ MISSING にする
+        self.assertEqual(list(table.series(0)), [0, 100])
+        self.assertEqual(list(table.series(1)), [MISSING, 100])
+        self.assertEqual(list(compute_trends(table).valid), [1, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
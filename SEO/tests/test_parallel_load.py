@@ -0,0 +1,81 @@
+"""--jobs の並列パースが逐次と同じ結果になること"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import generate_unified_html as g
+from fixtures import KEYWORD_HEADER, make_base_dir, table_rows, write_csv
+
+
+class ParallelLoadTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = make_base_dir(self.tmp.name)
+        patcher = mock.patch.object(g, "BASE_DIR", Path(self.root))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def load(self, jobs):
+        all_data, errors = g.load_all_keywords(jobs=jobs)
+        return {key: table_rows(table) for key, table in all_data.items()}, errors
+
+    def test_same_tables_as_serial(self):
+        serial, serial_errors = self.load(1)
+        parallel, parallel_errors = self.load(3)
+        self.assertEqual(parallel, serial)
+        self.assertEqual(parallel_errors, serial_errors)
+        # 結合順は keyword_sources() の順（カテゴリの登録順）
+        self.assertEqual([row["category"] for row in serial["できたよ"]],
+                         ["小学生"] * 3 + ["プログラミング"] * 2)
+        self.assertEqual(len(serial["コエテコ"]), 2)
+        self.assertEqual((serial["できたよ"][0]["volume"], serial["できたよ"][0]["cpc"]), (1200, 150))
+        self.assertEqual(serial["できたよ"][1]["difficulty"], g.MISSING)
+        # ファイルの無い競合はエラーとして数え、空のテーブルにする
+        self.assertEqual(serial["QUREO"], [])
+        self.assertIn("QUREO", serial_errors)
+
+    def test_broken_file_is_dropped_in_both_modes(self):
+        path = write_csv(self.root / "キーワード調査" / "小学生.csv", KEYWORD_HEADER, [
+            ["小学生 プログラミング", 1200, 35, "1.50", 80, 1000, 1400],
+        ] * 50)
+        # 途中から UTF-16 として読めないバイト列にする
+        with open(path, 'ab') as f:
+            f.write(b"\x00\xd8\x41\x00" * 4)
+        serial, serial_errors = self.load(1)
+        parallel, parallel_errors = self.load(2)
+        self.assertEqual(parallel, serial)
+        self.assertEqual(parallel_errors, serial_errors)
+        self.assertEqual([row["category"] for row in serial["できたよ"]], ["プログラミング"] * 2)
+        self.assertEqual(len(serial_errors["できたよ"]), 1)
+
+    def test_stream_drops_broken_file_in_both_modes(self):
+        path = write_csv(self.root / "キーワード調査" / "小学生.csv", KEYWORD_HEADER, [
+            ["小学生 ドリル", 300, 10, "0", 20, "", ""],
+        ] * 1000)
+        # 読み込みのバッファより後ろで壊れるので、逐次では途中までの行が先に集計される
+        with open(path, 'ab') as f:
+            f.write(b"\x00\xd8\x41\x00" * 4)
+
+        def stream(jobs):
+            aggregator, errors, sources = g.stream_all_keywords(jobs=jobs)
+            totals = {key: stream.totals() for key, stream in aggregator.companies.items()}
+            return (aggregator.rows, {key: (t.count, t.total) for key, t in totals.items()},
+                    aggregator.mention_count("小学生 ドリル"), errors, sources)
+
+        serial, parallel = stream(1), stream(2)
+        self.assertEqual(parallel, serial)
+        rows, totals, drills, errors, _ = serial
+        # 読めなかった 小学生.csv の行は途中までの分も数えない
+        self.assertEqual(totals["できたよ"], (2, 3200))
+        self.assertEqual(drills, 0)
+        self.assertEqual(rows, 6)
+        self.assertEqual(len(errors["できたよ"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
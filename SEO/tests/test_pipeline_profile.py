@@ -0,0 +1,93 @@
+"""--profile の区間計測（Profiler / NULL_PROFILER）"""
+
+import json
+import tempfile
+import time
+import tracemalloc
+import unittest
+from pathlib import Path
+
+from pipeline_profile import NULL_PROFILER, Profiler
+
+
+class ProfilerTest(unittest.TestCase):
+    def test_nested_spans_in_start_order(self):
+        profiler = Profiler()
+        with profiler.span("読み込み", rows=1000):
+            with profiler.span("load: a") as span:
+                span.rows = 10
+            with profiler.span("load: b"):
+                pass
+        with profiler.span("書き出し"):
+            pass
+        records = profiler.records
+        self.assertEqual([(r["name"], r["depth"]) for r in records],
+                         [("読み込み", 0), ("load: a", 1), ("load: b", 1), ("書き出し", 0)])
+        self.assertEqual(records[0]["rows"], 1000)
+        # 区間の中で後から入れた行数も記録する
+        self.assertEqual(records[1]["rows"], 10)
+        self.assertNotIn("rows", records[2])
+        self.assertNotIn("traced_peak_mb", records[0])
+
+    def test_times_and_rate(self):
+        profiler = Profiler()
+        with profiler.span("sleep", rows=100):
+            time.sleep(0.02)
+        record = profiler.records[0]
+        self.assertGreaterEqual(record["wall_seconds"], 0.02)
+        # sleep 中は CPU を使わない
+        self.assertLess(record["cpu_seconds"], record["wall_seconds"])
+        self.assertAlmostEqual(record["rows_per_sec"], 100 / record["wall_seconds"], delta=1)
+
+    def test_span_closes_on_exception(self):
+        profiler = Profiler()
+        with self.assertRaises(RuntimeError):
+            with profiler.span("失敗"):
+                raise RuntimeError
+        with profiler.span("次"):
+            pass
+        self.assertEqual([r["depth"] for r in profiler.records], [0, 0])
+        self.assertIn("wall_seconds", profiler.records[0])
+
+    def test_memory_peak_propagates_to_parent(self):
+        if not tracemalloc.is_tracing():
+            self.addCleanup(tracemalloc.stop)
+        profiler = Profiler(trace_memory=True)
+        with profiler.span("親"):
+            with profiler.span("子"):
+                block = bytearray(8 * 1024 * 1024)
+                del block
+        parent, child = profiler.records
+        self.assertGreaterEqual(child["traced_peak_mb"], 8)
+        self.assertGreaterEqual(parent["traced_peak_mb"], child["traced_peak_mb"])
+
+    def test_report_and_save(self):
+        profiler = Profiler()
+        with profiler.span("読み込み", rows=5):
+            with profiler.span("load: できたよ"):
+                pass
+        lines = profiler.report().splitlines()
+        self.assertTrue(lines[0].startswith("区間"))
+        self.assertTrue(lines[2].startswith("  load: できたよ"))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "profile.json"
+            profiler.save(path)
+            summary = json.loads(path.read_text(encoding='utf-8'))
+        self.assertEqual([s["name"] for s in summary["spans"]], ["読み込み", "load: できたよ"])
+        self.assertFalse(summary["trace_memory"])
+        self.assertGreaterEqual(summary["total_wall_seconds"], 0)
+
+
+class NullProfilerTest(unittest.TestCase):
+    def test_null_profiler_records_nothing(self):
+        self.assertFalse(NULL_PROFILER.enabled)
+        first = NULL_PROFILER.span("a", rows=1)
+        with first as span:
+            span.rows = 3
+        # 無効時は毎回同じ何もしないオブジェクトを返す
+        self.assertIs(NULL_PROFILER.span("b"), first)
+        self.assertFalse(hasattr(NULL_PROFILER, "records"))
+
+
+if __name__ == "__main__":
+    unittest.main()
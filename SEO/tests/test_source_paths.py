@@ -0,0 +1,109 @@
+"""PathResolver の NFC/NFD 吸収と --discover による自動検出"""
+
+import tempfile
+import unicodedata
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import generate_unified_html as g
+from fixtures import COMPETITOR_HEADER, make_base_dir, write_csv
+from source_paths import PathResolver, discover_categories, discover_competitors
+
+
+def nfd(text):
+    return unicodedata.normalize('NFD', text)
+
+
+class PathResolverTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = Path(self.tmp.name)
+        # Mac から同期したような NFD のフォルダ名・ファイル名
+        self.real = write_csv(self.root / nfd("コエテコ") / nfd("キーワード.csv"), COMPETITOR_HEADER, [])
+        # キャッシュを root の中に作ると root の mtime が変わるので外に置く
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        self.cache_file = Path(self.cache_dir.name) / "paths.json"
+
+    def test_nfc_path_resolves_to_nfd_file(self):
+        self.assertFalse((self.root / "コエテコ" / "キーワード.csv").exists())
+        resolver = PathResolver(self.root)
+        resolved = resolver.resolve("コエテコ/キーワード.csv")
+        self.assertEqual(resolved, self.real)
+        self.assertTrue(resolved.exists())
+        # 見つからない部分は書いたとおりのまま
+        self.assertEqual(resolver.resolve("コエテコ/無い.csv"), self.real.parent / "無い.csv")
+        self.assertEqual(resolver.resolve("無い/キーワード.csv"), self.root / "無い" / "キーワード.csv")
+
+    def test_each_directory_is_scanned_once(self):
+        resolver = PathResolver(self.root)
+        for _ in range(3):
+            resolver.resolve("コエテコ/キーワード.csv")
+        self.assertEqual(resolver.scans, 2)
+        self.assertEqual(resolver.listdir("コエテコ"), [("キーワード.csv", self.real)])
+
+    def test_saved_listing_is_reused_until_directory_changes(self):
+        resolver = PathResolver(self.root, self.cache_file)
+        resolver.resolve("コエテコ/キーワード.csv")
+        resolver.save()
+
+        reused = PathResolver(self.root, self.cache_file)
+        self.assertEqual(reused.resolve("コエテコ/キーワード.csv"), self.real)
+        self.assertEqual(reused.scans, 0)
+
+        # ファイルが増えるとディレクトリの mtime が変わるので読み直す
+        added = write_csv(self.real.parent / nfd("ページ.csv"), COMPETITOR_HEADER, [])
+        rescanned = PathResolver(self.root, self.cache_file)
+        self.assertEqual(rescanned.resolve("コエテコ/ページ.csv"), added)
+        self.assertEqual(rescanned.scans, 1)
+
+    def test_discover(self):
+        write_csv(self.root / "キーワード調査" / nfd("ゲーム.csv"), COMPETITOR_HEADER, [])
+        write_csv(self.root / "メモ" / "readme.csv", COMPETITOR_HEADER, [])
+        write_csv(self.root / ".cache" / "x_キーワード.csv", COMPETITOR_HEADER, [])
+        write_csv(self.root / "レポート" / "x_キーワード.csv", COMPETITOR_HEADER, [])
+        resolver = PathResolver(self.root)
+        self.assertEqual(discover_categories(resolver, "キーワード調査"), [("ゲーム", "キーワード調査/ゲーム.csv")])
+        found = discover_competitors(resolver, exclude={"キーワード調査", nfd("レポート")})
+        self.assertEqual(found, [{
+            "dir": "コエテコ", "keywords_csv": "コエテコ/キーワード.csv", "pages_csv": None, "domains_csv": None,
+        }])
+
+
+class DiscoverSourcesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = make_base_dir(self.tmp.name)
+        for patcher in (
+            mock.patch.object(g, "BASE_DIR", Path(self.root)),
+            mock.patch.object(g, "COMPANIES", dict(g.COMPANIES)),
+            mock.patch.object(g, "KEYWORD_CATEGORIES", list(g.KEYWORD_CATEGORIES)),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_discovered_names_are_escaped(self):
+        name = "<新規&'s>"
+        write_csv(self.root / name / "新規_キーワード.csv", COMPETITOR_HEADER, [
+            ["新規 キーワード", 100, 10, 0, 0, ""],
+        ])
+        # 書き出したレポートのフォルダは競合として拾わない
+        write_csv(self.root / g.REPORT_DIR_NAME / "コエテコ_キーワード.csv", COMPETITOR_HEADER, [])
+        new_companies, _ = g.discover_sources()
+        self.assertEqual(new_companies, [name])
+        self.assertEqual(g.company_page_id(name), "discovered-1")
+
+        all_data, _ = g.load_all_keywords()
+        self.assertEqual(len(all_data[name]), 1)
+        dashboard = g.generate_html(all_data)
+        self.assertNotIn(name, dashboard)
+        self.assertIn("&lt;新規&amp;&#x27;s&gt;", dashboard)
+        self.assertIn("showPage('discovered-1')", dashboard)
+        self.assertIn('id="page-discovered-1"', dashboard)
+
+
+if __name__ == "__main__":
+    unittest.main()
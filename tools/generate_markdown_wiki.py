@@ -0,0 +1,609 @@
+#!/usr/bin/env python3
+"""
+リポジトリのMarkdown（_claude の資料・自己理解プログラムのワークシート・日報）を
+検索できる静的Wikiに変換する
+
+    python3 tools/generate_markdown_wiki.py [--full] [--jobs N] [--output DIR]
+
+- 前回の書き出しから変わったMarkdown（mtime・サイズで判定）だけを変換し直す。
+  結果は出力先の .cache/manifest.json に記録する。
+- 変換はプロセスプールで並列に行う（--jobs）。
+- サイドバーの目次（nav.js）と全文検索インデックス（search-index.js）は、ページが
+  変わったときに manifest から作り直す。各ページはこれを読むだけなので、
+  ページの追加・改名があっても変換していないページを書き直す必要はない。
+- 検索インデックスは見出し単位の文字bigramの転置インデックスと正規化した本文で、
+  ブラウザはポスティングの共通部分で候補を絞ってから、本文にクエリそのものを含むか確かめる。
+
+_claude/wiki.html（手作り）は読むだけで上書きしない。
+"""
+
+import argparse
+import html
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# 正規化・プロファイラ・パス解決は SEO/ のキーワード分析と共有する
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "SEO"))
+
+from keyword_search import bigrams, normalize_keyword  # noqa: E402
+from markdown_render import render_markdown, snippet  # noqa: E402
+from pipeline_profile import NULL_PROFILER, Profiler  # noqa: E402
+from source_paths import PathResolver, nfc  # noqa: E402
+
+# パス設定（Markdownはリポジトリ直下のフォルダにある）
+REPO_DIR = Path("/workspaces/dekitayo")
+OUTPUT_DIR_NAME = "wiki"
+CACHE_DIR_NAME = ".cache"
+MANIFEST_NAME = "manifest.json"
+NAV_SCRIPT_NAME = "nav.js"
+SEARCH_INDEX_NAME = "search-index.js"
+STYLE_NAME = "wiki.css"
+SCRIPT_NAME = "wiki.js"
+WRITE_BUFFER_SIZE = 1 << 20
+
+# 変換・テンプレートを変えたら上げる（manifest の値と違えば全ページを作り直す）
+WIKI_VERSION = 2
+WIKI_INDEX_VARIABLE = "WIKI_INDEX"
+WIKI_NAV_VARIABLE = "WIKI_NAV"
+
+# Wikiのセクション（dir 直下の *.md と files を並べる。reverse は新しい順に並べる日報用）
+WIKI_SECTIONS = [
+    {
+        "key": "claude",
+        "name": "プロジェクト資料",
+        "icon": "📘",
+        "dir": "_claude",
+        "files": [],
+        "reverse": False,
+    },
+    {
+        "key": "zikorikai",
+        "name": "自己理解プログラム",
+        "icon": "🧭",
+        "dir": "zikorikai/markdown",
+        "files": ["zikorikai/自己理解プログラム_まとめ.md"],
+        "reverse": False,
+    },
+    {
+        "key": "nippo",
+        "name": "日報",
+        "icon": "📝",
+        "dir": "日報",
+        "files": [],
+        "reverse": True,
+    },
+]
+
+
+def wiki_sources(resolver):
+    """変換するMarkdownを並び順で返す
+
+    各要素は {"source"（REPO_DIR からの相対、NFC）, "path"（実パス）, "section", "output"（出力先からの相対）}。
+    """
+    sources = []
+    for section in WIKI_SECTIONS:
+        found = [
+            (name, path, f"{section['dir']}/{name}")
+            for name, path in resolver.listdir(section["dir"])
+            if name.lower().endswith(".md") and path.is_file()
+        ]
+        if section["reverse"]:
+            found.reverse()
+        for relative in section["files"]:
+            path = resolver.resolve(relative)
+            if path.is_file():
+                found.append((nfc(Path(relative).name), path, nfc(relative)))
+        for name, path, relative in found:
+            sources.append({
+                "source": relative,
+                "path": path,
+                "section": section["key"],
+                "output": f"{section['key']}/{name[:-3]}.html",
+            })
+    return sources
+
+
+def rewrite_link(url):
+    """ページ内の相対リンク *.md を変換後の *.html に向ける"""
+    if "://" in url or url.startswith(("#", "mailto:")):
+        return url
+    path, sep, fragment = url.partition("#")
+    if path.lower().endswith(".md"):
+        path = path[:-3] + ".html"
+    return path + sep + fragment
+
+
+def build_page(path, output_path, page):
+    """Markdown1ファイルを変換してページを書き出す（プロセスプールからも呼ばれる）
+
+    page は {"source", "output", "section_name", "section_icon", "mtime"}。
+    戻り値は manifest に残す {"title", "headings", "docs"}。
+    docs は見出しごとの [アンカー, 見出し, 抜粋, 正規化した見出し＋本文]。
+    """
+    with open(path, encoding='utf-8') as f:
+        doc = render_markdown(f.read(), link_rewriter=rewrite_link)
+    title = doc.title or Path(page["output"]).stem
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as out:
+        write_page(out, doc, title, page)
+
+    docs = []
+    for anchor, label, text in doc.sections:
+        docs.append([anchor, label or title, snippet(text), normalize_keyword(f"{label} {text}")])
+    return {
+        "title": title,
+        "headings": [[level, anchor, label] for level, anchor, label in doc.headings],
+        "docs": docs,
+    }
+
+
+def _head(out, title, prefix):
+    out.write(f'''<!DOCTYPE html>
+<html lang="ja">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{html.escape(title)} - ドキュメントWiki</title>
+    <link rel="stylesheet" href="{prefix}{STYLE_NAME}">
+</head>
+''')
+
+
+def _sidebar(out, prefix):
+    out.write(f'''<div class="container">
+    <aside class="sidebar">
+        <div class="sidebar-header">
+            <h1><a href="{prefix}index.html">📚 ドキュメントWiki</a></h1>
+            <input type="search" class="search-box" placeholder="全文検索..." oninput="searchWiki(this.value)">
+        </div>
+        <div id="search-results" class="search-results"></div>
+        <nav id="wiki-nav"></nav>
+    </aside>
+''')
+
+
+def _scripts(out, prefix):
+    out.write(f'''<script src="{prefix}{NAV_SCRIPT_NAME}"></script>
+<script src="{prefix}{SCRIPT_NAME}"></script>
+</body>
+</html>
+''')
+
+
+def write_page(out, doc, title, page):
+    """1ページ分のHTMLを書き出す（サイドバーと検索は nav.js / wiki.js が描く）"""
+    prefix = "../" * page["output"].count("/")
+    _head(out, title, prefix)
+    out.write(f'''<body data-page="{html.escape(page["output"])}" data-root="{prefix}">
+''')
+    _sidebar(out, prefix)
+    toc = "".join(
+        f'<a class="toc-{level}" href="#{anchor}">{html.escape(label)}</a>'
+        for level, anchor, label in doc.headings if level > 1
+    )
+    out.write(f'''    <main class="main">
+        <div class="breadcrumb">{page["section_icon"]} {html.escape(page["section_name"])}</div>
+        <div class="page">
+            <article class="content">
+{doc.html}
+            </article>
+''')
+    if toc:
+        out.write(f'''            <aside class="toc"><div class="toc-title">目次</div>{toc}</aside>
+''')
+    out.write(f'''        </div>
+        <footer>元ファイル: {html.escape(page["source"])}（更新 {page["mtime"]}）</footer>
+    </main>
+</div>
+''')
+    _scripts(out, prefix)
+
+
+def load_manifest(path):
+    """前回の manifest（形式が違えば空）"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != WIKI_VERSION:
+        return {}
+    return manifest.get("pages", {})
+
+
+def save_manifest(path, pages):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"version": WIKI_VERSION, "pages": pages}, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def write_if_changed(path, text):
+    """内容が同じなら書かない（mtime を変えない）"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            if f.read() == text:
+                return False
+    except OSError:
+        pass
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return True
+
+
+def write_script_variable(path, variable, payload):
+    """window.{variable} = {...}; のサイドカー（file:// でも読める）"""
+    text = json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+    return write_if_changed(path, f"window.{variable} = {text};\n")
+
+
+def nav_payload(sources, pages):
+    """サイドバー用の {"sections": [{key, name, icon, pages: [[出力先, タイトル], ...]}]}"""
+    sections = []
+    for section in WIKI_SECTIONS:
+        entries = [
+            [source["output"], pages[source["source"]]["title"]]
+            for source in sources
+            if source["section"] == section["key"] and source["source"] in pages
+        ]
+        if entries:
+            sections.append({"key": section["key"], "name": section["name"],
+                             "icon": section["icon"], "pages": entries})
+    return {"sections": sections}
+
+
+def search_payload(sources, pages):
+    """見出し単位の全文検索インデックス
+
+    d は文書（見出し）ごとの [ページ番号, アンカー, 見出し, 抜粋]、t は文書ごとの正規化した本文、
+    pages は [出力先, タイトル]、p は {bigram: 文書番号の差分列}。
+    ブラウザはポスティングの共通部分で候補を絞り、t でクエリそのものを含むか確かめる。
+    """
+    docs = []
+    texts = []
+    page_list = []
+    postings = {}
+    for source in sources:
+        page = pages.get(source["source"])
+        if page is None:
+            continue
+        page_id = len(page_list)
+        page_list.append([source["output"], page["title"]])
+        for anchor, label, text, norm in page["docs"]:
+            doc_id = len(docs)
+            docs.append([page_id, anchor, label, text])
+            texts.append(norm)
+            for gram in sorted(bigrams(norm)):
+                postings.setdefault(gram, []).append(doc_id)
+    for gram, ids in postings.items():
+        prev = 0
+        for i, doc_id in enumerate(ids):
+            ids[i] = doc_id - prev
+            prev = doc_id
+    return {"version": WIKI_VERSION, "pages": page_list, "d": docs, "t": texts, "p": postings}
+
+
+def write_index_page(path, nav):
+    """トップページ（セクションごとのページ一覧）"""
+    with open(path, 'w', encoding='utf-8') as out:
+        _head(out, "トップ", "")
+        out.write('''<body data-page="index.html" data-root="">
+''')
+        _sidebar(out, "")
+        out.write('''    <main class="main">
+        <div class="page">
+            <article class="content">
+<h1>📚 ドキュメントWiki</h1>
+''')
+        for section in nav["sections"]:
+            items = "".join(
+                f'<li><a href="{html.escape(output)}">{html.escape(title)}</a></li>'
+                for output, title in section["pages"]
+            )
+            out.write(f'''<h2 id="{section["key"]}">{section["icon"]} {html.escape(section["name"])}（{len(section["pages"])}）</h2>
+<ul>{items}</ul>
+''')
+        out.write('''            </article>
+        </div>
+    </main>
+</div>
+''')
+        _scripts(out, "")
+
+
+def build_wiki(output_dir, jobs=1, full=False, profiler=NULL_PROFILER):
+    """Wikiを書き出して (変換したページ数, そのままのページ数, 削除したページ数) を返す"""
+    manifest_path = output_dir / CACHE_DIR_NAME / MANIFEST_NAME
+
+    with profiler.span("走査"):
+        resolver = PathResolver(REPO_DIR)
+        sources = wiki_sources(resolver)
+        previous = {} if full else load_manifest(manifest_path)
+        section_info = {section["key"]: section for section in WIKI_SECTIONS}
+        pages = {}
+        pending = []
+        for source in sources:
+            stat = source["path"].stat()
+            entry = previous.get(source["source"])
+            if (entry is not None and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size
+                    and entry["output"] == source["output"] and (output_dir / source["output"]).exists()):
+                pages[source["source"]] = entry
+                continue
+            section = section_info[source["section"]]
+            page = {
+                "source": source["source"],
+                "output": source["output"],
+                "section_name": section["name"],
+                "section_icon": section["icon"],
+                "mtime": time.strftime("%Y-%m-%d %H:%M", time.localtime(stat.st_mtime)),
+            }
+            pending.append((source, page, stat))
+
+    with profiler.span("変換", rows=len(pending)):
+        if jobs > 1 and len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(pending))) as pool:
+                futures = [
+                    (source, stat, pool.submit(build_page, source["path"], output_dir / source["output"], page))
+                    for source, page, stat in pending
+                ]
+                results = [(source, stat, future.result()) for source, stat, future in futures]
+        else:
+            results = [
+                (source, stat, build_page(source["path"], output_dir / source["output"], page))
+                for source, page, stat in pending
+            ]
+        for source, stat, result in results:
+            pages[source["source"]] = {
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "output": source["output"],
+                **result,
+            }
+
+    # 元のMarkdownが無くなったページは消す
+    removed = 0
+    current_outputs = {entry["output"] for entry in pages.values()}
+    for name, entry in previous.items():
+        if name not in pages and entry["output"] not in current_outputs:
+            try:
+                os.remove(output_dir / entry["output"])
+                removed += 1
+            except FileNotFoundError:
+                pass
+
+    # ページが1つも変わっていなければ、一覧・検索インデックスも前回のままでよい
+    shared_files = [STYLE_NAME, SCRIPT_NAME, NAV_SCRIPT_NAME, SEARCH_INDEX_NAME, "index.html"]
+    if not pending and not removed and pages.keys() == previous.keys() \
+            and all((output_dir / name).exists() for name in shared_files):
+        return 0, len(sources), 0
+
+    with profiler.span("ナビ・検索インデックス", rows=sum(len(p["docs"]) for p in pages.values())):
+        nav = nav_payload(sources, pages)
+        write_if_changed(output_dir / STYLE_NAME, WIKI_STYLE)
+        write_if_changed(output_dir / SCRIPT_NAME, WIKI_SCRIPT)
+        write_script_variable(output_dir / NAV_SCRIPT_NAME, WIKI_NAV_VARIABLE, nav)
+        write_script_variable(output_dir / SEARCH_INDEX_NAME, WIKI_INDEX_VARIABLE, search_payload(sources, pages))
+        write_index_page(output_dir / "index.html", nav)
+        save_manifest(manifest_path, pages)
+
+    return len(pending), len(sources) - len(pending), removed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="リポジトリのMarkdownを検索できる静的Wikiに変換")
+    parser.add_argument(
+        "--full", action="store_true",
+        help="変更の有無にかかわらず全ページを変換し直す",
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=0, metavar="N",
+        help="変換をN並列で行う（0でCPU数）",
+    )
+    parser.add_argument(
+        "--output", metavar="DIR",
+        help=f"出力先（既定 {REPO_DIR / OUTPUT_DIR_NAME}）",
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="段階ごとの経過時間を表示する",
+    )
+    args = parser.parse_args(argv)
+
+    output_dir = Path(args.output) if args.output else REPO_DIR / OUTPUT_DIR_NAME
+    profiler = Profiler() if args.profile else NULL_PROFILER
+    jobs = args.jobs or os.cpu_count() or 1
+
+    print("Markdownを変換中...")
+    built, skipped, removed = build_wiki(output_dir, jobs=jobs, full=args.full, profiler=profiler)
+    print(f"  変換 {built}ページ / 変更なし {skipped}ページ / 削除 {removed}ページ")
+    print(f"\n完了: {output_dir / 'index.html'}")
+
+    if profiler.enabled:
+        print("\n" + profiler.report())
+
+
+WIKI_STYLE = '''* { box-sizing: border-box; margin: 0; padding: 0; }
+body { font-family: -apple-system, BlinkMacSystemFont, "Hiragino Sans", "Noto Sans JP", sans-serif; background: #fefefe; color: #333; line-height: 1.8; }
+a { color: #1e6fb8; }
+
+.container { display: flex; min-height: 100vh; }
+
+/* サイドバー */
+.sidebar { width: 280px; background: #1e3a5f; color: white; position: fixed; height: 100vh; overflow-y: auto; }
+.sidebar-header { padding: 20px; background: #2e4a6f; }
+.sidebar-header h1 { font-size: 18px; margin-bottom: 12px; }
+.sidebar-header h1 a { color: white; text-decoration: none; }
+.search-box { width: 100%; padding: 8px 12px; border: none; border-radius: 6px; font-size: 13px; }
+.search-results { background: #fff; color: #333; }
+.search-results a { display: block; padding: 8px 16px; border-bottom: 1px solid #eee; text-decoration: none; color: #333; font-size: 12px; }
+.search-results a:hover { background: #f5f8fc; }
+.search-results .hit-title { font-weight: bold; color: #1e3a5f; }
+.search-results .hit-snippet { color: #777; }
+.search-results .hit-count { padding: 6px 16px; font-size: 11px; color: #999; }
+.nav-section { padding: 10px 0; }
+.nav-title { padding: 6px 20px; font-size: 11px; color: #ffd93d; letter-spacing: 1px; }
+.nav-item { display: block; padding: 5px 20px 5px 28px; color: #dbe4ee; text-decoration: none; font-size: 12px; border-left: 3px solid transparent; }
+.nav-item:hover { background: rgba(255,255,255,0.08); }
+.nav-item.active { background: rgba(255,255,255,0.12); border-left-color: #ff6b35; color: white; }
+
+/* 本文 */
+.main { margin-left: 280px; flex: 1; padding: 30px 40px; }
+.breadcrumb { font-size: 12px; color: #999; margin-bottom: 10px; }
+.page { display: flex; gap: 30px; align-items: flex-start; }
+.content { flex: 1; max-width: 900px; min-width: 0; }
+.content h1 { font-size: 26px; margin-bottom: 20px; padding-bottom: 10px; border-bottom: 3px solid #ff6b35; }
+.content h2 { font-size: 20px; margin: 32px 0 14px; padding-left: 10px; border-left: 5px solid #1e3a5f; }
+.content h3 { font-size: 17px; margin: 24px 0 10px; }
+.content h4, .content h5, .content h6 { font-size: 15px; margin: 18px 0 8px; }
+.content p { margin: 10px 0; }
+.content ul, .content ol { margin: 8px 0 8px 24px; }
+.content li.task { list-style: none; margin-left: -20px; }
+.content hr { border: none; border-top: 1px solid #e0e0e0; margin: 24px 0; }
+.content blockquote { border-left: 4px solid #ffd93d; background: #fffdf0; padding: 8px 16px; margin: 12px 0; color: #555; }
+.content code { background: #f5f5f5; padding: 1px 5px; border-radius: 4px; font-size: 0.9em; }
+.content pre { background: #1e2a38; color: #e8edf3; padding: 14px 18px; border-radius: 8px; overflow-x: auto; margin: 12px 0; line-height: 1.6; }
+.content pre code { background: none; padding: 0; }
+.content img { max-width: 100%; }
+.table-wrapper { overflow-x: auto; margin: 12px 0; }
+.content table { border-collapse: collapse; font-size: 13px; min-width: 50%; }
+.content th { background: #1e3a5f; color: white; padding: 8px 12px; text-align: left; }
+.content td { padding: 7px 12px; border-bottom: 1px solid #eee; }
+.content tr:nth-child(even) td { background: #fafafa; }
+.toc { width: 220px; position: sticky; top: 20px; font-size: 12px; max-height: 90vh; overflow-y: auto; }
+.toc-title { font-weight: bold; margin-bottom: 6px; color: #1e3a5f; }
+.toc a { display: block; padding: 2px 0; color: #666; text-decoration: none; }
+.toc a:hover { color: #ff6b35; }
+.toc .toc-3 { padding-left: 12px; }
+.toc .toc-4, .toc .toc-5, .toc .toc-6 { padding-left: 24px; }
+footer { margin-top: 40px; font-size: 11px; color: #aaa; }
+
+@media (max-width: 1100px) { .toc { display: none; } }
+@media (max-width: 768px) {
+    .sidebar { width: 100%; height: auto; position: relative; }
+    .main { margin-left: 0; padding: 20px; }
+    .container { flex-direction: column; }
+}
+'''
+
+WIKI_SCRIPT = r'''// ===== サイドバー（nav.js の WIKI_NAV から描く） =====
+const WIKI_ROOT = document.body.dataset.root || '';
+const WIKI_PAGE = document.body.dataset.page || '';
+const SEARCH_LIMIT = 30;
+const SEARCH_DELAY = 150;
+
+function esc(s) {
+    return String(s).replace(/[&<>"']/g, c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[c]));
+}
+
+(function renderNav() {
+    const nav = window.WIKI_NAV;
+    if (!nav) return;
+    const parts = [];
+    for (const section of nav.sections) {
+        parts.push('<div class="nav-section"><div class="nav-title">' + esc(section.icon + ' ' + section.name) + '</div>');
+        for (const [output, title] of section.pages) {
+            const active = output === WIKI_PAGE ? ' active' : '';
+            parts.push('<a class="nav-item' + active + '" href="' + esc(WIKI_ROOT + output) + '">' + esc(title) + '</a>');
+        }
+        parts.push('</div>');
+    }
+    document.getElementById('wiki-nav').innerHTML = parts.join('');
+    const active = document.querySelector('.nav-item.active');
+    if (active) active.scrollIntoView({block: 'center'});
+})();
+
+// ===== 全文検索（search-index.js を初回入力時に読み込む） =====
+// 見出しごとの文字bigramのポスティングの共通部分で候補を絞り、正規化した本文で確かめる
+let wikiIndex = null;
+let searchTimer = null;
+
+function normalizeText(text) {
+    return text.normalize('NFKC').toLowerCase()
+        .replace(/[ァ-ヶ]/g, c => String.fromCharCode(c.charCodeAt(0) - 0x60))
+        .replace(/\s+/g, '');
+}
+
+function loadWikiIndex(callback) {
+    if (wikiIndex) return callback();
+    const tag = document.createElement('script');
+    tag.src = WIKI_ROOT + 'search-index.js';
+    tag.onload = () => {
+        const raw = window.WIKI_INDEX;
+        const postings = {};
+        for (const gram in raw.p) {
+            const deltas = raw.p[gram];
+            const ids = new Int32Array(deltas.length);
+            let id = 0;
+            for (let i = 0; i < deltas.length; i++) { id += deltas[i]; ids[i] = id; }
+            postings[gram] = ids;
+        }
+        wikiIndex = { raw: raw, postings: postings, labels: raw.d.map(d => normalizeText(d[2])) };
+        callback();
+    };
+    document.head.appendChild(tag);
+}
+
+function intersect(a, b) {
+    const out = [];
+    let i = 0, j = 0;
+    while (i < a.length && j < b.length) {
+        if (a[i] === b[j]) { out.push(a[i]); i++; j++; }
+        else if (a[i] < b[j]) i++;
+        else j++;
+    }
+    return out;
+}
+
+function findDocs(norm) {
+    const texts = wikiIndex.raw.t;
+    if (norm.length < 2) {
+        // 1文字はbigramで引けないので本文を順に見る
+        return texts.map((text, id) => text.includes(norm) ? id : -1).filter(id => id >= 0);
+    }
+    const lists = [];
+    for (let i = 0; i < norm.length - 1; i++) {
+        const posting = wikiIndex.postings[norm.slice(i, i + 2)];
+        if (!posting) return [];
+        lists.push(posting);
+    }
+    lists.sort((a, b) => a.length - b.length);
+    let ids = Array.from(lists[0]);
+    for (let i = 1; i < lists.length && ids.length; i++) ids = intersect(ids, lists[i]);
+    // bigramが全部あっても並びが違うことがあるので、クエリそのものを含むものだけ残す
+    return ids.filter(id => texts[id].includes(norm));
+}
+
+function runWikiSearch(query) {
+    const box = document.getElementById('search-results');
+    const norm = normalizeText(query);
+    if (!norm) { box.innerHTML = ''; return; }
+    const raw = wikiIndex.raw;
+    const ids = findDocs(norm);
+    // 見出しに含むものを先に
+    ids.sort((a, b) => (wikiIndex.labels[b].includes(norm) - wikiIndex.labels[a].includes(norm)) || a - b);
+    const parts = ['<div class="hit-count">' + ids.length + '件</div>'];
+    for (const id of ids.slice(0, SEARCH_LIMIT)) {
+        const [pageId, anchor, label, text] = raw.d[id];
+        const [output, title] = raw.pages[pageId];
+        const href = WIKI_ROOT + output + (anchor ? '#' + encodeURIComponent(anchor) : '');
+        parts.push('<a href="' + esc(href) + '"><div class="hit-title">' + esc(title)
+            + (label !== title ? ' › ' + esc(label) : '') + '</div><div class="hit-snippet">' + esc(text) + '</div></a>');
+    }
+    box.innerHTML = parts.join('');
+}
+
+function searchWiki(query) {
+    clearTimeout(searchTimer);
+    searchTimer = setTimeout(() => loadWikiIndex(() => runWikiSearch(query)), SEARCH_DELAY);
+}
+'''
+
+
+if __name__ == "__main__":
+    main()
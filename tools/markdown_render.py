@@ -0,0 +1,340 @@
+"""
+Markdown → HTML の変換（標準ライブラリのみ）
+
+リポジトリのワークシート・資料・日報で使っている書き方だけを対象にする。
+
+- 見出し（#〜######）、段落、水平線（--- / *** / ___）
+- 箇条書き・番号付きリスト（インデントで入れ子、[ ] / [x] のチェックボックス）
+- 表（| 区切り、2行目の --- / :--: で揃え）、引用（>）、コードブロック（```）
+- 行内: `コード`、**太字**、*斜体*、~~取り消し線~~、[リンク](URL)、![画像](URL)、URLの自動リンク
+
+段落内の改行は <br> にする（日本語の文書は改行を区切りとして書いていることが多い）。
+"""
+
+import html
+import re
+import unicodedata
+
+SNIPPET_LENGTH = 120   # セクションの抜粋の長さ
+
+_FENCE = re.compile(r"^(\s*)(`{3,}|~{3,})\s*([\w+-]*)")
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_RULE = re.compile(r"^\s{0,3}([-*_])(\s*\1){2,}\s*$")
+_LIST_ITEM = re.compile(r"^(\s*)([-*+]|\d+[.)])\s+(.*)$")
+_TABLE_SEPARATOR = re.compile(r"^\s*\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$")
+_QUOTE = re.compile(r"^\s{0,3}>\s?(.*)$")
+_TASK = re.compile(r"^\[([ xX])\]\s+")
+
+_CODE_SPAN = re.compile(r"(`+)(.+?)\1")
+_IMAGE = re.compile(r"!\[([^\]]*)\]\(([^)\s]+)(?:\s+&quot;[^)]*&quot;)?\)")
+_LINK = re.compile(r"\[([^\]]+)\]\(([^)\s]+)(?:\s+&quot;[^)]*&quot;)?\)")
+_AUTOLINK = re.compile(r"(?<![\"'=>])\bhttps?://[^\s<>()\"']+")
+_BOLD = re.compile(r"\*\*(.+?)\*\*|__(.+?)__")
+_ITALIC = re.compile(r"(?<![*\w])\*(?!\s)(.+?)(?<!\s)\*(?![*\w])")
+_STRIKE = re.compile(r"~~(.+?)~~")
+_PLACEHOLDER = re.compile("\x00(\\d+)\x00")
+
+
+class Document:
+    """変換結果
+
+    html        本文のHTML
+    title       最初の h1（無ければ空）
+    headings    [(レベル, アンカー, 見出し文字列), ...]
+    sections    [(アンカー, 見出し文字列, 本文のプレーンテキスト), ...]
+                先頭の見出しより前の本文はアンカー "" のセクション。
+    """
+
+    def __init__(self, html_text, title, headings, sections):
+        self.html = html_text
+        self.title = title
+        self.headings = headings
+        self.sections = sections
+
+
+def slugify(text, used):
+    """見出しのアンカー（NFKC・小文字・空白は -、記号は除く。重複は -2, -3 …）"""
+    text = unicodedata.normalize('NFKC', text).lower()
+    slug = "-".join("".join(c for c in word if c.isalnum() or c in "-_") for word in text.split())
+    slug = slug.strip("-") or "section"
+    candidate, n = slug, 2
+    while candidate in used:
+        candidate, n = f"{slug}-{n}", n + 1
+    used.add(candidate)
+    return candidate
+
+
+def render_inline(text, link_rewriter=None):
+    """行内の記法をHTMLにする（text は生のMarkdown）"""
+    saved = []
+
+    def keep(fragment):
+        saved.append(fragment)
+        return f"\x00{len(saved) - 1}\x00"
+
+    text = html.escape(text, quote=True)
+    text = _CODE_SPAN.sub(lambda m: keep(f"<code>{m.group(2).strip()}</code>"), text)
+
+    def href(url):
+        url = html.unescape(url)
+        if link_rewriter is not None:
+            url = link_rewriter(url)
+        return html.escape(url, quote=True)
+
+    text = _IMAGE.sub(lambda m: keep(f'<img src="{href(m.group(2))}" alt="{m.group(1)}" loading="lazy">'), text)
+    text = _LINK.sub(lambda m: keep(f'<a href="{href(m.group(2))}">{m.group(1)}</a>'), text)
+    text = _AUTOLINK.sub(lambda m: keep(f'<a href="{m.group(0)}" target="_blank" rel="noopener">{m.group(0)}</a>'), text)
+    text = _BOLD.sub(lambda m: f"<strong>{m.group(1) or m.group(2)}</strong>", text)
+    text = _ITALIC.sub(r"<em>\1</em>", text)
+    text = _STRIKE.sub(r"<del>\1</del>", text)
+    # リンク文字列の中の記法も効くよう、戻すのは最後に（入れ子の分は繰り返す）
+    while "\x00" in text:
+        text = _PLACEHOLDER.sub(lambda m: saved[int(m.group(1))], text)
+    return text
+
+
+def plain_text(text):
+    """行内の記法を外した文字列（検索・抜粋用）"""
+    text = _CODE_SPAN.sub(r"\2", text)
+    text = re.sub(r"!?\[([^\]]*)\]\([^)]*\)", r"\1", text)
+    text = re.sub(r"(\*\*|__|~~|\*)", "", text)
+    return text
+
+
+def _split_row(line):
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    cells = re.split(r"(?<!\\)\|", line)
+    return [cell.strip().replace("\\|", "|") for cell in cells]
+
+
+def _table_start(lines, i):
+    """lines[i] が表の見出し行か（次の行が | と - の区切り行）"""
+    return ("|" in lines[i] and i + 1 < len(lines) and "-" in lines[i + 1]
+            and _TABLE_SEPARATOR.match(lines[i + 1]) is not None)
+
+
+def _indent(line):
+    expanded = line.expandtabs(4)
+    return len(expanded) - len(expanded.lstrip(" "))
+
+
+class _Renderer:
+    def __init__(self, link_rewriter=None):
+        self.link_rewriter = link_rewriter
+        self.used = set()
+        self.headings = []
+        self.sections = [["", "", []]]
+        self.title = ""
+
+    def inline(self, text):
+        return render_inline(text, self.link_rewriter)
+
+    def text(self, text):
+        """現在のセクションにプレーンテキストを足す"""
+        if text.strip():
+            self.sections[-1][2].append(plain_text(text.strip()))
+
+    def blocks(self, lines, out):
+        i = 0
+        n = len(lines)
+        while i < n:
+            line = lines[i]
+            if not line.strip():
+                i += 1
+                continue
+
+            fence = _FENCE.match(line)
+            if fence:
+                marker = fence.group(2)
+                lang = fence.group(3)
+                body = []
+                i += 1
+                while i < n and not lines[i].strip().startswith(marker):
+                    body.append(lines[i])
+                    i += 1
+                i += 1
+                code = "\n".join(body)
+                self.text(code)
+                cls = f' class="language-{html.escape(lang)}"' if lang else ""
+                out.append(f"<pre><code{cls}>{html.escape(code)}</code></pre>")
+                continue
+
+            heading = _HEADING.match(line)
+            if heading:
+                level = len(heading.group(1))
+                raw = heading.group(2)
+                label = plain_text(raw)
+                anchor = slugify(label, self.used)
+                if level == 1 and not self.title:
+                    self.title = label
+                self.headings.append((level, anchor, label))
+                self.sections.append([anchor, label, []])
+                out.append(f'<h{level} id="{anchor}">{self.inline(raw)}</h{level}>')
+                i += 1
+                continue
+
+            if _RULE.match(line):
+                out.append("<hr>")
+                i += 1
+                continue
+
+            if _table_start(lines, i):
+                i = self.table(lines, i, out)
+                continue
+
+            if _QUOTE.match(line):
+                body = []
+                while i < n and lines[i].strip() and _QUOTE.match(lines[i]):
+                    body.append(_QUOTE.match(lines[i]).group(1))
+                    i += 1
+                inner = []
+                self.blocks(body, inner)
+                out.append("<blockquote>" + "\n".join(inner) + "</blockquote>")
+                continue
+
+            if _LIST_ITEM.match(line):
+                i = self.list(lines, i, out)
+                continue
+
+            # 段落（次のブロックの始まりか空行まで）
+            body = []
+            while i < n and lines[i].strip():
+                current = lines[i]
+                if body and (_HEADING.match(current) or _FENCE.match(current) or _QUOTE.match(current)
+                             or _LIST_ITEM.match(current) or _RULE.match(current) or _table_start(lines, i)):
+                    break
+                body.append(current.strip())
+                i += 1
+            for text in body:
+                self.text(text)
+            out.append("<p>" + "<br>\n".join(self.inline(text) for text in body) + "</p>")
+
+    def table(self, lines, i, out):
+        header = _split_row(lines[i])
+        aligns = []
+        for spec in _split_row(lines[i + 1]):
+            if spec.startswith(":") and spec.endswith(":"):
+                aligns.append("center")
+            elif spec.endswith(":"):
+                aligns.append("right")
+            else:
+                aligns.append("")
+        i += 2
+
+        def cell(tag, text, col):
+            align = aligns[col] if col < len(aligns) else ""
+            style = f' style="text-align: {align}"' if align else ""
+            return f"<{tag}{style}>{self.inline(text)}</{tag}>"
+
+        parts = ["<div class=\"table-wrapper\"><table>", "<thead><tr>"]
+        parts.extend(cell("th", text, col) for col, text in enumerate(header))
+        parts.append("</tr></thead><tbody>")
+        self.text(" ".join(header))
+        while i < len(lines) and lines[i].strip() and "|" in lines[i]:
+            row = _split_row(lines[i])
+            self.text(" ".join(row))
+            parts.append("<tr>" + "".join(cell("td", text, col) for col, text in enumerate(row)) + "</tr>")
+            i += 1
+        parts.append("</tbody></table></div>")
+        out.append("".join(parts))
+        return i
+
+    def list(self, lines, i, out):
+        """リスト1つ（同じインデントの項目の並び）を書き出して次の行番号を返す"""
+        first = _LIST_ITEM.match(lines[i])
+        base = _indent(lines[i])
+        ordered = first.group(2)[0].isdigit()
+        start = int(first.group(2)[:-1]) if ordered else 1
+        items = []
+        n = len(lines)
+        while i < n:
+            if not lines[i].strip():
+                # 空行をはさんで同じリストの項目が続くなら、同じリストのまま
+                j = i
+                while j < n and not lines[j].strip():
+                    j += 1
+                if j < n and _LIST_ITEM.match(lines[j]) and _indent(lines[j]) == base:
+                    i = j
+                    continue
+                break
+            match = _LIST_ITEM.match(lines[i])
+            if not match or _indent(lines[i]) != base or match.group(2)[0].isdigit() != ordered:
+                break
+            content_indent = len(match.group(1).expandtabs(4)) + len(match.group(2)) + 1
+            body = [match.group(3)]
+            i += 1
+            # 項目の続き: より深いインデントの行（空行をはさんでもよい）
+            while i < n:
+                line = lines[i]
+                if not line.strip():
+                    if i + 1 < n and lines[i + 1].strip() and _indent(lines[i + 1]) > base:
+                        body.append("")
+                        i += 1
+                        continue
+                    break
+                if _indent(line) <= base:
+                    # インデントなしの続き行（怠惰な継続）は段落の続きとして扱う
+                    if _LIST_ITEM.match(line) or _HEADING.match(line) or _FENCE.match(line) \
+                            or _QUOTE.match(line) or _RULE.match(line) or "|" in line:
+                        break
+                    body.append(line.strip())
+                    i += 1
+                    continue
+                expanded = line.expandtabs(4)
+                body.append(expanded[min(content_indent, _indent(line)):])
+                i += 1
+            items.append(body)
+
+        tag = "ol" if ordered else "ul"
+        attr = f' start="{start}"' if ordered and start != 1 else ""
+        parts = [f"<{tag}{attr}>"]
+        for body in items:
+            text = body[0]
+            task = _TASK.match(text)
+            prefix = ""
+            if task:
+                checked = " checked" if task.group(1) in "xX" else ""
+                prefix = f'<input type="checkbox" disabled{checked}> '
+                text = text[task.end():]
+            # 最初の段落は <p> で包まない（詰めたリスト）
+            lead = [text]
+            rest = body[1:]
+            while rest and rest[0].strip() and not _LIST_ITEM.match(rest[0]) and _indent(rest[0]) == 0 \
+                    and not _FENCE.match(rest[0]) and "|" not in rest[0]:
+                lead.append(rest.pop(0).strip())
+            for line in lead:
+                self.text(line)
+            inner = []
+            self.blocks(rest, inner)
+            item_class = ' class="task"' if task else ""
+            parts.append(f"<li{item_class}>{prefix}" + "<br>\n".join(self.inline(line) for line in lead)
+                         + "".join(inner) + "</li>")
+        parts.append(f"</{tag}>")
+        out.append("\n".join(parts))
+        return i
+
+
+def render_markdown(text, link_rewriter=None):
+    """Markdown の文字列を Document にする
+
+    link_rewriter を渡すと、リンク・画像のURLをそれで書き換える（.md → .html など）。
+    """
+    renderer = _Renderer(link_rewriter)
+    out = []
+    renderer.blocks(text.replace("\r\n", "\n").replace("\r", "\n").split("\n"), out)
+    sections = [
+        (anchor, label, " ".join(texts))
+        for anchor, label, texts in renderer.sections
+        if texts or anchor
+    ]
+    return Document("\n".join(out), renderer.title, renderer.headings, sections)
+
+
+def snippet(text, length=SNIPPET_LENGTH):
+    """抜粋（空白を詰めて length 文字まで）"""
+    text = " ".join(text.split())
+    return text if len(text) <= length else text[:length - 1] + "…"